@@ -0,0 +1,143 @@
+"""
+Benchmark: geheugengebruik van de domeinklassen
+
+Vergelijkt bytes per object van de __slots__ dataclasses met dezelfde
+klassen als gewone dataclass (met per-instance __dict__), voor een
+gegenereerd gebouw van ~50.000 elementen.
+
+Gebruik:
+    python benchmarks/geheugen_domein.py [aantal_velden] [verdiepingen]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from types import MemberDescriptorType
+from dataclasses import fields, field, make_dataclass
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.m02_gebouw_structuur.structuur import (
+    Positie3D, AangelastItem, StaalElement, maak_raster_gebouw
+)
+from modules.m04_originele_balken_db.voorraad import VoorraadItem
+from modules.m06_schoonmaak_analyse.analyse import SchoonmaakZone, SchoonmaakAnalyse
+from modules.m07_robot_bewerkingen.robot import RobotPositie, RobotPadGenerator
+
+
+def zonder_slots(cls: type) -> type:
+    """Zelfde dataclass, maar zonder __slots__ en niet frozen (oude situatie)"""
+    velden = [
+        (f.name, f.type, field(
+            default=f.default,
+            default_factory=f.default_factory,
+            init=f.init,
+            repr=f.repr,
+            compare=f.compare
+        ))
+        for f in fields(cls)
+    ]
+    # Methoden en properties overnemen, maar niet wat dataclass/slots genereren
+    gegenereerd = {"__init__", "__repr__", "__eq__", "__hash__", "__match_args__",
+                   "__getstate__", "__setstate__", "__slots__", "__weakref__", "__doc__",
+                   "__module__", "__dataclass_fields__", "__dataclass_params__"}
+    if cls.__dataclass_params__.frozen:
+        gegenereerd |= {"__setattr__", "__delattr__"}
+    namespace = {
+        naam: waarde
+        for basis in reversed(cls.__mro__[:-1])
+        for naam, waarde in vars(basis).items()
+        if naam not in gegenereerd and not isinstance(waarde, MemberDescriptorType)
+    }
+    return make_dataclass(cls.__name__ + "MetDict", velden, namespace=namespace)
+
+
+def bytes_per_object(cls: type, kwargs_lijst: List[Dict[str, Any]]) -> float:
+    """
+    Gemiddeld aantal bytes per nieuw object.
+
+    Veldwaarden worden gedeeld met de bronobjecten, zodat alleen het
+    object zelf (plus eventuele __dict__ en default containers) telt.
+    """
+    objecten: List[Any] = [None] * len(kwargs_lijst)
+    gc.collect()
+    tracemalloc.start()
+    begin = tracemalloc.get_traced_memory()[0]
+    for i, kwargs in enumerate(kwargs_lijst):
+        objecten[i] = cls(**kwargs)
+    gebruikt = tracemalloc.get_traced_memory()[0] - begin
+    tracemalloc.stop()
+    return gebruikt / max(1, len(objecten))
+
+
+def kwargs_van(objecten: List[Any]) -> List[Dict[str, Any]]:
+    """Constructor argumenten van bestaande dataclass objecten"""
+    return [
+        {f.name: getattr(o, f.name) for f in fields(o) if f.init}
+        for o in objecten
+    ]
+
+
+def verzamel_objecten(velden: int, verdiepingen: int) -> Tuple[Dict[type, List[Any]], int]:
+    """Genereer gebouw en bijbehorende objecten per klasse"""
+    gebouw = maak_raster_gebouw(velden_x=velden, velden_y=velden, verdiepingen=verdiepingen)
+    elementen = list(gebouw.elementen.values())
+    items = [item for e in elementen for item in e.aangelaste_items]
+    posities = [p for e in elementen for p in (e.start_positie, e.eind_positie)]
+
+    analyse = SchoonmaakAnalyse()
+    zones = [z for e in elementen[:10000] for z in analyse.analyseer_element(e).zones]
+
+    generator = RobotPadGenerator()
+    robot_posities = []
+    for zone in zones:
+        pad = generator.genereer_zigzag_pad(zone, generator.bepaal_robot_type(zone.bewerking))
+        robot_posities.extend(pad.posities)
+        if len(robot_posities) >= 200000:
+            break
+
+    voorraad = [
+        VoorraadItem(profiel_naam=e.profiel_naam, kwaliteit=e.kwaliteit, lengte_mm=e.lengte,
+                     is_geoogst=True, origineel_element_id=e.id)
+        for e in elementen
+    ]
+
+    return {
+        StaalElement: elementen,
+        AangelastItem: items,
+        Positie3D: posities,
+        SchoonmaakZone: zones,
+        RobotPositie: robot_posities,
+        VoorraadItem: voorraad,
+    }, len(elementen)
+
+
+def main(velden: int = 50, verdiepingen: int = 5) -> None:
+    start = time.perf_counter()
+    objecten, aantal_elementen = verzamel_objecten(velden, verdiepingen)
+    print(f"Gebouw: {aantal_elementen} elementen "
+          f"(gegenereerd in {time.perf_counter() - start:.1f}s)")
+    print()
+    print(f"{'Klasse':<16}{'Aantal':>10}{'Voor (B)':>12}{'Na (B)':>10}{'Besparing':>12}{'Totaal voor':>14}{'Totaal na':>12}")
+    print("-" * 86)
+
+    totaal_voor = totaal_na = 0.0
+    for cls, lijst in objecten.items():
+        kwargs_lijst = kwargs_van(lijst[:50000])
+        na = bytes_per_object(cls, kwargs_lijst)
+        voor = bytes_per_object(zonder_slots(cls), kwargs_lijst)
+        totaal_voor += voor * len(lijst)
+        totaal_na += na * len(lijst)
+        print(f"{cls.__name__:<16}{len(lijst):>10}{voor:>12.0f}{na:>10.0f}"
+              f"{(1 - na / voor) * 100:>11.0f}%"
+              f"{voor * len(lijst) / 1e6:>12.1f}MB{na * len(lijst) / 1e6:>10.1f}MB")
+
+    print("-" * 86)
+    print(f"{'Totaal':<16}{'':>44}{totaal_voor / 1e6:>12.1f}MB{totaal_na / 1e6:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
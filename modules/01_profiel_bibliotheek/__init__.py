@@ -6,10 +6,24 @@ from .profielen import (
     StaalKwaliteit,
     ProfielAfmetingen,
     StaalProfiel,
+    ProfielTabel,
+    CapaciteitsIndex,
     PROFIEL_DATABASE,
     zoek_profiel,
     zoek_profielen_op_type,
     zoek_profiel_op_capaciteit,
+    zoek_profielen,
+    get_profiel_tabel,
+    stel_profiel_catalogus_in,
+)
+from .catalogus import (
+    lees_catalogus,
+    laad_catalogus,
+)
+from .substitutie import (
+    PROFIEL_FAMILIES,
+    SubstitutieTabel,
+    zoek_substituties,
 )
 
 __all__ = [
@@ -17,8 +31,18 @@ __all__ = [
     "StaalKwaliteit", 
     "ProfielAfmetingen",
     "StaalProfiel",
+    "ProfielTabel",
+    "CapaciteitsIndex",
     "PROFIEL_DATABASE",
     "zoek_profiel",
     "zoek_profielen_op_type",
     "zoek_profiel_op_capaciteit",
+    "zoek_profielen",
+    "get_profiel_tabel",
+    "stel_profiel_catalogus_in",
+    "lees_catalogus",
+    "laad_catalogus",
+    "PROFIEL_FAMILIES",
+    "SubstitutieTabel",
+    "zoek_substituties",
 ]
@@ -0,0 +1,228 @@
+"""
+Profiel catalogus laden
+
+Leest profielseries uit een CSV/JSON catalogus en compileert die één keer
+naar een binaire cache (NumPy .npy) naast het databestand. Volgende
+processen openen alleen die cache via mmap, zodat het laden niet meegroeit
+met de omvang van de catalogus.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from .profielen import (
+    ProfielType, ProfielTabel, PROFIEL_KOLOMMEN, PROFIEL_TYPE_CODES
+)
+
+
+# Meegeleverde catalogus met standaard Europese profielen
+STANDAARD_CATALOGUS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "profielen.csv"
+)
+
+# Verhoog bij wijziging van het cache formaat
+CACHE_VERSIE = 1
+
+# Maximale lengte van een profielnaam in de cache
+_NAAM_LENGTE = 32
+
+
+def lees_catalogus(pad: str) -> ProfielTabel:
+    """
+    Lees een profielcatalogus zonder cache.
+
+    CSV: kolommen "type", optioneel "naam", en de eigenschappen uit
+    PROFIEL_KOLOMMEN. Regels die met '#' beginnen worden overgeslagen.
+
+    JSON: lijst van objecten met dezelfde sleutels, of een object
+    {"HEA": [[h, b, tw, tf, r, A, kg/m, Iy, Iz, Wy, Wz], ...], ...}.
+    """
+    if pad.lower().endswith(".json"):
+        namen, types, rijen = _lees_json(pad)
+    else:
+        namen, types, rijen = _lees_csv(pad)
+    return ProfielTabel.van_rijen(namen, types, rijen)
+
+
+def laad_catalogus(
+    pad: Optional[str] = None,
+    cache_map: Optional[str] = None
+) -> ProfielTabel:
+    """
+    Laad een profielcatalogus via de binaire cache.
+
+    De cache is gesleuteld op de hash van het databestand: bij een
+    gewijzigde catalogus wordt automatisch opnieuw gecompileerd. De hash
+    wordt alleen opnieuw berekend als mtime of grootte van het bestand
+    veranderd is (zoals bij .pyc bestanden). Als de
+    cache niet geschreven kan worden (read-only installatie) wordt de
+    catalogus gewoon in het geheugen geladen.
+
+    Args:
+        pad: CSV of JSON catalogus (standaard: meegeleverde catalogus)
+        cache_map: map voor de cache (standaard: __pycache__ naast het bestand)
+    """
+    pad = pad or STANDAARD_CATALOGUS
+    cache_map = cache_map or os.path.join(os.path.dirname(os.path.abspath(pad)), "__pycache__")
+
+    sleutel = _bekende_cache_sleutel(pad, cache_map)
+    waarden_pad = os.path.join(cache_map, f"profielen-{sleutel}.waarden.npy")
+    index_pad = os.path.join(cache_map, f"profielen-{sleutel}.index.npy")
+
+    if os.path.exists(waarden_pad) and os.path.exists(index_pad):
+        try:
+            return _open_cache(waarden_pad, index_pad)
+        except (OSError, ValueError):
+            pass  # Corrupte cache: opnieuw compileren
+
+    tabel = lees_catalogus(pad)
+    try:
+        _schrijf_cache(tabel, waarden_pad, index_pad)
+    except OSError:
+        return tabel
+    return _open_cache(waarden_pad, index_pad)
+
+
+def _formaat_hash():
+    """SHA-256 met het cache formaat al ingevoerd"""
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSIE}|{','.join(PROFIEL_KOLOMMEN)}|".encode())
+    h.update(",".join(t.value for t in PROFIEL_TYPE_CODES).encode())
+    return h
+
+
+def _cache_sleutel(pad: str) -> str:
+    """Hash van bestandsinhoud plus cache formaat"""
+    h = _formaat_hash()
+    with open(pad, "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            h.update(blok)
+    return h.hexdigest()[:16]
+
+
+def _bekende_cache_sleutel(pad: str, cache_map: str) -> str:
+    """
+    Cache sleutel, zonder het bestand te hashen als het niet gewijzigd is.
+
+    Per databestand staat (mtime, grootte, sleutel) in een stempelbestand
+    in de cache map; alleen als mtime of grootte afwijkt wordt opnieuw
+    gehasht.
+    """
+    info = os.stat(pad)
+    h = _formaat_hash()
+    h.update(os.path.abspath(pad).encode())
+    stempel_pad = os.path.join(cache_map, f"profielen-{h.hexdigest()[:16]}.stempel.json")
+
+    try:
+        with open(stempel_pad, "r", encoding="utf-8") as f:
+            stempel = json.load(f)
+        if stempel["mtime_ns"] == info.st_mtime_ns and stempel["grootte"] == info.st_size:
+            return stempel["sleutel"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    sleutel = _cache_sleutel(pad)
+    stempel = {"mtime_ns": info.st_mtime_ns, "grootte": info.st_size, "sleutel": sleutel}
+    try:
+        os.makedirs(cache_map, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_map, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(stempel, f)
+            os.replace(tmp, stempel_pad)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    except OSError:
+        pass  # Read-only: volgende keer weer hashen
+    return sleutel
+
+
+def _open_cache(waarden_pad: str, index_pad: str) -> ProfielTabel:
+    """Open de cache read-only via mmap"""
+    # (kolommen x profielen): elke eigenschap is een aaneengesloten rij
+    waarden = np.load(waarden_pad, mmap_mode="r")
+    index = np.load(index_pad, mmap_mode="r")
+    if waarden.shape != (len(PROFIEL_KOLOMMEN), len(index)):
+        raise ValueError(f"Ongeldige profiel cache: {waarden_pad}")
+
+    kolommen = {k: waarden[i] for i, k in enumerate(PROFIEL_KOLOMMEN)}
+    return ProfielTabel(index["naam"].tolist(), index["type"], kolommen)
+
+
+def _schrijf_cache(tabel: ProfielTabel, waarden_pad: str, index_pad: str) -> None:
+    """Schrijf de cache atomair (eerst tijdelijk bestand, dan hernoemen)"""
+    os.makedirs(os.path.dirname(waarden_pad), exist_ok=True)
+
+    waarden = np.stack([tabel.kolom(k) for k in PROFIEL_KOLOMMEN])
+    index = np.empty(len(tabel), dtype=[("naam", f"U{_NAAM_LENGTE}"), ("type", "i1")])
+    index["naam"] = tabel.namen
+    index["type"] = tabel.type_codes
+
+    # Index als laatste, zodat een halve cache nooit als geldig gezien wordt
+    for doel, data in ((waarden_pad, waarden), (index_pad, index)):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(doel), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, data)
+            os.replace(tmp, doel)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def _lees_csv(pad: str) -> Tuple[List[str], List[ProfielType], List[List[float]]]:
+    """Parse een CSV catalogus"""
+    with open(pad, "r", encoding="utf-8", newline="") as f:
+        regels = [r for r in f if r.strip() and not r.lstrip().startswith("#")]
+
+    namen, types, rijen = [], [], []
+    for record in csv.DictReader(regels):
+        _voeg_record_toe(record, namen, types, rijen)
+    return namen, types, rijen
+
+
+def _lees_json(pad: str) -> Tuple[List[str], List[ProfielType], List[List[float]]]:
+    """Parse een JSON catalogus"""
+    with open(pad, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    namen, types, rijen = [], [], []
+    if isinstance(data, dict):
+        for type_naam, series in data.items():
+            for rij in series:
+                record = dict(zip(PROFIEL_KOLOMMEN, rij))
+                record["type"] = type_naam
+                _voeg_record_toe(record, namen, types, rijen)
+    else:
+        for record in data:
+            _voeg_record_toe(record, namen, types, rijen)
+    return namen, types, rijen
+
+
+def _voeg_record_toe(
+    record: dict,
+    namen: List[str],
+    types: List[ProfielType],
+    rijen: List[List[float]]
+) -> None:
+    """Valideer één catalogusregel en voeg toe aan de kolommen"""
+    profiel_type = ProfielType(str(record["type"]).strip())
+    rij = [float(record.get(k) or 0) for k in PROFIEL_KOLOMMEN]
+    naam = str(record.get("naam") or "").strip()
+    if not naam:
+        naam = f"{profiel_type.value} {int(rij[0])}"
+    if len(naam) > _NAAM_LENGTE:
+        raise ValueError(f"Profielnaam te lang voor catalogus: {naam}")
+
+    namen.append(naam)
+    types.append(profiel_type)
+    rijen.append(rij)
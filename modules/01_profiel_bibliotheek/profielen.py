@@ -4,10 +4,14 @@ Module 1: Staal Profiel Bibliotheek
 Bevat alle standaard staalprofielen met hun eigenschappen.
 """
 
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Dict
-from uuid import uuid4
+from typing import Optional, List, Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from modules.identificatie import nieuw_id
 
 
 class ProfielType(Enum):
@@ -60,7 +64,7 @@ class ProfielAfmetingen:
 @dataclass
 class StaalProfiel:
     """Een standaard staalprofiel definitie"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     type: ProfielType = ProfielType.HEA
     naam: str = ""  # bijv. "HEA 200"
     afmetingen: ProfielAfmetingen = field(default_factory=ProfielAfmetingen)
@@ -70,143 +74,421 @@ class StaalProfiel:
             self.naam = f"{self.type.value} {int(self.afmetingen.hoogte)}"
 
 
+# ============================================================
+# PROFIEL TABEL - Kolomsgewijze opslag
+# ============================================================
+
+# Kolommen van de profieltabel, in de volgorde van de ruwe profieldata
+PROFIEL_KOLOMMEN: Tuple[str, ...] = (
+    "hoogte", "breedte", "lijf_dikte", "flens_dikte", "radius",
+    "oppervlakte", "gewicht_per_m", "Iy", "Iz", "Wy", "Wz",
+)
+
+# Vaste code per profieltype voor de type-kolom
+PROFIEL_TYPE_CODES: Dict[ProfielType, int] = {
+    t: code for code, t in enumerate(ProfielType)
+}
+_CODE_NAAR_TYPE: List[ProfielType] = list(ProfielType)
+
+
+class ProfielTabel(Mapping):
+    """
+    Kolomsgewijze profieltabel.
+
+    Elke eigenschap (h, b, tw, tf, r, A, kg/m, Iy, Iz, Wy, Wz) is één
+    NumPy array; profielen worden via een naam -> rij index gevonden.
+    `StaalProfiel` objecten worden pas aangemaakt als ze opgevraagd
+    worden, zodat zoekacties als vectoroperaties over de kolommen lopen.
+
+    Gedraagt zich als een read-only dict van naam -> StaalProfiel.
+    """
+
+    def __init__(
+        self,
+        namen: Sequence[str],
+        type_codes: Sequence[int],
+        kolommen: Dict[str, Sequence[float]]
+    ):
+        self.namen: List[str] = list(namen)
+        self.type_codes = np.asarray(type_codes, dtype=np.int8)
+        self.kolommen: Dict[str, np.ndarray] = {
+            k: np.asarray(kolommen[k], dtype=np.float64) for k in PROFIEL_KOLOMMEN
+        }
+        self.index: Dict[str, int] = {naam: rij for rij, naam in enumerate(self.namen)}
+        self._profielen: Dict[int, StaalProfiel] = {}
+        self._capaciteit_index: Optional['CapaciteitsIndex'] = None
+        self._substitutie_tabellen: Dict[tuple, 'SubstitutieTabel'] = {}
+
+    @classmethod
+    def van_series(
+        cls,
+        series: Dict[ProfielType, Iterable[Sequence[float]]]
+    ) -> 'ProfielTabel':
+        """Bouw tabel uit ruwe rijen (h, b, tw, tf, r, A, kg/m, Iy, Iz, Wy, Wz) per type"""
+        namen = []
+        types = []
+        rijen = []
+        for profiel_type, data in series.items():
+            for rij in data:
+                namen.append(f"{profiel_type.value} {int(rij[0])}")
+                types.append(profiel_type)
+                rijen.append(rij)
+        return cls.van_rijen(namen, types, rijen)
+    
+    @classmethod
+    def van_rijen(
+        cls,
+        namen: Sequence[str],
+        types: Sequence[ProfielType],
+        rijen: Sequence[Sequence[float]]
+    ) -> 'ProfielTabel':
+        """Bouw tabel uit losse rijen met expliciete namen en typen"""
+        waarden = np.asarray(rijen, dtype=np.float64).reshape(-1, len(PROFIEL_KOLOMMEN))
+        kolommen = {k: waarden[:, i].copy() for i, k in enumerate(PROFIEL_KOLOMMEN)}
+        type_codes = [PROFIEL_TYPE_CODES[t] for t in types]
+        return cls(namen, type_codes, kolommen)
+    
+    def kolom(self, naam: str) -> np.ndarray:
+        """Array van één eigenschap (bijv. Wy of gewicht_per_m)"""
+        return self.kolommen[naam]
+    
+    def rij(self, naam: str) -> Optional[int]:
+        """Rijnummer van een profiel (None als onbekend)"""
+        return self.index.get(naam)
+    
+    def type_van(self, rij: int) -> ProfielType:
+        """Profieltype van een rij"""
+        return _CODE_NAAR_TYPE[self.type_codes[rij]]
+    
+    def type_masker(self, type: ProfielType) -> np.ndarray:
+        """Boolean masker van alle rijen van een profieltype"""
+        return self.type_codes == PROFIEL_TYPE_CODES[type]
+    
+    def profiel(self, rij: int) -> StaalProfiel:
+        """`StaalProfiel` voor een rij, aangemaakt bij eerste opvraging"""
+        rij = int(rij)
+        profiel = self._profielen.get(rij)
+        if profiel is None:
+            afm = ProfielAfmetingen(**{
+                k: float(self.kolommen[k][rij]) for k in PROFIEL_KOLOMMEN
+            })
+            profiel = StaalProfiel(
+                type=self.type_van(rij),
+                naam=self.namen[rij],
+                afmetingen=afm
+            )
+            self._profielen[rij] = profiel
+        return profiel
+    
+    def profielen(self, rijen: Iterable[int]) -> List[StaalProfiel]:
+        """`StaalProfiel` objecten voor een reeks rijen (in die volgorde)"""
+        return [self.profiel(rij) for rij in rijen]
+    
+    @property
+    def capaciteit_index(self) -> 'CapaciteitsIndex':
+        """Gesorteerde capaciteitsindex, gebouwd bij eerste gebruik"""
+        if self._capaciteit_index is None:
+            self._capaciteit_index = CapaciteitsIndex(self)
+        return self._capaciteit_index
+    
+    def substitutie_tabel(self, **criteria) -> 'SubstitutieTabel':
+        """
+        Vervangende profielen per profiel (zie `SubstitutieTabel`), per set
+        criteria één keer berekend en daarna uit de cache.
+        """
+        from .substitutie import SubstitutieTabel
+        sleutel = tuple(sorted(criteria.items()))
+        substituties = self._substitutie_tabellen.get(sleutel)
+        if substituties is None:
+            substituties = self._substitutie_tabellen[sleutel] = SubstitutieTabel(self, **criteria)
+        return substituties
+    
+    # Mapping interface: naam -> StaalProfiel
+    def __getitem__(self, naam: str) -> StaalProfiel:
+        return self.profiel(self.index[naam])
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.namen)
+    
+    def __len__(self) -> int:
+        return len(self.namen)
+    
+    def __contains__(self, naam: object) -> bool:
+        return naam in self.index
+
+
+# Eigenschappen waarop de capaciteitsindex voorgesorteerd wordt
+INDEX_EIGENSCHAPPEN: Tuple[str, ...] = (
+    "Wy", "Wz", "Iy", "Iz", "oppervlakte", "gewicht_per_m",
+)
+
+
+class CapaciteitsIndex:
+    """
+    Voorgesorteerde index over een `ProfielTabel`.
+
+    Per profieltype (en voor alle typen samen) en per doorsnede-eigenschap
+    uit `INDEX_EIGENSCHAPPEN` staat een oplopend gesorteerde waarde-array
+    met bijbehorende rijnummers. Bereikvragen zoals "Wy >= x en
+    kg/m <= y, lichtste eerst" starten met een bisectie op het meest
+    selectieve criterium; de overige criteria filteren alleen dat bereik.
+    Als er alleen op de sorteer-eigenschap gefilterd wordt kost een vraag
+    O(log n + k).
+    """
+    
+    def __init__(self, tabel: ProfielTabel):
+        self.tabel = tabel
+        self._gesorteerd: Dict[Tuple[Optional[ProfielType], str], Tuple[np.ndarray, np.ndarray]] = {}
+        
+        groepen: Dict[Optional[ProfielType], np.ndarray] = {None: np.arange(len(tabel))}
+        for profiel_type in ProfielType:
+            groepen[profiel_type] = np.flatnonzero(tabel.type_masker(profiel_type))
+        
+        for profiel_type, rijen in groepen.items():
+            for eigenschap in INDEX_EIGENSCHAPPEN:
+                waarden = tabel.kolom(eigenschap)[rijen]
+                volgorde = np.argsort(waarden, kind="stable")
+                self._gesorteerd[(profiel_type, eigenschap)] = (
+                    waarden[volgorde], rijen[volgorde]
+                )
+    
+    def bereik(
+        self,
+        eigenschap: str,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+        type: Optional[ProfielType] = None
+    ) -> np.ndarray:
+        """Rijen met minimum <= eigenschap <= maximum, oplopend gesorteerd"""
+        waarden, rijen = self._gesorteerd[(type, eigenschap)]
+        lo, hi = self._grenzen(waarden, minimum, maximum)
+        return rijen[lo:hi]
+    
+    def zoek(
+        self,
+        minimum: Optional[Dict[str, float]] = None,
+        maximum: Optional[Dict[str, float]] = None,
+        type: Optional[ProfielType] = None,
+        sorteer_op: str = "gewicht_per_m",
+        aflopend: bool = False,
+        k: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Zoek rijen die aan alle criteria voldoen.
+        
+        Args:
+            minimum: ondergrenzen per eigenschap, bijv. {"Wy": 369000}
+            maximum: bovengrenzen per eigenschap, bijv. {"gewicht_per_m": 60}
+            type: beperk tot één profieltype
+            sorteer_op: eigenschap waarop het resultaat gesorteerd wordt
+            aflopend: grootste waarde eerst
+            k: maximaal aantal resultaten (de k beste)
+        
+        Returns:
+            Array met rijnummers in de `ProfielTabel`
+        """
+        minimum = minimum or {}
+        maximum = maximum or {}
+        criteria = {
+            e: (minimum.get(e), maximum.get(e))
+            for e in list(minimum) + [e for e in maximum if e not in minimum]
+        }
+        
+        # Bisectie op alle geïndexeerde criteria, O(log n) per criterium
+        bereiken = {}
+        for eigenschap, (mn, mx) in criteria.items():
+            if eigenschap in INDEX_EIGENSCHAPPEN:
+                waarden, _ = self._gesorteerd[(type, eigenschap)]
+                bereiken[eigenschap] = self._grenzen(waarden, mn, mx)
+        
+        # Snelle route: alleen criteria op de sorteer-eigenschap zelf
+        if sorteer_op in INDEX_EIGENSCHAPPEN and set(criteria) <= {sorteer_op}:
+            _, rijen = self._gesorteerd[(type, sorteer_op)]
+            lo, hi = bereiken.get(sorteer_op, (0, len(rijen)))
+            if aflopend:
+                if k is not None:
+                    lo = max(lo, hi - k)
+                return rijen[lo:hi][::-1].copy()
+            if k is not None:
+                hi = min(hi, lo + k)
+            return rijen[lo:hi].copy()
+        
+        # Start met het kortste bereik en filter de overige criteria
+        if bereiken:
+            basis = min(bereiken, key=lambda e: bereiken[e][1] - bereiken[e][0])
+            lo, hi = bereiken[basis]
+            rijen = self._gesorteerd[(type, basis)][1][lo:hi]
+        else:
+            basis = None
+            rijen = self._gesorteerd[(type, INDEX_EIGENSCHAPPEN[0])][1]
+            rijen = np.sort(rijen)
+        
+        masker = np.ones(len(rijen), dtype=bool)
+        for eigenschap, (mn, mx) in criteria.items():
+            if eigenschap == basis:
+                continue
+            waarden = self.tabel.kolom(eigenschap)[rijen]
+            if mn is not None:
+                masker &= waarden >= mn
+            if mx is not None:
+                masker &= waarden <= mx
+        rijen = rijen[masker]
+        
+        sleutel = self.tabel.kolom(sorteer_op)[rijen]
+        if aflopend:
+            sleutel = -sleutel
+        if k is not None and k < len(rijen):
+            beste = np.argpartition(sleutel, k)[:k] if k > 0 else np.array([], dtype=np.intp)
+            rijen, sleutel = rijen[beste], sleutel[beste]
+        return rijen[np.argsort(sleutel, kind="stable")]
+    
+    @staticmethod
+    def _grenzen(
+        waarden: np.ndarray,
+        minimum: Optional[float],
+        maximum: Optional[float]
+    ) -> Tuple[int, int]:
+        """Bisectie-grenzen [lo, hi) van een bereik in een gesorteerde array"""
+        lo = 0 if minimum is None else int(np.searchsorted(waarden, minimum, side="left"))
+        hi = len(waarden) if maximum is None else int(np.searchsorted(waarden, maximum, side="right"))
+        return lo, max(lo, hi)
+
+
 # ============================================================
 # PROFIEL DATABASE - Standaard Europese profielen
 # ============================================================
 
-def get_standaard_profielen() -> Dict[str, StaalProfiel]:
-    """Retourneert database van standaard profielen"""
-    
-    profielen = {}
-    
-    # HEA Profielen (European wide flange beams - light series)
-    hea_data = [
-        # (hoogte, breedte, tw, tf, r, A, kg/m, Iy, Iz, Wy, Wz)
-        (100, 100, 5, 8, 12, 2124, 16.7, 3490000, 1340000, 69800, 26800),
-        (120, 120, 5, 8, 12, 2534, 19.9, 6060000, 2310000, 101000, 38500),
-        (140, 140, 5.5, 8.5, 12, 3142, 24.7, 10300000, 3890000, 147000, 55600),
-        (160, 160, 6, 9, 15, 3877, 30.4, 16700000, 6160000, 209000, 77000),
-        (180, 180, 6, 9.5, 15, 4525, 35.5, 25100000, 9250000, 279000, 103000),
-        (200, 200, 6.5, 10, 18, 5383, 42.3, 36900000, 13400000, 369000, 134000),
-        (220, 220, 7, 11, 18, 6434, 50.5, 54100000, 19500000, 492000, 177000),
-        (240, 240, 7.5, 12, 21, 7684, 60.3, 77600000, 27700000, 647000, 231000),
-        (260, 260, 7.5, 12.5, 24, 8682, 68.2, 104500000, 36700000, 804000, 282000),
-        (280, 280, 8, 13, 24, 9726, 76.4, 136700000, 47600000, 976000, 340000),
-        (300, 300, 8.5, 14, 27, 11253, 88.3, 182600000, 63100000, 1217000, 421000),
-        (320, 310, 9, 15.5, 27, 12440, 97.6, 229300000, 69900000, 1433000, 451000),
-        (340, 300, 9.5, 16.5, 27, 13340, 105, 276900000, 72000000, 1628000, 480000),
-        (360, 300, 10, 17.5, 27, 14280, 112, 330900000, 78900000, 1838000, 526000),
-        (400, 300, 11, 19, 27, 15900, 125, 450700000, 85600000, 2253000, 571000),
-        (450, 300, 11.5, 21, 27, 17800, 140, 637200000, 93700000, 2832000, 625000),
-        (500, 300, 12, 23, 27, 19760, 155, 869700000, 107200000, 3479000, 715000),
-        (550, 300, 12.5, 24, 27, 21180, 166, 1119600000, 111900000, 4071000, 746000),
-        (600, 300, 13, 25, 27, 22640, 178, 1412400000, 116600000, 4708000, 777000),
-    ]
-    
-    for data in hea_data:
-        h, b, tw, tf, r, A, kg, Iy, Iz, Wy, Wz = data
-        afm = ProfielAfmetingen(
-            hoogte=h, breedte=b, lijf_dikte=tw, flens_dikte=tf,
-            radius=r, oppervlakte=A, gewicht_per_m=kg,
-            Iy=Iy, Iz=Iz, Wy=Wy, Wz=Wz
-        )
-        profiel = StaalProfiel(type=ProfielType.HEA, afmetingen=afm)
-        profielen[profiel.naam] = profiel
-    
-    # HEB Profielen (European wide flange beams - normal series)
-    heb_data = [
-        (100, 100, 6, 10, 12, 2604, 20.4, 4500000, 1670000, 90000, 33500),
-        (120, 120, 6.5, 11, 12, 3401, 26.7, 8640000, 3180000, 144000, 53000),
-        (140, 140, 7, 12, 12, 4296, 33.7, 15100000, 5500000, 216000, 78600),
-        (160, 160, 8, 13, 15, 5425, 42.6, 24900000, 8890000, 311000, 111000),
-        (180, 180, 8.5, 14, 15, 6525, 51.2, 38300000, 13600000, 426000, 151000),
-        (200, 200, 9, 15, 18, 7808, 61.3, 57000000, 20000000, 570000, 200000),
-        (220, 220, 9.5, 16, 18, 9104, 71.5, 80900000, 28400000, 736000, 258000),
-        (240, 240, 10, 17, 21, 10600, 83.2, 112600000, 39200000, 938000, 327000),
-        (260, 260, 10, 17.5, 24, 11840, 93, 149200000, 51300000, 1148000, 395000),
-        (280, 280, 10.5, 18, 24, 13140, 103, 192700000, 65400000, 1376000, 467000),
-        (300, 300, 11, 19, 27, 14910, 117, 251700000, 85600000, 1678000, 571000),
-        (320, 300, 11.5, 20.5, 27, 16130, 127, 308200000, 94300000, 1926000, 629000),
-        (340, 300, 12, 21.5, 27, 17090, 134, 366600000, 96900000, 2156000, 646000),
-        (360, 300, 12.5, 22.5, 27, 18100, 142, 431900000, 101400000, 2400000, 676000),
-        (400, 300, 13.5, 24, 27, 19780, 155, 576800000, 108200000, 2884000, 721000),
-        (450, 300, 14, 26, 27, 21800, 171, 798800000, 117200000, 3551000, 781000),
-        (500, 300, 14.5, 28, 27, 23860, 187, 1072000000, 126200000, 4287000, 842000),
-        (550, 300, 15, 29, 27, 25410, 199, 1367000000, 130800000, 4971000, 872000),
-        (600, 300, 15.5, 30, 27, 27000, 212, 1710000000, 135400000, 5701000, 903000),
-    ]
-    
-    for data in heb_data:
-        h, b, tw, tf, r, A, kg, Iy, Iz, Wy, Wz = data
-        afm = ProfielAfmetingen(
-            hoogte=h, breedte=b, lijf_dikte=tw, flens_dikte=tf,
-            radius=r, oppervlakte=A, gewicht_per_m=kg,
-            Iy=Iy, Iz=Iz, Wy=Wy, Wz=Wz
-        )
-        profiel = StaalProfiel(type=ProfielType.HEB, afmetingen=afm)
-        profielen[profiel.naam] = profiel
-    
-    # IPE Profielen (European I-beams)
-    ipe_data = [
-        (80, 46, 3.8, 5.2, 5, 764, 6.0, 801000, 84900, 20000, 3690),
-        (100, 55, 4.1, 5.7, 7, 1032, 8.1, 1710000, 159000, 34200, 5790),
-        (120, 64, 4.4, 6.3, 7, 1321, 10.4, 3180000, 277000, 53000, 8650),
-        (140, 73, 4.7, 6.9, 7, 1643, 12.9, 5410000, 449000, 77300, 12300),
-        (160, 82, 5.0, 7.4, 9, 2009, 15.8, 8690000, 683000, 109000, 16700),
-        (180, 91, 5.3, 8.0, 9, 2395, 18.8, 13170000, 1010000, 146000, 22200),
-        (200, 100, 5.6, 8.5, 12, 2848, 22.4, 19430000, 1420000, 194000, 28500),
-        (220, 110, 5.9, 9.2, 12, 3337, 26.2, 27720000, 2050000, 252000, 37300),
-        (240, 120, 6.2, 9.8, 15, 3912, 30.7, 38920000, 2840000, 324000, 47300),
-        (270, 135, 6.6, 10.2, 15, 4594, 36.1, 57900000, 4200000, 429000, 62200),
-        (300, 150, 7.1, 10.7, 15, 5381, 42.2, 83560000, 6040000, 557000, 80500),
-        (330, 160, 7.5, 11.5, 18, 6261, 49.1, 117700000, 7880000, 713000, 98500),
-        (360, 170, 8.0, 12.7, 18, 7273, 57.1, 162700000, 10400000, 904000, 123000),
-        (400, 180, 8.6, 13.5, 21, 8446, 66.3, 231300000, 13200000, 1156000, 146000),
-        (450, 190, 9.4, 14.6, 21, 9882, 77.6, 337400000, 16800000, 1500000, 176000),
-        (500, 200, 10.2, 16.0, 21, 11550, 90.7, 482000000, 21400000, 1928000, 214000),
-        (550, 210, 11.1, 17.2, 24, 13440, 106, 671200000, 26700000, 2441000, 254000),
-        (600, 220, 12.0, 19.0, 24, 15600, 122, 920800000, 33900000, 3069000, 308000),
-    ]
-    
-    for data in ipe_data:
-        h, b, tw, tf, r, A, kg, Iy, Iz, Wy, Wz = data
-        afm = ProfielAfmetingen(
-            hoogte=h, breedte=b, lijf_dikte=tw, flens_dikte=tf,
-            radius=r, oppervlakte=A, gewicht_per_m=kg,
-            Iy=Iy, Iz=Iz, Wy=Wy, Wz=Wz
-        )
-        profiel = StaalProfiel(type=ProfielType.IPE, afmetingen=afm)
-        profielen[profiel.naam] = profiel
-    
-    return profielen
+_TABEL: Optional[ProfielTabel] = None
+_CATALOGUS_PAD: Optional[str] = None
+_CACHE_MAP: Optional[str] = None
+
+
+def get_standaard_profielen() -> ProfielTabel:
+    """Retourneert database van standaard profielen (uit de meegeleverde catalogus)"""
+    from .catalogus import laad_catalogus
+    return laad_catalogus()
+
+
+def get_profiel_tabel() -> ProfielTabel:
+    """Actieve profieltabel; wordt bij het eerste gebruik geladen"""
+    global _TABEL
+    if _TABEL is None:
+        from .catalogus import laad_catalogus
+        _TABEL = laad_catalogus(_CATALOGUS_PAD, cache_map=_CACHE_MAP)
+    return _TABEL
+
+
+def stel_profiel_catalogus_in(
+    pad: Optional[str] = None,
+    cache_map: Optional[str] = None
+) -> None:
+    """
+    Gebruik een andere profielcatalogus (CSV/JSON).
+    
+    De catalogus wordt pas geladen bij het volgende gebruik van
+    PROFIEL_DATABASE; None zet de standaard catalogus terug.
+    """
+    global _TABEL, _CATALOGUS_PAD, _CACHE_MAP
+    _CATALOGUS_PAD = pad
+    _CACHE_MAP = cache_map
+    _TABEL = None
+
+
+class _LuiProfielDatabase(Mapping):
+    """
+    Proxy voor PROFIEL_DATABASE.
+    
+    Importeren van de module laadt niets; de profieltabel wordt pas bij
+    de eerste opvraging uit de (gecachte) catalogus geladen. Overige
+    attributen (kolom, capaciteit_index, ...) worden doorgegeven aan de
+    `ProfielTabel`.
+    """
+    
+    def __getitem__(self, naam: str) -> StaalProfiel:
+        return get_profiel_tabel()[naam]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(get_profiel_tabel())
+    
+    def __len__(self) -> int:
+        return len(get_profiel_tabel())
+    
+    def __contains__(self, naam: object) -> bool:
+        return naam in get_profiel_tabel()
+    
+    def __getattr__(self, attr: str):
+        return getattr(get_profiel_tabel(), attr)
+    
+    def __repr__(self) -> str:
+        if _TABEL is None:
+            return "<PROFIEL_DATABASE (nog niet geladen)>"
+        return f"<PROFIEL_DATABASE ({len(_TABEL)} profielen)>"
 
 
 # Singleton instance
-PROFIEL_DATABASE = get_standaard_profielen()
+PROFIEL_DATABASE = _LuiProfielDatabase()
 
 
 def zoek_profiel(naam: str) -> Optional[StaalProfiel]:
     """Zoek een profiel op naam"""
-    return PROFIEL_DATABASE.get(naam)
+    tabel = get_profiel_tabel()
+    rij = tabel.index.get(naam)
+    return None if rij is None else tabel.profiel(rij)
 
 
 def zoek_profielen_op_type(type: ProfielType) -> List[StaalProfiel]:
     """Zoek alle profielen van een bepaald type"""
-    return [p for p in PROFIEL_DATABASE.values() if p.type == type]
+    tabel = get_profiel_tabel()
+    return tabel.profielen(np.flatnonzero(tabel.type_masker(type)))
 
 
 def zoek_profiel_op_capaciteit(
     min_Wy: float,
-    type: Optional[ProfielType] = None
+    type: Optional[ProfielType] = None,
+    max_gewicht_per_m: Optional[float] = None,
+    k: Optional[int] = None
 ) -> List[StaalProfiel]:
-    """Zoek profielen met minimale weerstandsmoment"""
-    profielen = PROFIEL_DATABASE.values()
-    if type:
-        profielen = [p for p in profielen if p.type == type]
-    return sorted(
-        [p for p in profielen if p.afmetingen.Wy >= min_Wy],
-        key=lambda p: p.afmetingen.Wy
+    """
+    Zoek profielen met minimale weerstandsmoment.
+    
+    Zonder gewichtsgrens gesorteerd op Wy (kleinste eerst), met
+    gewichtsgrens op gewicht (lichtste eerst).
+    """
+    if max_gewicht_per_m is None:
+        return zoek_profielen(minimum={"Wy": min_Wy}, type=type, sorteer_op="Wy", k=k)
+    return zoek_profielen(
+        minimum={"Wy": min_Wy},
+        maximum={"gewicht_per_m": max_gewicht_per_m},
+        type=type,
+        sorteer_op="gewicht_per_m",
+        k=k
+    )
+
+
+def zoek_profielen(
+    minimum: Optional[Dict[str, float]] = None,
+    maximum: Optional[Dict[str, float]] = None,
+    type: Optional[ProfielType] = None,
+    sorteer_op: str = "gewicht_per_m",
+    aflopend: bool = False,
+    k: Optional[int] = None
+) -> List[StaalProfiel]:
+    """
+    Zoek profielen op meerdere criteria via de capaciteitsindex.
+    
+    Voorbeeld: zoek_profielen({"Wy": 369000}, {"gewicht_per_m": 60}, k=3)
+    geeft de drie lichtste profielen met Wy >= 369000 mm³ en <= 60 kg/m.
+    """
+    tabel = get_profiel_tabel()
+    rijen = tabel.capaciteit_index.zoek(
+        minimum=minimum,
+        maximum=maximum,
+        type=type,
+        sorteer_op=sorteer_op,
+        aflopend=aflopend,
+        k=k
     )
+    return tabel.profielen(rijen)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+"""
+Profiel substitutie
+
+Leidt uit de doorsnede-eigenschappen af welke profielen een gevraagd
+profiel constructief kunnen vervangen: minstens dezelfde Wy en Iy,
+hoogte en breedte binnen een tolerantie en een vergelijkbare vorm
+(I-profiel voor I-profiel, koker voor koker). Alle kandidaten worden
+één keer vooruit berekend; opvragen is daarna een dict lookup.
+"""
+
+from collections.abc import Mapping
+from typing import Optional, List, Dict, Iterator, Tuple
+
+import numpy as np
+
+from .profielen import ProfielType, ProfielTabel, PROFIEL_TYPE_CODES, get_profiel_tabel
+
+
+# Profieltypen met een vergelijkbare doorsnedevorm en aansluitingen
+PROFIEL_FAMILIES: Tuple[Tuple[ProfielType, ...], ...] = (
+    (ProfielType.HEA, ProfielType.HEB, ProfielType.HEM, ProfielType.IPE, ProfielType.IPN),
+    (ProfielType.UNP, ProfielType.UPE),
+    (ProfielType.L,),
+    (ProfielType.T,),
+    (ProfielType.RHS, ProfielType.SHS),
+    (ProfielType.CHS,),
+)
+
+
+class SubstitutieTabel(Mapping):
+    """
+    Vooraf berekende vervangende profielen per profielnaam.
+
+    Gedraagt zich als een read-only dict van naam -> tuple met
+    vervangende profielnamen, minste extra gewicht per meter eerst.
+    Profielen zonder vervanger staan er met een lege tuple in.
+    """
+
+    def __init__(
+        self,
+        tabel: ProfielTabel,
+        hoogte_tolerantie: float = 0.25,
+        breedte_tolerantie: float = 0.25,
+        max_meergewicht: Optional[float] = None,
+        max_kandidaten: Optional[int] = None
+    ):
+        """
+        Args:
+            tabel: profieltabel waaruit afgeleid wordt
+            hoogte_tolerantie: toegestane afwijking van de hoogte (fractie)
+            breedte_tolerantie: toegestane afwijking van de breedte (fractie)
+            max_meergewicht: maximaal extra gewicht per meter (fractie), None = geen grens
+            max_kandidaten: maximaal aantal vervangers per profiel
+        """
+        self.tabel = tabel
+        self.hoogte_tolerantie = hoogte_tolerantie
+        self.breedte_tolerantie = breedte_tolerantie
+        self.max_meergewicht = max_meergewicht
+        self.max_kandidaten = max_kandidaten
+
+        familie = np.full(len(PROFIEL_TYPE_CODES), -1, dtype=np.int64)
+        for f, typen in enumerate(PROFIEL_FAMILIES):
+            for profiel_type in typen:
+                familie[PROFIEL_TYPE_CODES[profiel_type]] = f
+        familie_van = familie[tabel.type_codes]
+
+        hoogte = tabel.kolom("hoogte")
+        breedte = tabel.kolom("breedte")
+        gewicht = tabel.kolom("gewicht_per_m")
+        Wy = tabel.kolom("Wy")
+        Iy = tabel.kolom("Iy")
+        index = tabel.capaciteit_index
+
+        self._kandidaten: Dict[str, Tuple[str, ...]] = {}
+        for rij, naam in enumerate(tabel.namen):
+            maximum = {
+                "hoogte": hoogte[rij] * (1 + hoogte_tolerantie),
+                "breedte": breedte[rij] * (1 + breedte_tolerantie),
+            }
+            if max_meergewicht is not None:
+                maximum["gewicht_per_m"] = gewicht[rij] * (1 + max_meergewicht)
+            rijen = index.zoek(
+                minimum={
+                    "Wy": Wy[rij],
+                    "Iy": Iy[rij],
+                    "hoogte": hoogte[rij] * (1 - hoogte_tolerantie),
+                    "breedte": breedte[rij] * (1 - breedte_tolerantie),
+                },
+                maximum=maximum,
+                sorteer_op="gewicht_per_m",
+            )
+            rijen = rijen[(rijen != rij) & (familie_van[rijen] == familie_van[rij])]
+            self._kandidaten[naam] = tuple(tabel.namen[r] for r in rijen[:max_kandidaten].tolist())
+
+    def kandidaten(self, naam: str) -> Tuple[str, ...]:
+        """Vervangende profielen (leeg als het profiel onbekend is)"""
+        return self._kandidaten.get(naam, ())
+
+    def meergewicht(self, naam: str) -> List[Tuple[str, float]]:
+        """Vervangende profielen met het extra gewicht in kg/m"""
+        rij = self.tabel.rij(naam)
+        if rij is None:
+            return []
+        gewicht = self.tabel.kolom("gewicht_per_m")
+        return [
+            (kandidaat, float(gewicht[self.tabel.rij(kandidaat)] - gewicht[rij]))
+            for kandidaat in self.kandidaten(naam)
+        ]
+
+    # Mapping interface: naam -> vervangers
+    def __getitem__(self, naam: str) -> Tuple[str, ...]:
+        return self._kandidaten[naam]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._kandidaten)
+
+    def __len__(self) -> int:
+        return len(self._kandidaten)
+
+
+def zoek_substituties(naam: str) -> Tuple[str, ...]:
+    """Vervangende profielen voor een profiel uit de actieve catalogus"""
+    return get_profiel_tabel().substitutie_tabel().kandidaten(naam)
+
+
+if __name__ == "__main__":
+    import time
+
+    tabel = get_profiel_tabel()
+    start = time.perf_counter()
+    substituties = tabel.substitutie_tabel()
+    duur = time.perf_counter() - start
+    print(f"Substitutietabel voor {len(tabel)} profielen in {duur * 1000:.1f} ms")
+    for naam in ("HEA 200", "HEB 200", "IPE 200", "IPE 600"):
+        vervangers = ", ".join(f"{k} ({extra:+.1f} kg/m)" for k, extra in substituties.meergewicht(naam)[:4])
+        print(f"  {naam}: {vervangers or 'geen'}")
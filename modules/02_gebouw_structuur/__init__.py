@@ -6,19 +6,39 @@ from .structuur import (
     VerbindingType,
     Positie3D,
     AangelastItem,
+    ItemLijst,
     StaalElement,
     Verbinding,
+    VerbindingLijst,
     Gebouw,
     maak_voorbeeld_gebouw,
+    maak_raster_gebouw,
 )
+from .arrays import GebouwArrays
+from .ruimtelijk import (
+    RuimtelijkeIndex,
+    punt_segment_afstanden,
+    segment_segment_afstanden,
+)
+from .verbindingen import detecteer_verbindingen
+from .graaf import VerbindingsGraaf
 
 __all__ = [
     "ElementType",
     "VerbindingType",
     "Positie3D",
     "AangelastItem",
+    "ItemLijst",
     "StaalElement",
     "Verbinding",
+    "VerbindingLijst",
     "Gebouw",
     "maak_voorbeeld_gebouw",
+    "maak_raster_gebouw",
+    "GebouwArrays",
+    "RuimtelijkeIndex",
+    "punt_segment_afstanden",
+    "segment_segment_afstanden",
+    "detecteer_verbindingen",
+    "VerbindingsGraaf",
 ]
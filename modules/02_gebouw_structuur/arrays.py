@@ -0,0 +1,382 @@
+"""
+Module 2: Gebouw Structuur - Kolomsgewijze opslag
+
+Struct-of-arrays weergave van de elementen van een gebouw. Geometrie,
+typen, profielen en aangelaste items staan in NumPy arrays, zodat
+totalen en selecties vectoroperaties zijn. Element objecten worden pas
+aangemaakt als ze opgevraagd worden.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Iterable, Iterator, Sequence
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m01_profiel_bibliotheek.profielen import (
+    StaalKwaliteit, get_profiel_tabel, zoek_profiel
+)
+from modules.m02_gebouw_structuur.structuur import (
+    ElementType, VerbindingType, Positie3D, AangelastItem, StaalElement
+)
+
+
+# Vaste codes voor de enum-kolommen
+ELEMENT_TYPEN: List[ElementType] = list(ElementType)
+KWALITEITEN: List[StaalKwaliteit] = list(StaalKwaliteit)
+VERBINDING_TYPEN: List[VerbindingType] = list(VerbindingType)
+
+# Standaard condities; onbekende waarden worden achteraan toegevoegd
+STANDAARD_CONDITIES = ("onbekend", "goed", "matig", "slecht")
+
+# Gesleuteld op de enum waarde, zodat ook elementen uit een module die als
+# script gestart is (andere enum klasse, zelfde waarden) gecodeerd kunnen worden
+_TYPE_CODE = {t.value: i for i, t in enumerate(ELEMENT_TYPEN)}
+_KWALITEIT_CODE = {k.value: i for i, k in enumerate(KWALITEITEN)}
+_VERBINDING_CODE = {v.value: i for i, v in enumerate(VERBINDING_TYPEN)}
+
+HORIZONTALE_TYPEN = (ElementType.BALK, ElementType.LIGGER, ElementType.VLOERLIGGER)
+
+
+@dataclass
+class GebouwArrays:
+    """
+    Kolomsgewijze opslag van gebouwelementen.
+
+    Per element (rij):
+        ids, type_code, profiel_code, profiel_rij, kwaliteit_code,
+        conditie_code, start/eind (N,3), lengte, rotatie, gewicht_per_m,
+        start/eind_verbinding_code, opmerkingen
+    Per aangelast item (plat):
+        item_element (rij van het element), item_ids, item_type_code,
+        item_gewicht, item_verwijder_tijd, item_las_lengte, item_positie
+        (K,3), item_beschrijving, item_afmetingen
+
+    Alle velden van de elementen en items staan erin, zodat element()
+    zonder bronobjecten (bijv. in een worker proces) hetzelfde element
+    teruggeeft.
+    """
+    ids: np.ndarray                      # int64
+    namen: List[str]
+    type_code: np.ndarray                # int8, index in ELEMENT_TYPEN
+    profiel_namen: List[str]             # vocabulaire voor profiel_code
+    profiel_code: np.ndarray             # int32
+    profiel_rij: np.ndarray              # int32, rij in profieltabel (-1 = onbekend)
+    kwaliteit_code: np.ndarray           # int8, index in KWALITEITEN
+    condities: List[str]                 # vocabulaire voor conditie_code
+    conditie_code: np.ndarray            # int8
+    start: np.ndarray                    # (N, 3) float64, mm
+    eind: np.ndarray                     # (N, 3) float64, mm
+    lengte: np.ndarray                   # float64, mm
+    rotatie: np.ndarray                  # float64, graden
+    gewicht_per_m: np.ndarray            # float64, kg/m (0 = geen profiel)
+    start_verbinding_code: np.ndarray    # int8, index in VERBINDING_TYPEN
+    eind_verbinding_code: np.ndarray     # int8
+    opmerkingen: List[str]
+
+    item_typen: List[str] = field(default_factory=list)
+    item_element: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+    item_type_code: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int16))
+    item_gewicht: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    item_verwijder_tijd: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    item_ids: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    item_las_lengte: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    item_positie: np.ndarray = field(default_factory=lambda: np.zeros((0, 3)))
+    item_beschrijving: List[str] = field(default_factory=list)
+    item_afmetingen: List[Dict[str, float]] = field(default_factory=list)
+
+    # Bronobjecten (als de arrays uit bestaande elementen gebouwd zijn)
+    _bron: Optional[List[StaalElement]] = field(default=None, repr=False, compare=False)
+    _rij_index: Optional[Dict[int, int]] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        n = len(self.ids)
+        self.extra_gewicht = np.bincount(self.item_element, weights=self.item_gewicht, minlength=n)
+        self.verwijder_tijd = np.bincount(self.item_element, weights=self.item_verwijder_tijd, minlength=n)
+
+    @classmethod
+    def van_elementen(cls, elementen: Iterable[StaalElement]) -> 'GebouwArrays':
+        """Bouw de arrays uit bestaande elementen (één pass)"""
+        tabel = get_profiel_tabel()
+        bron = list(elementen)
+        n = len(bron)
+
+        profiel_namen: List[str] = []
+        profiel_codes: Dict[str, int] = {}
+        condities = list(STANDAARD_CONDITIES)
+        conditie_codes = {c: i for i, c in enumerate(condities)}
+        item_typen: List[str] = []
+        item_codes: Dict[str, int] = {}
+
+        ids = np.empty(n, dtype=np.int64)
+        type_code = np.empty(n, dtype=np.int8)
+        profiel_code = np.empty(n, dtype=np.int32)
+        kwaliteit_code = np.empty(n, dtype=np.int8)
+        conditie_code = np.empty(n, dtype=np.int8)
+        coords = np.empty((n, 6), dtype=np.float64)
+        lengte = np.empty(n, dtype=np.float64)
+        rotatie = np.empty(n, dtype=np.float64)
+        gewicht_per_m = np.zeros(n, dtype=np.float64)
+        start_verb = np.empty(n, dtype=np.int8)
+        eind_verb = np.empty(n, dtype=np.int8)
+        item_element: List[int] = []
+        item_type: List[int] = []
+        item_gewicht: List[float] = []
+        item_tijd: List[float] = []
+        item_ids: List[int] = []
+        item_las: List[float] = []
+        item_positie: List[tuple] = []
+        item_beschrijving: List[str] = []
+        item_afmetingen: List[Dict[str, float]] = []
+
+        for rij, e in enumerate(bron):
+            ids[rij] = e.id
+            type_code[rij] = _TYPE_CODE[e.type.value]
+            code = profiel_codes.get(e.profiel_naam)
+            if code is None:
+                code = profiel_codes[e.profiel_naam] = len(profiel_namen)
+                profiel_namen.append(e.profiel_naam)
+            profiel_code[rij] = code
+            kwaliteit_code[rij] = _KWALITEIT_CODE[e.kwaliteit.value]
+            code = conditie_codes.get(e.conditie)
+            if code is None:
+                code = conditie_codes[e.conditie] = len(condities)
+                condities.append(e.conditie)
+            conditie_code[rij] = code
+            s, t = e.start_positie, e.eind_positie
+            coords[rij] = (s.x, s.y, s.z, t.x, t.y, t.z)
+            lengte[rij] = e.lengte
+            rotatie[rij] = e.rotatie
+            if e.profiel:
+                gewicht_per_m[rij] = e.profiel.afmetingen.gewicht_per_m
+            start_verb[rij] = _VERBINDING_CODE[e.start_verbinding.value]
+            eind_verb[rij] = _VERBINDING_CODE[e.eind_verbinding.value]
+
+            for item in e.aangelaste_items:
+                code = item_codes.get(item.type)
+                if code is None:
+                    code = item_codes[item.type] = len(item_typen)
+                    item_typen.append(item.type)
+                item_element.append(rij)
+                item_type.append(code)
+                item_gewicht.append(item.gewicht)
+                item_tijd.append(item.verwijder_tijd)
+                item_ids.append(item.id)
+                item_las.append(item.las_lengte)
+                item_positie.append(item.positie.naar_tuple())
+                item_beschrijving.append(item.beschrijving)
+                item_afmetingen.append(item.afmetingen)
+
+        profiel_rij = np.array(
+            [tabel.rij(naam) if naam in tabel else -1 for naam in profiel_namen],
+            dtype=np.int32
+        )
+
+        return cls(
+            ids=ids,
+            namen=[e.naam for e in bron],
+            type_code=type_code,
+            profiel_namen=profiel_namen,
+            profiel_code=profiel_code,
+            profiel_rij=profiel_rij[profiel_code] if n else np.zeros(0, dtype=np.int32),
+            kwaliteit_code=kwaliteit_code,
+            condities=condities,
+            conditie_code=conditie_code,
+            start=coords[:, :3],
+            eind=coords[:, 3:],
+            lengte=lengte,
+            rotatie=rotatie,
+            gewicht_per_m=gewicht_per_m,
+            start_verbinding_code=start_verb,
+            eind_verbinding_code=eind_verb,
+            opmerkingen=[e.opmerkingen for e in bron],
+            item_typen=item_typen,
+            item_element=np.asarray(item_element, dtype=np.int32),
+            item_type_code=np.asarray(item_type, dtype=np.int16),
+            item_gewicht=np.asarray(item_gewicht, dtype=np.float64),
+            item_verwijder_tijd=np.asarray(item_tijd, dtype=np.float64),
+            item_ids=np.asarray(item_ids, dtype=np.int64),
+            item_las_lengte=np.asarray(item_las, dtype=np.float64),
+            item_positie=np.asarray(item_positie, dtype=np.float64).reshape(-1, 3),
+            item_beschrijving=item_beschrijving,
+            item_afmetingen=item_afmetingen,
+            _bron=bron,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------
+    # Totalen (NumPy reducties)
+    # ------------------------------------------------------------
+
+    @property
+    def schoon_gewicht(self) -> np.ndarray:
+        """Gewicht basisprofiel per element (kg)"""
+        return self.gewicht_per_m * (self.lengte / 1000)
+
+    @property
+    def gewicht(self) -> np.ndarray:
+        """Gewicht inclusief aangelaste items per element (kg)"""
+        return self.schoon_gewicht + self.extra_gewicht
+
+    @property
+    def totaal_gewicht(self) -> float:
+        """Totaal gewicht van alle staal (kg)"""
+        return float(self.gewicht.sum())
+
+    @property
+    def totaal_schoon_gewicht(self) -> float:
+        """Gewicht van alleen basisprofielen (kg)"""
+        return float(self.schoon_gewicht.sum())
+
+    @property
+    def totale_verwijder_tijd(self) -> float:
+        """Tijd om alle aangelaste items te verwijderen (minuten)"""
+        return float(self.item_verwijder_tijd.sum())
+
+    def aantal_per_type(self) -> Dict[ElementType, int]:
+        """Aantal elementen per ElementType"""
+        aantallen = np.bincount(self.type_code, minlength=len(ELEMENT_TYPEN))
+        return {t: int(aantallen[i]) for i, t in enumerate(ELEMENT_TYPEN)}
+
+    # ------------------------------------------------------------
+    # Selecties
+    # ------------------------------------------------------------
+
+    def masker(self, *typen: ElementType) -> np.ndarray:
+        """Boolean masker van elementen van de gegeven typen"""
+        return np.isin(self.type_code, [_TYPE_CODE[t.value] for t in typen])
+
+    def balk_rijen(self) -> np.ndarray:
+        """Rijen van alle horizontale elementen"""
+        return np.flatnonzero(self.masker(*HORIZONTALE_TYPEN))
+
+    def kolom_rijen(self) -> np.ndarray:
+        """Rijen van alle verticale elementen"""
+        return np.flatnonzero(self.masker(ElementType.KOLOM))
+
+    def rij_van(self, element_id: int) -> Optional[int]:
+        """Rij van een element ID"""
+        if self._rij_index is None:
+            self._rij_index = {int(i): rij for rij, i in enumerate(self.ids.tolist())}
+        return self._rij_index.get(element_id)
+
+    # ------------------------------------------------------------
+    # Materialisatie
+    # ------------------------------------------------------------
+
+    def element(self, rij: int) -> StaalElement:
+        """Element object voor een rij (bestaand object of nieuw opgebouwd)"""
+        if self._bron is not None:
+            return self._bron[rij]
+        return self._bouw_elementen([int(rij)])[0]
+
+    def elementen(self, rijen: Optional[Sequence[int]] = None) -> Iterator[StaalElement]:
+        """Element objecten voor een reeks rijen (standaard: alle)"""
+        if rijen is None:
+            rijen = range(len(self))
+        if self._bron is None:
+            yield from self._bouw_elementen(rijen)
+            return
+        for rij in rijen:
+            yield self._bron[rij]
+
+    def _bouw_elementen(self, rijen: Sequence[int]) -> List[StaalElement]:
+        """Elementen opbouwen; per kolom één tolist() in plaats van NumPy scalars per veld"""
+        rijen = np.asarray(rijen, dtype=np.intp)
+        volgorde, offsets = self._item_index()
+        lo, hi = offsets[rijen], offsets[rijen + 1]
+        stukken = [volgorde[a:b] for a, b in zip(lo.tolist(), hi.tolist())]
+        items = self._bouw_items(np.concatenate(stukken) if stukken else volgorde[:0])
+        grenzen = np.concatenate([[0], np.cumsum(hi - lo)]).tolist()
+
+        profielen = [(naam, zoek_profiel(naam)) for naam in self.profiel_namen]
+        elementen = []
+        for (rij, eerste, laatste, id, type_code, profiel_code, kwaliteit_code, conditie_code,
+                start, eind, lengte, rotatie, start_code, eind_code) in zip(
+                    rijen.tolist(), grenzen[:-1], grenzen[1:],
+                    self.ids[rijen].tolist(), self.type_code[rijen].tolist(),
+                    self.profiel_code[rijen].tolist(), self.kwaliteit_code[rijen].tolist(),
+                    self.conditie_code[rijen].tolist(), self.start[rijen].tolist(),
+                    self.eind[rijen].tolist(), self.lengte[rijen].tolist(),
+                    self.rotatie[rijen].tolist(), self.start_verbinding_code[rijen].tolist(),
+                    self.eind_verbinding_code[rijen].tolist()):
+            profiel_naam, profiel = profielen[profiel_code]
+            elementen.append(StaalElement(
+                id=id,
+                naam=self.namen[rij],
+                type=ELEMENT_TYPEN[type_code],
+                profiel=profiel,
+                profiel_naam=profiel_naam,
+                kwaliteit=KWALITEITEN[kwaliteit_code],
+                start_positie=Positie3D(*start),
+                eind_positie=Positie3D(*eind),
+                lengte=lengte,
+                rotatie=rotatie,
+                start_verbinding=VERBINDING_TYPEN[start_code],
+                eind_verbinding=VERBINDING_TYPEN[eind_code],
+                aangelaste_items=items[eerste:laatste],
+                conditie=self.condities[conditie_code],
+                opmerkingen=self.opmerkingen[rij],
+            ))
+        return elementen
+
+    def _bouw_items(self, indices: np.ndarray) -> List[AangelastItem]:
+        """Aangelaste items voor een reeks item indices"""
+        return [
+            AangelastItem(
+                id=id,
+                type=self.item_typen[type_code],
+                beschrijving=self.item_beschrijving[i],
+                positie=Positie3D(*positie),
+                afmetingen=dict(self.item_afmetingen[i]),
+                gewicht=gewicht,
+                las_lengte=las_lengte,
+                verwijder_tijd=verwijder_tijd
+            )
+            for i, id, type_code, positie, gewicht, las_lengte, verwijder_tijd in zip(
+                indices.tolist(), self.item_ids[indices].tolist(),
+                self.item_type_code[indices].tolist(), self.item_positie[indices].tolist(),
+                self.item_gewicht[indices].tolist(), self.item_las_lengte[indices].tolist(),
+                self.item_verwijder_tijd[indices].tolist()
+            )
+        ]
+
+    def _item_index(self):
+        """Item indices gesorteerd op element, met offsets per rij (lui opgebouwd)"""
+        if not hasattr(self, "_item_volgorde"):
+            self._item_volgorde = np.argsort(self.item_element, kind="stable")
+            self._item_offsets = np.searchsorted(
+                self.item_element[self._item_volgorde], np.arange(len(self) + 1)
+            )
+        return self._item_volgorde, self._item_offsets
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_raster_gebouw
+
+    gebouw = maak_raster_gebouw(velden_x=30, velden_y=30, verdiepingen=3)
+    start = time.perf_counter()
+    arrays = gebouw.arrays
+    print(f"Arrays opgebouwd voor {len(arrays)} elementen in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        totaal = arrays.totaal_gewicht
+    print(f"Totaal gewicht: {totaal:.0f} kg "
+          f"({(time.perf_counter() - start) * 10:.2f} ms per berekening)")
+    print(f"Schoon gewicht: {arrays.totaal_schoon_gewicht:.0f} kg")
+    for element_type, aantal in arrays.aantal_per_type().items():
+        if aantal:
+            print(f"  {element_type.value}: {aantal}")
+
+    kopie = GebouwArrays(**{
+        f: getattr(arrays, f) for f in arrays.__dataclass_fields__ if not f.startswith("_")
+    })
+    e = kopie.element(int(kopie.kolom_rijen()[0]))
+    print(f"Gematerialiseerd: {e.naam} {e.profiel_naam}, {e.gewicht:.1f} kg, "
+          f"{len(e.aangelaste_items)} items")
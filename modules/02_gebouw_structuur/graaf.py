@@ -0,0 +1,173 @@
+"""
+Module 2: Gebouw Structuur - Verbindingsgraaf
+
+Adjacency structuur over de verbindingen van een gebouw: per element de
+buren met de verbindingen ertussen. Buren, graad en verbindingen van een
+element zijn dict lookups; verbindingen en elementen kunnen incrementeel
+verwijderd worden (bijv. tijdens het simuleren van een demontage).
+"""
+
+from collections import deque
+from typing import Dict, List, Iterable, Optional, Tuple
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import Verbinding
+
+
+class VerbindingsGraaf:
+    """Ongerichte multigraaf: elementen als knopen, verbindingen als kanten"""
+
+    def __init__(self, verbindingen: Iterable[Verbinding] = (), elementen: Iterable[int] = ()):
+        # element_id -> {buur_id: [verbindingen]}
+        self._buren: Dict[int, Dict[int, List[Verbinding]]] = {}
+        self._verbindingen: Dict[int, Verbinding] = {}
+        for element_id in elementen:
+            self.voeg_knoop_toe(element_id)
+        for verbinding in verbindingen:
+            self.voeg_verbinding_toe(verbinding)
+
+    # ------------------------------------------------------------
+    # Wijzigen
+    # ------------------------------------------------------------
+
+    def voeg_knoop_toe(self, element_id: int) -> None:
+        """Voeg een element toe (ook zonder verbindingen)"""
+        self._buren.setdefault(element_id, {})
+
+    def voeg_verbinding_toe(self, verbinding: Verbinding) -> None:
+        """Voeg een verbinding toe als kant"""
+        if verbinding.id in self._verbindingen:
+            return
+        self._verbindingen[verbinding.id] = verbinding
+        a, b = verbinding.element1_id, verbinding.element2_id
+        self._buren.setdefault(a, {}).setdefault(b, []).append(verbinding)
+        if a != b:
+            self._buren.setdefault(b, {}).setdefault(a, []).append(verbinding)
+
+    def verwijder_verbinding(self, verbinding_id: int) -> Optional[Verbinding]:
+        """Verwijder een kant; O(aantal verbindingen tussen de twee elementen)"""
+        verbinding = self._verbindingen.pop(verbinding_id, None)
+        if verbinding is None:
+            return None
+        a, b = verbinding.element1_id, verbinding.element2_id
+        for van, naar in ((a, b), (b, a)):
+            kanten = self._buren.get(van, {}).get(naar)
+            if kanten is None:
+                continue
+            kanten[:] = [v for v in kanten if v.id != verbinding_id]
+            if not kanten:
+                del self._buren[van][naar]
+        return verbinding
+
+    def verwijder_element(self, element_id: int) -> List[Verbinding]:
+        """Verwijder een element met al zijn verbindingen; geeft de verbindingen terug"""
+        buren = self._buren.pop(element_id, {})
+        verwijderd: List[Verbinding] = []
+        for buur_id, kanten in buren.items():
+            verwijderd.extend(kanten)
+            for v in kanten:
+                self._verbindingen.pop(v.id, None)
+            if buur_id != element_id:
+                self._buren.get(buur_id, {}).pop(element_id, None)
+        return verwijderd
+
+    # ------------------------------------------------------------
+    # Opvragen
+    # ------------------------------------------------------------
+
+    def __contains__(self, element_id: int) -> bool:
+        return element_id in self._buren
+
+    def __len__(self) -> int:
+        return len(self._buren)
+
+    @property
+    def aantal_verbindingen(self) -> int:
+        return len(self._verbindingen)
+
+    def graad(self, element_id: int) -> int:
+        """Aantal verbindingen van een element"""
+        return sum(len(kanten) for kanten in self._buren.get(element_id, {}).values())
+
+    def buren(self, element_id: int) -> List[int]:
+        """ID's van alle direct verbonden elementen"""
+        return [b for b in self._buren.get(element_id, {}) if b != element_id]
+
+    def verbindingen_van(self, element_id: int) -> List[Verbinding]:
+        """Alle verbindingen van een element"""
+        return [v for kanten in self._buren.get(element_id, {}).values() for v in kanten]
+
+    def verbindingen_tussen(self, element1_id: int, element2_id: int) -> List[Verbinding]:
+        """Verbindingen tussen twee elementen"""
+        return list(self._buren.get(element1_id, {}).get(element2_id, []))
+
+    def componenten(self) -> List[List[int]]:
+        """Samenhangende delen (grootste eerst)"""
+        gezien = set()
+        componenten: List[List[int]] = []
+        for begin in self._buren:
+            if begin in gezien:
+                continue
+            gezien.add(begin)
+            deel = [begin]
+            wachtrij = deque([begin])
+            while wachtrij:
+                for buur in self._buren[wachtrij.popleft()]:
+                    if buur not in gezien:
+                        gezien.add(buur)
+                        deel.append(buur)
+                        wachtrij.append(buur)
+            componenten.append(deel)
+        componenten.sort(key=len, reverse=True)
+        return componenten
+
+    def naar_csr(self, volgorde: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Export als CSR adjacency (voor gevectoriseerde algoritmen).
+
+        Args:
+            volgorde: element ID's per rij (standaard: alle knopen)
+
+        Returns:
+            (ids, indptr, indices): buren van rij i zijn indices[indptr[i]:indptr[i+1]]
+        """
+        ids = list(self._buren) if volgorde is None else list(volgorde)
+        rij_van = {element_id: i for i, element_id in enumerate(ids)}
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        indices: List[int] = []
+        for i, element_id in enumerate(ids):
+            buren = [rij_van[b] for b in self._buren.get(element_id, {}) if b in rij_van and b != element_id]
+            indices.extend(sorted(buren))
+            indptr[i + 1] = len(indices)
+        return np.asarray(ids, dtype=np.int64), indptr, np.asarray(indices, dtype=np.int64)
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, maak_raster_gebouw
+    from modules.m02_gebouw_structuur.verbindingen import detecteer_verbindingen
+
+    gebouw = maak_voorbeeld_gebouw()
+    detecteer_verbindingen(gebouw)
+    graaf = gebouw.graaf
+    kolom = next(e for e in gebouw.elementen.values() if e.naam == "K21")
+    print(f"{kolom.naam}: graad {graaf.graad(kolom.id)}, buren "
+          f"{[gebouw.elementen[b].naam for b in graaf.buren(kolom.id)]}")
+    print(f"Componenten: {[len(c) for c in graaf.componenten()]}")
+
+    gebouw.verwijder_element(kolom.id)
+    print(f"Na verwijderen {kolom.naam}: {graaf.aantal_verbindingen} verbindingen, "
+          f"componenten {[len(c) for c in gebouw.graaf.componenten()]}")
+
+    groot = maak_raster_gebouw(velden_x=40, velden_y=40, verdiepingen=4)
+    detecteer_verbindingen(groot)
+    start = time.perf_counter()
+    graaf = groot.graaf
+    ids = list(groot.elementen)
+    totaal = sum(graaf.graad(i) for i in ids)
+    duur = time.perf_counter() - start
+    print(f"{len(ids)} elementen, {graaf.aantal_verbindingen} verbindingen: "
+          f"graaf + alle graden in {duur * 1000:.0f} ms (gemiddeld {totaal / len(ids):.1f})")
@@ -0,0 +1,383 @@
+"""
+Module 2: Gebouw Structuur - Ruimtelijke index
+
+Uniform grid over de elementen van een gebouw. Elk element krijgt een
+AABB (as van start- naar eindpositie, vergroot met de halve doorsnede)
+en wordt ingedeeld in alle cellen die de AABB raakt. De cellen staan als
+gesorteerde sleutels met CSR offsets in NumPy arrays, zodat zowel het
+opbouwen als bulk queries gevectoriseerd zijn.
+"""
+
+from typing import Optional, List, Tuple, Union, Sequence
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m01_profiel_bibliotheek.profielen import get_profiel_tabel
+from modules.m02_gebouw_structuur.structuur import Positie3D, Gebouw
+from modules.m02_gebouw_structuur.arrays import GebouwArrays
+
+
+Punt = Union[Positie3D, Sequence[float], np.ndarray]
+
+_EPS = 1e-9
+
+
+def _als_array(punt: Punt) -> np.ndarray:
+    if isinstance(punt, Positie3D):
+        return np.array(punt.naar_tuple(), dtype=np.float64)
+    return np.asarray(punt, dtype=np.float64)
+
+
+# ============================================================
+# AFSTANDEN (gevectoriseerd)
+# ============================================================
+
+def punt_segment_afstanden(punt: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Afstand van punt(en) tot segmenten a-b; alle argumenten broadcasten over (..., 3)"""
+    ab = b - a
+    lengte2 = np.einsum("...i,...i->...", ab, ab)
+    t = np.einsum("...i,...i->...", punt - a, ab) / np.maximum(lengte2, _EPS)
+    t = np.clip(t, 0.0, 1.0)
+    dichtst = a + t[..., None] * ab
+    return np.linalg.norm(punt - dichtst, axis=-1)
+
+
+def segment_segment_afstanden(
+    p1: np.ndarray, q1: np.ndarray,
+    p2: np.ndarray, q2: np.ndarray
+) -> np.ndarray:
+    """
+    Kortste afstand tussen segmenten p1-q1 en p2-q2 (per rij, broadcast).
+
+    Gevectoriseerde versie van de klassieke clamp-methode (Ericson,
+    Real-Time Collision Detection, 5.1.9).
+    """
+    d1 = q1 - p1
+    d2 = q2 - p2
+    r = p1 - p2
+    a = np.einsum("...i,...i->...", d1, d1)
+    e = np.einsum("...i,...i->...", d2, d2)
+    f = np.einsum("...i,...i->...", d2, r)
+    c = np.einsum("...i,...i->...", d1, r)
+    b = np.einsum("...i,...i->...", d1, d2)
+
+    a_ok = a > _EPS
+    e_ok = e > _EPS
+    veilig_a = np.where(a_ok, a, 1.0)
+    veilig_e = np.where(e_ok, e, 1.0)
+
+    noemer = a * e - b * b
+    s = np.where(noemer > _EPS, np.clip((b * f - c * e) / np.where(noemer > _EPS, noemer, 1.0), 0, 1), 0.0)
+    t = (b * s + f) / veilig_e
+
+    # t buiten [0,1]: t clampen en s opnieuw bepalen
+    s = np.where(t < 0, np.clip(-c / veilig_a, 0, 1), np.where(t > 1, np.clip((b - c) / veilig_a, 0, 1), s))
+    t = np.clip(t, 0, 1)
+
+    # Gedegenereerde segmenten (punten)
+    s = np.where(e_ok, s, np.clip(-c / veilig_a, 0, 1))
+    t = np.where(e_ok, t, 0.0)
+    t = np.where(a_ok, t, np.clip(f / veilig_e, 0, 1))
+    s = np.where(a_ok, s, 0.0)
+    t = np.where(a_ok | e_ok, t, 0.0)
+
+    c1 = p1 + s[..., None] * d1
+    c2 = p2 + t[..., None] * d2
+    return np.linalg.norm(c1 - c2, axis=-1)
+
+
+# ============================================================
+# RUIMTELIJKE INDEX
+# ============================================================
+
+class RuimtelijkeIndex:
+    """
+    Uniform grid over element AABB's.
+
+    Afstanden tot een element worden gemeten tot de as (segment
+    start-eind) min de halve doorsnede, met 0 als ondergrens.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        start: np.ndarray,
+        eind: np.ndarray,
+        straal: np.ndarray,
+        celgrootte: Optional[float] = None,
+        arrays: Optional[GebouwArrays] = None
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.start = np.asarray(start, dtype=np.float64).reshape(-1, 3)
+        self.eind = np.asarray(eind, dtype=np.float64).reshape(-1, 3)
+        self.straal = np.asarray(straal, dtype=np.float64)
+        self.arrays = arrays  # bron, om te zien of de index nog actueel is
+
+        self.aabb_min = np.minimum(self.start, self.eind) - self.straal[:, None]
+        self.aabb_max = np.maximum(self.start, self.eind) + self.straal[:, None]
+        self.max_straal = float(self.straal.max()) if len(self.straal) else 0.0
+
+        if celgrootte is None:
+            celgrootte = self._standaard_celgrootte()
+        self.celgrootte = float(celgrootte)
+
+        if len(self.ids):
+            self.oorsprong = self.aabb_min.min(axis=0)
+            bovengrens = self.aabb_max.max(axis=0)
+        else:
+            self.oorsprong = bovengrens = np.zeros(3)
+        self.dims = np.floor((bovengrens - self.oorsprong) / self.celgrootte).astype(np.int64) + 1
+
+        self._bouw_cellen()
+
+    @classmethod
+    def van_arrays(cls, arrays: GebouwArrays, celgrootte: Optional[float] = None) -> 'RuimtelijkeIndex':
+        """Index over de kolomsgewijze opslag van een gebouw"""
+        tabel = get_profiel_tabel()
+        halve = np.maximum(tabel.kolom("hoogte"), tabel.kolom("breedte")) / 2
+        straal = np.where(arrays.profiel_rij >= 0, halve[np.maximum(arrays.profiel_rij, 0)], 0.0)
+        return cls(arrays.ids, arrays.start, arrays.eind, straal, celgrootte, arrays)
+
+    @classmethod
+    def van_gebouw(cls, gebouw: Gebouw, celgrootte: Optional[float] = None) -> 'RuimtelijkeIndex':
+        """Index over alle elementen van een gebouw"""
+        return cls.van_arrays(gebouw.arrays, celgrootte)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _standaard_celgrootte(self) -> float:
+        """Mediane grootste AABB afmeting: de meeste elementen beslaan 1-3 cellen"""
+        if not len(self.ids):
+            return 1.0
+        omvang = (self.aabb_max - self.aabb_min).max(axis=1)
+        return max(float(np.median(omvang)), 1.0)
+
+    # ------------------------------------------------------------
+    # Grid opbouw
+    # ------------------------------------------------------------
+
+    def _cel(self, punten: np.ndarray) -> np.ndarray:
+        """Celcoördinaten (geclipt op het grid)"""
+        cel = np.floor((punten - self.oorsprong) / self.celgrootte).astype(np.int64)
+        return np.clip(cel, 0, self.dims - 1)
+
+    def _cel_bereiken(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Alle cellen in de blokken lo..hi (inclusief), gevectoriseerd.
+
+        Returns:
+            (eigenaar, sleutel): per cel de index van het blok en de celsleutel
+        """
+        omvang = hi - lo + 1
+        aantallen = omvang.prod(axis=1)
+        eigenaar = np.repeat(np.arange(len(lo)), aantallen)
+        k = np.arange(int(aantallen.sum())) - np.repeat(np.cumsum(aantallen) - aantallen, aantallen)
+
+        nz = omvang[eigenaar, 2]
+        ny = omvang[eigenaar, 1]
+        k, dz = np.divmod(k, nz)
+        dx, dy = np.divmod(k, ny)
+        cx = lo[eigenaar, 0] + dx
+        cy = lo[eigenaar, 1] + dy
+        cz = lo[eigenaar, 2] + dz
+        return eigenaar, (cx * self.dims[1] + cy) * self.dims[2] + cz
+
+    def _bouw_cellen(self) -> None:
+        """CSR: gesorteerde celsleutels, offsets en element rijen"""
+        eigenaar, sleutels = self._cel_bereiken(self._cel(self.aabb_min), self._cel(self.aabb_max))
+        volgorde = np.argsort(sleutels, kind="stable")
+        sleutels = sleutels[volgorde]
+        self.cel_elementen = eigenaar[volgorde]
+        self.cel_sleutels, eerste = np.unique(sleutels, return_index=True)
+        self.cel_start = np.append(eerste, len(sleutels)).astype(np.int64)
+
+    def _rijen_in_cellen(self, eigenaar: np.ndarray, sleutels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Element rijen in de gegeven cellen, met het blok waar ze bij horen"""
+        pos = np.searchsorted(self.cel_sleutels, sleutels)
+        pos = np.minimum(pos, len(self.cel_sleutels) - 1)
+        bestaat = self.cel_sleutels[pos] == sleutels if len(self.cel_sleutels) else np.zeros(len(sleutels), bool)
+        eigenaar, pos = eigenaar[bestaat], pos[bestaat]
+
+        begin = self.cel_start[pos]
+        aantallen = self.cel_start[pos + 1] - begin
+        eigenaar = np.repeat(eigenaar, aantallen)
+        k = np.arange(int(aantallen.sum())) - np.repeat(np.cumsum(aantallen) - aantallen, aantallen)
+        return eigenaar, self.cel_elementen[np.repeat(begin, aantallen) + k]
+
+    def _kandidaten(self, minimum: np.ndarray, maximum: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Unieke (blok, rij) paren waarvan de AABB het blok overlapt.
+
+        Args:
+            minimum, maximum: (M, 3) query blokken
+        """
+        binnen = np.all((maximum >= self.oorsprong) & (minimum <= self.oorsprong + self.dims * self.celgrootte), axis=1)
+        blokken = np.flatnonzero(binnen)
+        if not len(blokken) or not len(self.ids):
+            leeg = np.zeros(0, dtype=np.int64)
+            return leeg, leeg
+
+        eigenaar, sleutels = self._cel_bereiken(self._cel(minimum[blokken]), self._cel(maximum[blokken]))
+        eigenaar, rijen = self._rijen_in_cellen(eigenaar, sleutels)
+        if not len(rijen):
+            # Alleen lege cellen geraakt
+            return eigenaar, rijen
+
+        # Elementen in meerdere cellen maar één keer
+        paar = np.sort(eigenaar * len(self.ids) + rijen)
+        paar = paar[np.r_[True, paar[1:] != paar[:-1]]]
+        eigenaar, rijen = np.divmod(paar, len(self.ids))
+        eigenaar = blokken[eigenaar]
+
+        overlapt = np.all(
+            (self.aabb_min[rijen] <= maximum[eigenaar]) & (self.aabb_max[rijen] >= minimum[eigenaar]),
+            axis=1
+        )
+        return eigenaar[overlapt], rijen[overlapt]
+
+    # ------------------------------------------------------------
+    # Queries (rijen)
+    # ------------------------------------------------------------
+
+    def rijen_in_box(self, minimum: Punt, maximum: Punt) -> np.ndarray:
+        """Rijen van elementen waarvan de AABB de box overlapt"""
+        _, rijen = self._kandidaten(_als_array(minimum)[None, :], _als_array(maximum)[None, :])
+        return rijen
+
+    def rijen_binnen_straal(self, punt: Punt, straal: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rijen en afstanden van elementen binnen straal van een punt"""
+        punten = _als_array(punt)[None, :]
+        _, rijen, afstanden = self.zoek_punten(punten, straal)
+        return rijen, afstanden
+
+    def zoek_punten(self, punten: np.ndarray, straal: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bulk straal query voor veel punten tegelijk.
+
+        Args:
+            punten: (M, 3) array
+            straal: zoekafstand in mm (tot het oppervlak van het element)
+
+        Returns:
+            (punt_index, rij, afstand) arrays voor alle gevonden paren
+        """
+        punten = np.asarray(punten, dtype=np.float64).reshape(-1, 3)
+        eigenaar, rijen = self._kandidaten(punten - straal, punten + straal)
+        afstanden = punt_segment_afstanden(punten[eigenaar], self.start[rijen], self.eind[rijen])
+        afstanden = np.maximum(afstanden - self.straal[rijen], 0.0)
+        binnen = afstanden <= straal
+        return eigenaar[binnen], rijen[binnen], afstanden[binnen]
+
+    def zoek_segmenten(
+        self,
+        begin: np.ndarray,
+        eind: np.ndarray,
+        afstand: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bulk segment-segment nabijheid.
+
+        Args:
+            begin, eind: (M, 3) query segmenten
+            afstand: maximale afstand tussen de oppervlakken (mm)
+
+        Returns:
+            (segment_index, rij, afstand) arrays voor alle gevonden paren
+        """
+        begin = np.asarray(begin, dtype=np.float64).reshape(-1, 3)
+        eind = np.asarray(eind, dtype=np.float64).reshape(-1, 3)
+        eigenaar, rijen = self._kandidaten(
+            np.minimum(begin, eind) - afstand, np.maximum(begin, eind) + afstand
+        )
+        afstanden = segment_segment_afstanden(
+            begin[eigenaar], eind[eigenaar], self.start[rijen], self.eind[rijen]
+        )
+        afstanden = np.maximum(afstanden - self.straal[rijen], 0.0)
+        binnen = afstanden <= afstand
+        return eigenaar[binnen], rijen[binnen], afstanden[binnen]
+
+    # ------------------------------------------------------------
+    # Queries (element ID's)
+    # ------------------------------------------------------------
+
+    def zoek_box(self, minimum: Punt, maximum: Punt) -> List[int]:
+        """ID's van elementen waarvan de AABB de box overlapt"""
+        return self.ids[np.sort(self.rijen_in_box(minimum, maximum))].tolist()
+
+    def zoek_straal(self, punt: Punt, straal: float) -> List[Tuple[int, float]]:
+        """(ID, afstand) van elementen binnen straal, dichtstbijzijnde eerst"""
+        rijen, afstanden = self.rijen_binnen_straal(punt, straal)
+        volgorde = np.lexsort((rijen, afstanden))
+        return list(zip(self.ids[rijen[volgorde]].tolist(), afstanden[volgorde].tolist()))
+
+    def zoek_dichtstbij(self, punt: Punt, k: int = 1) -> List[Tuple[int, float]]:
+        """
+        De k dichtstbijzijnde elementen: (ID, afstand).
+
+        Zoekt met een groeiende straal; elk element binnen de straal is
+        gevonden, dus zodra er k zijn, zijn dat de k dichtstbijzijnde.
+        """
+        if not len(self.ids) or k <= 0:
+            return []
+        punt = _als_array(punt)
+        k = min(k, len(self.ids))
+
+        # Afstand tot het grid plus de diagonaal: daarbinnen valt alles
+        buiten = np.maximum(self.oorsprong - punt, 0) + np.maximum(punt - (self.oorsprong + self.dims * self.celgrootte), 0)
+        max_straal = float(np.linalg.norm(buiten) + np.linalg.norm(self.dims * self.celgrootte))
+
+        straal = self.celgrootte / 2
+        while True:
+            rijen, afstanden = self.rijen_binnen_straal(punt, straal)
+            if len(rijen) >= k or straal >= max_straal:
+                break
+            straal *= 2
+
+        volgorde = np.lexsort((rijen, afstanden))[:k]
+        return list(zip(self.ids[rijen[volgorde]].tolist(), afstanden[volgorde].tolist()))
+
+    def zoek_nabij_segment(self, begin: Punt, eind: Punt, afstand: float) -> List[Tuple[int, float]]:
+        """(ID, afstand) van elementen binnen afstand van segment begin-eind"""
+        _, rijen, afstanden = self.zoek_segmenten(
+            _als_array(begin)[None, :], _als_array(eind)[None, :], afstand
+        )
+        volgorde = np.lexsort((rijen, afstanden))
+        return list(zip(self.ids[rijen[volgorde]].tolist(), afstanden[volgorde].tolist()))
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_raster_gebouw
+
+    gebouw = maak_raster_gebouw(velden_x=50, velden_y=50, verdiepingen=8)
+    arrays = gebouw.arrays
+    start = time.perf_counter()
+    index = RuimtelijkeIndex.van_arrays(arrays)
+    print(f"Index over {len(index)} elementen in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(index.cel_sleutels)} cellen van {index.celgrootte:.0f} mm)")
+
+    punt = Positie3D(12000, 16000, 6000)
+    start = time.perf_counter()
+    for _ in range(1000):
+        resultaat = index.zoek_straal(punt, 500)
+    print(f"Straal 500 mm rond {punt.naar_tuple()}: {len(resultaat)} elementen "
+          f"({(time.perf_counter() - start) * 1000:.0f} µs per query)")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        dichtst = index.zoek_dichtstbij(Positie3D(15000, 20000, 3000), k=3)
+    print(f"3 dichtstbij: {[(gebouw.elementen[i].naam, round(d)) for i, d in dichtst]} "
+          f"({(time.perf_counter() - start) * 1000:.0f} µs per query)")
+
+    box = index.zoek_box((0, 0, 0), (6000, 8000, 6000))
+    print(f"Box eerste veld: {len(box)} elementen")
+
+    # Alle kolomvoeten tegelijk
+    kolommen = arrays.kolom_rijen()
+    start = time.perf_counter()
+    punt_idx, rijen, _ = index.zoek_punten(arrays.start[kolommen], 50)
+    print(f"Bulk: {len(kolommen)} kolomvoeten, {len(rijen)} treffers in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
@@ -4,15 +4,15 @@ Module 2: Gebouw Structuur & BIM
 Definieert staalstructuren met balken, kolommen en verbindingen.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Optional, List, Dict, Tuple
-from uuid import uuid4
+from typing import Optional, List, Dict, Tuple, Iterable
 from datetime import date
 import json
 
 import sys
 sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str
 from modules.m01_profiel_bibliotheek.profielen import (
     StaalProfiel, ProfielType, StaalKwaliteit, zoek_profiel
 )
@@ -35,9 +35,9 @@ class VerbindingType(Enum):
     SCHARNIER = "scharnier"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Positie3D:
-    """3D positie in mm"""
+    """3D positie in mm (onveranderlijk)"""
     x: float = 0
     y: float = 0
     z: float = 0
@@ -51,10 +51,10 @@ class Positie3D:
                 (self.z - andere.z)**2) ** 0.5
 
 
-@dataclass
+@dataclass(slots=True)
 class AangelastItem:
     """Een item dat aan een balk is gelast"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     type: str = ""  # "schot", "plaat", "strip", "bout_plaat", "anker"
     beschrijving: str = ""
     positie: Positie3D = field(default_factory=Positie3D)
@@ -64,10 +64,89 @@ class AangelastItem:
     verwijder_tijd: float = 0  # minuten geschatte tijd om te verwijderen
 
 
-@dataclass
+class ItemLijst(list):
+    """Lijst van aangelaste items die het element op de hoogte houdt van wijzigingen"""
+    __slots__ = ("_element",)
+    
+    @classmethod
+    def van(cls, element: "StaalElement", items=()) -> "ItemLijst":
+        """Items van een element (list() in C, daarna alleen de koppeling)"""
+        lijst = cls(items)
+        lijst._element = element
+        return lijst
+    
+    def _gewijzigd(self) -> None:
+        # Bij unpickling worden de items toegevoegd voordat _element bestaat
+        element = getattr(self, "_element", None)
+        if element is not None:
+            element.herbereken_items()
+    
+    def append(self, item):
+        super().append(item)
+        self._gewijzigd()
+    
+    def extend(self, items):
+        super().extend(items)
+        self._gewijzigd()
+    
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._gewijzigd()
+    
+    def remove(self, item):
+        super().remove(item)
+        self._gewijzigd()
+    
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._gewijzigd()
+        return item
+    
+    def clear(self):
+        super().clear()
+        self._gewijzigd()
+    
+    def __setitem__(self, index, item):
+        super().__setitem__(index, item)
+        self._gewijzigd()
+    
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._gewijzigd()
+    
+    def __iadd__(self, items):
+        super().__iadd__(items)
+        self._gewijzigd()
+        return self
+    
+    def __reduce_ex__(self, protocol):
+        # Als gewone lijst kopiëren/pickelen; het element wikkelt hem weer in
+        return (list, (list(self),))
+
+
+_zet_veld = object.__setattr__
+
+# Velden van StaalElement die de totalen van het gebouw beïnvloeden
+_AGGREGAAT_VELDEN = frozenset({"aangelaste_items", "lengte", "profiel", "type"})
+# Typen die get_balken teruggeeft
+_HORIZONTALE_TYPEN = frozenset({ElementType.BALK, ElementType.LIGGER, ElementType.VLOERLIGGER})
+# Overige velden die in GebouwArrays staan
+_ARRAY_VELDEN = frozenset({
+    "naam", "profiel_naam", "kwaliteit", "start_positie", "eind_positie", "rotatie",
+    "start_verbinding", "eind_verbinding", "conditie", "opmerkingen"
+})
+
+
+@dataclass(slots=True)
 class StaalElement:
     """Een stalen constructie-element (balk, kolom, etc.)"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    # Gebouw dat de totalen bijhoudt en gecachete sommen over aangelaste_items;
+    # als eerste gezet, zodat __setattr__ ze tijdens __init__ al kan lezen
+    _gebouw: Optional["Gebouw"] = field(default=None, init=False, repr=False, compare=False)
+    _extra_gewicht: float = field(default=0.0, init=False, repr=False, compare=False)
+    _verwijder_tijd: float = field(default=0.0, init=False, repr=False, compare=False)
+    
+    id: int = field(default_factory=nieuw_id)
     naam: str = ""
     type: ElementType = ElementType.BALK
     profiel: Optional[StaalProfiel] = None
@@ -97,14 +176,64 @@ class StaalElement:
         if not self.profiel and self.profiel_naam:
             self.profiel = zoek_profiel(self.profiel_naam)
     
+    def __setattr__(self, naam, waarde):
+        if naam == "aangelaste_items":
+            if type(waarde) is not ItemLijst:
+                waarde = ItemLijst.van(self, waarde)
+        elif naam == "_gebouw" or self._gebouw is None:
+            # Geen gebouw om bij te werken (ook tijdens __init__)
+            _zet_veld(self, naam, waarde)
+            return
+        gebouw = self._gebouw
+        if naam not in _AGGREGAAT_VELDEN:
+            object.__setattr__(self, naam, waarde)
+            if naam in _ARRAY_VELDEN:
+                gebouw._arrays = None
+            return
+        if gebouw is not None:
+            gebouw._trek_af(self)
+        object.__setattr__(self, naam, waarde)
+        if naam == "aangelaste_items":
+            self._tel_items()
+        if gebouw is not None:
+            gebouw._tel_op(self)
+    
+    def _tel_items(self) -> None:
+        extra = tijd = 0
+        for item in self.aangelaste_items:
+            extra += item.gewicht
+            tijd += item.verwijder_tijd
+        self._extra_gewicht = extra
+        self._verwijder_tijd = tijd
+    
+    def __getstate__(self):
+        # Zonder koppeling naar het gebouw; item sommen worden opnieuw geteld
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+    
+    def __setstate__(self, staat):
+        object.__setattr__(self, "_gebouw", None)
+        for naam, waarde in staat.items():
+            setattr(self, naam, waarde)
+        self.herbereken_items()
+    
+    def herbereken_items(self) -> None:
+        """
+        Werk de gecachete item sommen bij.
+        
+        Gebeurt automatisch bij wijzigen van aangelaste_items; aanroepen
+        na het direct aanpassen van een item (bijv. item.gewicht).
+        """
+        gebouw = self._gebouw
+        if gebouw is not None:
+            gebouw._trek_af(self)
+        self._tel_items()
+        if gebouw is not None:
+            gebouw._tel_op(self)
+    
     @property
     def gewicht(self) -> float:
         """Totaal gewicht inclusief aangelaste items (kg)"""
-        basis = 0
-        if self.profiel:
-            basis = self.profiel.afmetingen.gewicht_per_m * (self.lengte / 1000)
-        extra = sum(item.gewicht for item in self.aangelaste_items)
-        return basis + extra
+        return self.schoon_gewicht + self._extra_gewicht
     
     @property
     def schoon_gewicht(self) -> float:
@@ -116,15 +245,15 @@ class StaalElement:
     @property
     def totale_verwijder_tijd(self) -> float:
         """Geschatte tijd om alle aangelaste items te verwijderen (minuten)"""
-        return sum(item.verwijder_tijd for item in self.aangelaste_items)
+        return self._verwijder_tijd
 
 
 @dataclass
 class Verbinding:
     """Verbinding tussen twee elementen"""
-    id: str = field(default_factory=lambda: str(uuid4()))
-    element1_id: str = ""
-    element2_id: str = ""
+    id: int = field(default_factory=nieuw_id)
+    element1_id: int = 0
+    element2_id: int = 0
     type: VerbindingType = VerbindingType.GEBOUT
     positie: Positie3D = field(default_factory=Positie3D)
     
@@ -138,16 +267,90 @@ class Verbinding:
     demontage_methode: str = ""  # "losschroeven", "snijden", "slijpen"
 
 
+class VerbindingLijst(list):
+    """
+    Verbindingen van een gebouw; wijzigen buiten de Gebouw methodes om
+    gooit de verbindingsgraaf weg.
+    """
+    __slots__ = ("_gebouw",)
+    
+    @classmethod
+    def van(cls, gebouw: "Gebouw", verbindingen=()) -> "VerbindingLijst":
+        lijst = cls(verbindingen)
+        lijst._gebouw = gebouw
+        return lijst
+    
+    def _gewijzigd(self) -> None:
+        gebouw = getattr(self, "_gebouw", None)
+        if gebouw is not None:
+            gebouw._graaf = None
+    
+    def append(self, verbinding):
+        super().append(verbinding)
+        self._gewijzigd()
+    
+    def extend(self, verbindingen):
+        super().extend(verbindingen)
+        self._gewijzigd()
+    
+    def insert(self, index, verbinding):
+        super().insert(index, verbinding)
+        self._gewijzigd()
+    
+    def remove(self, verbinding):
+        super().remove(verbinding)
+        self._gewijzigd()
+    
+    def pop(self, index=-1):
+        verbinding = super().pop(index)
+        self._gewijzigd()
+        return verbinding
+    
+    def clear(self):
+        super().clear()
+        self._gewijzigd()
+    
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._gewijzigd()
+    
+    def reverse(self):
+        super().reverse()
+        self._gewijzigd()
+    
+    def __setitem__(self, index, verbinding):
+        super().__setitem__(index, verbinding)
+        self._gewijzigd()
+    
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._gewijzigd()
+    
+    def __iadd__(self, verbindingen):
+        super().__iadd__(verbindingen)
+        self._gewijzigd()
+        return self
+    
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._gewijzigd()
+        return self
+    
+    def __reduce_ex__(self, protocol):
+        # Als gewone lijst kopiëren/pickelen; het gebouw wikkelt hem weer in
+        return (list, (list(self),))
+
+
 @dataclass
 class Gebouw:
     """Complete gebouwstructuur"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     naam: str = ""
     adres: str = ""
     bouwjaar: Optional[int] = None
     
     # Structuur
-    elementen: Dict[str, StaalElement] = field(default_factory=dict)
+    elementen: Dict[int, StaalElement] = field(default_factory=dict)
     verbindingen: List[Verbinding] = field(default_factory=list)
     
     # Metadata
@@ -155,41 +358,248 @@ class Gebouw:
     laatst_geinspecteerd: Optional[date] = None
     documentatie: List[str] = field(default_factory=list)  # paden naar docs
     
+    # Kolomsgewijze opslag, opgebouwd bij eerste gebruik
+    _arrays: Optional["GebouwArrays"] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Ruimtelijke index, hoort bij één versie van _arrays
+    _index: Optional["RuimtelijkeIndex"] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Verbindingsgraaf, in sync gehouden door voeg_verbinding_toe/verwijder_verbinding;
+    # hoort bij de positie per verbinding id in self.verbindingen
+    _graaf: Optional["VerbindingsGraaf"] = field(default=None, init=False, repr=False, compare=False)
+    _positie: Dict[int, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    # Lopende totalen, bijgewerkt door voeg_element_toe en element/item wijzigingen
+    _totaal_gewicht: float = field(default=0.0, init=False, repr=False, compare=False)
+    _totaal_schoon_gewicht: float = field(default=0.0, init=False, repr=False, compare=False)
+    _totale_verwijder_tijd: float = field(default=0.0, init=False, repr=False, compare=False)
+    _aantal_per_type: Dict[ElementType, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _aggregaten_geldig: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.verbindingen = VerbindingLijst.van(self, self.verbindingen)
+        for element in self.elementen.values():
+            element._gebouw = self
+    
+    def __setstate__(self, staat):
+        self.__dict__.update(staat)
+        self.verbindingen = VerbindingLijst.van(self, self.verbindingen)
+        self._graaf = None
+        for element in self.elementen.values():
+            element._gebouw = self
+    
     def voeg_element_toe(self, element: StaalElement) -> None:
         """Voeg een staal element toe aan het gebouw"""
+        bestaand = self.elementen.get(element.id)
+        if bestaand is not None:
+            self._trek_af(bestaand)
+            bestaand._gebouw = None
         self.elementen[element.id] = element
+        element._gebouw = self
+        self._tel_op(element)
+        if self._graaf is not None:
+            self._graaf.voeg_knoop_toe(element.id)
+    
+    def verwijder_element(self, element_id: int) -> Optional[StaalElement]:
+        """Verwijder een element uit het gebouw, met al zijn verbindingen"""
+        element = self.elementen.pop(element_id, None)
+        if element is None:
+            return None
+        self._trek_af(element)
+        element._gebouw = None
+        
+        self._haal_uit_lijst(v.id for v in self.graaf.verwijder_element(element_id))
+        return element
+    
+    # ------------------------------------------------------------
+    # Lopende totalen
+    # ------------------------------------------------------------
+    
+    def _tel_op(self, element: StaalElement) -> None:
+        """Bijdrage van een element optellen bij de totalen"""
+        self._arrays = None
+        if not self._aggregaten_geldig:
+            return
+        schoon = element.schoon_gewicht
+        self._totaal_gewicht += schoon + element._extra_gewicht
+        self._totaal_schoon_gewicht += schoon
+        self._totale_verwijder_tijd += element._verwijder_tijd
+        self._aantal_per_type[element.type] = self._aantal_per_type.get(element.type, 0) + 1
+    
+    def _trek_af(self, element: StaalElement) -> None:
+        """Bijdrage van een element aftrekken van de totalen"""
+        self._arrays = None
+        if not self._aggregaten_geldig:
+            return
+        schoon = element.schoon_gewicht
+        self._totaal_gewicht -= schoon + element._extra_gewicht
+        self._totaal_schoon_gewicht -= schoon
+        self._totale_verwijder_tijd -= element._verwijder_tijd
+        self._aantal_per_type[element.type] -= 1
+    
+    def _herbereken_aggregaten(self) -> None:
+        """Alle totalen opnieuw berekenen (één pass over de elementen)"""
+        gewicht = schoon_gewicht = verwijder_tijd = 0.0
+        aantal_per_type = {t: 0 for t in ElementType}
+        for element in self.elementen.values():
+            element._gebouw = self
+            schoon = element.schoon_gewicht
+            gewicht += schoon + element._extra_gewicht
+            schoon_gewicht += schoon
+            verwijder_tijd += element._verwijder_tijd
+            aantal_per_type[element.type] = aantal_per_type.get(element.type, 0) + 1
+        
+        self._totaal_gewicht = gewicht
+        self._totaal_schoon_gewicht = schoon_gewicht
+        self._totale_verwijder_tijd = verwijder_tijd
+        self._aantal_per_type = aantal_per_type
+        self._aggregaten_geldig = True
+    
+    def invalideer_aggregaten(self) -> None:
+        """
+        Laat totalen en kolomsgewijze opslag opnieuw berekenen.
+        
+        Nodig na wijzigingen buiten de hooks om, bijv. direct in
+        self.elementen schrijven of een item aanpassen zonder
+        element.herbereken_items(). De item sommen per element worden
+        hier direct opnieuw geteld.
+        """
+        for element in self.elementen.values():
+            element._tel_items()
+        self._aggregaten_geldig = False
+        self._arrays = None
+    
+    def _zorg_voor_aggregaten(self) -> None:
+        if not self._aggregaten_geldig:
+            self._herbereken_aggregaten()
+    
+    @property
+    def arrays(self) -> "GebouwArrays":
+        """
+        Kolomsgewijze opslag van alle elementen (NumPy arrays).
+        
+        Wordt opnieuw opgebouwd na wijzigingen via voeg_element_toe of de
+        element hooks; anders na invalideer_arrays().
+        """
+        if self._arrays is None:
+            from modules.m02_gebouw_structuur.arrays import GebouwArrays
+            self._arrays = GebouwArrays.van_elementen(self.elementen.values())
+        return self._arrays
+    
+    @property
+    def ruimtelijke_index(self) -> "RuimtelijkeIndex":
+        """Uniform grid over de elementen, opnieuw opgebouwd als de arrays wijzigen"""
+        arrays = self.arrays
+        if self._index is None or self._index.arrays is not arrays:
+            from modules.m02_gebouw_structuur.ruimtelijk import RuimtelijkeIndex
+            self._index = RuimtelijkeIndex.van_arrays(arrays)
+        return self._index
+    
+    def invalideer_arrays(self) -> None:
+        """Gooi de kolomsgewijze opslag weg (na wijzigen van elementen)"""
+        self._arrays = None
     
     def voeg_verbinding_toe(self, verbinding: Verbinding) -> None:
         """Voeg een verbinding toe"""
-        self.verbindingen.append(verbinding)
+        lijst = self._verbinding_lijst()
+        list.append(lijst, verbinding)
+        if self._graaf is not None:
+            self._graaf.voeg_verbinding_toe(verbinding)
+            self._positie.setdefault(verbinding.id, len(lijst) - 1)
+    
+    def verwijder_verbinding(self, verbinding_id: int) -> Optional[Verbinding]:
+        """
+        Verwijder een verbinding in O(1).
+        
+        De laatste verbinding schuift naar de vrijgekomen plek, dus de
+        volgorde van self.verbindingen blijft niet behouden.
+        """
+        verbinding = self.graaf.verwijder_verbinding(verbinding_id)
+        if verbinding is not None:
+            self._haal_uit_lijst((verbinding_id,))
+        return verbinding
+    
+    def _verbinding_lijst(self) -> VerbindingLijst:
+        """self.verbindingen, opnieuw ingepakt als de lijst vervangen is"""
+        lijst = self.verbindingen
+        if type(lijst) is not VerbindingLijst or lijst._gebouw is not self:
+            lijst = self.verbindingen = VerbindingLijst.van(self, lijst)
+            self._graaf = None
+        return lijst
     
-    def get_element(self, element_id: str) -> Optional[StaalElement]:
+    def _haal_uit_lijst(self, verbinding_ids: Iterable[int]) -> None:
+        """Verbindingen (al uit de graaf) uit self.verbindingen halen"""
+        lijst = self.verbindingen
+        positie = self._positie
+        for verbinding_id in verbinding_ids:
+            i = positie.pop(verbinding_id)
+            laatste = list.pop(lijst)
+            if i < len(lijst):
+                list.__setitem__(lijst, i, laatste)
+                positie[laatste.id] = i
+    
+    @property
+    def graaf(self) -> "VerbindingsGraaf":
+        """
+        Adjacency over de verbindingen (buren, graad, componenten).
+        
+        Wordt opnieuw opgebouwd als self.verbindingen buiten
+        voeg_verbinding_toe/verwijder_verbinding om gewijzigd of vervangen is.
+        """
+        lijst = self._verbinding_lijst()
+        if self._graaf is None:
+            from modules.m02_gebouw_structuur.graaf import VerbindingsGraaf
+            self._graaf = VerbindingsGraaf(lijst, self.elementen)
+            self._positie = {v.id: i for i, v in enumerate(lijst)}
+        return self._graaf
+    
+    def get_element(self, element_id: int) -> Optional[StaalElement]:
         """Haal element op met ID"""
         return self.elementen.get(element_id)
     
     def get_balken(self) -> List[StaalElement]:
         """Alle horizontale elementen"""
-        return [e for e in self.elementen.values() 
-                if e.type in [ElementType.BALK, ElementType.LIGGER, ElementType.VLOERLIGGER]]
+        # Bestaande arrays gebruiken, maar niet opnieuw opbouwen voor één selectie
+        arrays = self._arrays
+        if arrays is not None:
+            return list(arrays.elementen(arrays.balk_rijen()))
+        return [e for e in self.elementen.values() if e.type in _HORIZONTALE_TYPEN]
     
     def get_kolommen(self) -> List[StaalElement]:
         """Alle verticale elementen"""
+        arrays = self._arrays
+        if arrays is not None:
+            return list(arrays.elementen(arrays.kolom_rijen()))
         return [e for e in self.elementen.values() if e.type == ElementType.KOLOM]
     
     @property
     def totaal_gewicht(self) -> float:
         """Totaal gewicht van alle staal (kg)"""
-        return sum(e.gewicht for e in self.elementen.values())
+        self._zorg_voor_aggregaten()
+        return self._totaal_gewicht
     
     @property
     def totaal_schoon_gewicht(self) -> float:
         """Gewicht van alleen basisprofielen (kg)"""
-        return sum(e.schoon_gewicht for e in self.elementen.values())
+        self._zorg_voor_aggregaten()
+        return self._totaal_schoon_gewicht
+    
+    @property
+    def totale_verwijder_tijd(self) -> float:
+        """Tijd om alle aangelaste items te verwijderen (minuten)"""
+        self._zorg_voor_aggregaten()
+        return self._totale_verwijder_tijd
+    
+    @property
+    def aantal_per_type(self) -> Dict[ElementType, int]:
+        """Aantal elementen per ElementType"""
+        self._zorg_voor_aggregaten()
+        return dict(self._aantal_per_type)
     
     def naar_dict(self) -> dict:
         """Exporteer naar dictionary (voor JSON)"""
         return {
-            "id": self.id,
+            "id": id_naar_str(self.id),
             "naam": self.naam,
             "adres": self.adres,
             "bouwjaar": self.bouwjaar,
@@ -197,7 +607,7 @@ class Gebouw:
             "aantal_elementen": len(self.elementen),
             "elementen": [
                 {
-                    "id": e.id,
+                    "id": id_naar_str(e.id),
                     "naam": e.naam,
                     "type": e.type.value,
                     "profiel": e.profiel_naam,
@@ -282,6 +692,101 @@ def maak_voorbeeld_gebouw() -> Gebouw:
     return gebouw
 
 
+
+def maak_raster_gebouw(
+    velden_x: int = 10,
+    velden_y: int = 10,
+    verdiepingen: int = 1,
+    overspanning_x: float = 6000,
+    overspanning_y: float = 8000,
+    verdiepingshoogte: float = 6000,
+    liggers_per_veld: int = 2,
+    naam: str = "Raster hal"
+) -> Gebouw:
+    """
+    Genereer een regelmatige hal (kolommen, hoofdliggers en liggers).
+    
+    Bedoeld voor grote testmodellen: 50 x 50 velden met 5 verdiepingen
+    geeft ruim 50.000 elementen.
+    """
+    gebouw = Gebouw(naam=naam, adres="Gegenereerd", bouwjaar=1985)
+    
+    for v in range(verdiepingen):
+        z0 = v * verdiepingshoogte
+        z1 = z0 + verdiepingshoogte
+        
+        # Kolommen op elk rasterpunt
+        for i in range(velden_x + 1):
+            for j in range(velden_y + 1):
+                kolom = StaalElement(
+                    naam=f"K{v+1}.{i+1}.{j+1}",
+                    type=ElementType.KOLOM,
+                    profiel_naam="HEB 200",
+                    kwaliteit=StaalKwaliteit.S355,
+                    start_positie=Positie3D(i * overspanning_x, j * overspanning_y, z0),
+                    eind_positie=Positie3D(i * overspanning_x, j * overspanning_y, z1),
+                    lengte=verdiepingshoogte
+                )
+                if v == 0:
+                    kolom.aangelaste_items.append(AangelastItem(
+                        type="voetplaat",
+                        beschrijving="Voetplaat 300x300x20",
+                        afmetingen={"L": 300, "B": 300, "H": 20},
+                        gewicht=14.1,
+                        las_lengte=800,
+                        verwijder_tijd=15
+                    ))
+                kolom.aangelaste_items.append(AangelastItem(
+                    type="kopplaat",
+                    beschrijving="Kopplaat 200x200x15",
+                    afmetingen={"L": 200, "B": 200, "H": 15},
+                    gewicht=4.7,
+                    las_lengte=400,
+                    verwijder_tijd=10
+                ))
+                gebouw.voeg_element_toe(kolom)
+        
+        # Hoofdliggers in x-richting op de kolomkoppen
+        for j in range(velden_y + 1):
+            for i in range(velden_x):
+                balk = StaalElement(
+                    naam=f"HB{v+1}.{i+1}.{j+1}",
+                    type=ElementType.BALK,
+                    profiel_naam="HEA 300",
+                    kwaliteit=StaalKwaliteit.S355,
+                    start_positie=Positie3D(i * overspanning_x, j * overspanning_y, z1),
+                    eind_positie=Positie3D((i+1) * overspanning_x, j * overspanning_y, z1),
+                    lengte=overspanning_x
+                )
+                for k in range(2):
+                    balk.aangelaste_items.append(AangelastItem(
+                        type="schot",
+                        beschrijving=f"Verstijvingsschot {k+1}",
+                        afmetingen={"L": 280, "B": 280, "H": 10},
+                        gewicht=6.2,
+                        las_lengte=1000,
+                        verwijder_tijd=12
+                    ))
+                gebouw.voeg_element_toe(balk)
+        
+        # Liggers in y-richting, opgelegd op de hoofdliggers
+        for i in range(velden_x):
+            for j in range(velden_y):
+                for k in range(liggers_per_veld):
+                    x = i * overspanning_x + (k + 1) * overspanning_x / (liggers_per_veld + 1)
+                    ligger = StaalElement(
+                        naam=f"L{v+1}.{i+1}.{j+1}.{k+1}",
+                        type=ElementType.LIGGER,
+                        profiel_naam="IPE 200",
+                        kwaliteit=StaalKwaliteit.S235,
+                        start_positie=Positie3D(x, j * overspanning_y, z1),
+                        eind_positie=Positie3D(x, (j+1) * overspanning_y, z1),
+                        lengte=overspanning_y
+                    )
+                    gebouw.voeg_element_toe(ligger)
+    
+    return gebouw
+
 if __name__ == "__main__":
     gebouw = maak_voorbeeld_gebouw()
     print(f"Gebouw: {gebouw.naam}")
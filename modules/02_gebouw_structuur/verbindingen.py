@@ -0,0 +1,145 @@
+"""
+Module 2: Gebouw Structuur - Verbindingen detecteren
+
+Leidt verbindingen af uit de geometrie: een eindpunt van een element dat
+binnen de tolerantie tegen een ander element ligt, is een verbinding.
+Via de ruimtelijke index worden alleen elementen in dezelfde gridcellen
+vergeleken, zodat de doorlooptijd bijna lineair is in het aantal
+elementen.
+"""
+
+from typing import List
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import (
+    VerbindingType, Positie3D, Verbinding, Gebouw
+)
+from modules.m02_gebouw_structuur.arrays import VERBINDING_TYPEN
+
+
+# Bij verschillende typen aan weerszijden wint het zwaarste type
+TYPE_PRIORITEIT = {
+    VerbindingType.SCHARNIER: 0,
+    VerbindingType.GEBOUT: 1,
+    VerbindingType.MOMENTVAST: 2,
+    VerbindingType.GELAST: 3,
+}
+
+DEMONTAGE_METHODE = {
+    VerbindingType.GELAST: "snijden",
+    VerbindingType.GEBOUT: "losschroeven",
+    VerbindingType.MOMENTVAST: "losschroeven",
+    VerbindingType.SCHARNIER: "losschroeven",
+}
+
+
+def detecteer_verbindingen(
+    gebouw: Gebouw,
+    tolerantie_mm: float = 50.0,
+    toevoegen: bool = True
+) -> List[Verbinding]:
+    """
+    Vind verbindingen tussen elementen op basis van geometrie.
+
+    Een eindpunt raakt een ander element als de afstand tot diens as
+    hoogstens de tolerantie plus de halve doorsnede is. Elk paar
+    elementen levert één verbinding op; paren die al in
+    gebouw.verbindingen staan worden overgeslagen.
+
+    Args:
+        gebouw: Gebouw met elementen
+        tolerantie_mm: Maximale spleet tussen eindpunt en element
+        toevoegen: Nieuwe verbindingen ook aan het gebouw toevoegen
+
+    Returns:
+        Lijst van nieuwe verbindingen
+    """
+    arrays = gebouw.arrays
+    n = len(arrays)
+    if n < 2:
+        return []
+    index = gebouw.ruimtelijke_index
+
+    # Alle eindpunten in één bulk query
+    punten = np.concatenate([arrays.start, arrays.eind])
+    eigenaar = np.concatenate([np.arange(n), np.arange(n)])
+    type_code = np.concatenate([arrays.start_verbinding_code, arrays.eind_verbinding_code])
+
+    punt_idx, rij, afstand = index.zoek_punten(punten, tolerantie_mm)
+    van = eigenaar[punt_idx]
+    anders = van != rij
+    punt_idx, van, rij, afstand = punt_idx[anders], van[anders], rij[anders], afstand[anders]
+    if not len(van):
+        return []
+
+    # Ongeordende paren; per paar wint het dichtstbijzijnde eindpunt
+    paar = np.minimum(van, rij) * n + np.maximum(van, rij)
+    volgorde = np.lexsort((afstand, paar))
+    paar, punt_idx, van, rij = paar[volgorde], punt_idx[volgorde], van[volgorde], rij[volgorde]
+    groep_start = np.flatnonzero(np.r_[True, paar[1:] != paar[:-1]])
+
+    # Verbindingstype: zwaarste type van alle eindpunten die het paar raken
+    rang = np.array([TYPE_PRIORITEIT[t] for t in VERBINDING_TYPEN])
+    per_rang = sorted(TYPE_PRIORITEIT, key=TYPE_PRIORITEIT.get)
+    type_rang = np.maximum.reduceat(rang[type_code[punt_idx]], groep_start)
+
+    bestaand = {
+        (min(v.element1_id, v.element2_id), max(v.element1_id, v.element2_id))
+        for v in gebouw.verbindingen
+    }
+
+    ids1 = arrays.ids[van[groep_start]].tolist()
+    ids2 = arrays.ids[rij[groep_start]].tolist()
+    posities = punten[punt_idx[groep_start]].tolist()
+
+    nieuwe: List[Verbinding] = []
+    for id1, id2, positie, r in zip(ids1, ids2, posities, type_rang.tolist()):
+        sleutel = (id1, id2) if id1 < id2 else (id2, id1)
+        if sleutel in bestaand:
+            continue
+        bestaand.add(sleutel)
+
+        verbinding_type = per_rang[r]
+        nieuwe.append(Verbinding(
+            element1_id=id1,
+            element2_id=id2,
+            type=verbinding_type,
+            positie=Positie3D(*positie),
+            demontage_methode=DEMONTAGE_METHODE[verbinding_type]
+        ))
+
+    if toevoegen:
+        for verbinding in nieuwe:
+            gebouw.voeg_verbinding_toe(verbinding)
+
+    return nieuwe
+
+
+if __name__ == "__main__":
+    import time
+    from collections import Counter
+    from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, maak_raster_gebouw
+
+    gebouw = maak_voorbeeld_gebouw()
+    verbindingen = detecteer_verbindingen(gebouw)
+    print(f"{gebouw.naam}: {len(verbindingen)} verbindingen")
+    for v in verbindingen[:5]:
+        e1 = gebouw.elementen[v.element1_id]
+        e2 = gebouw.elementen[v.element2_id]
+        print(f"  {e1.naam} - {e2.naam}: {v.type.value} bij {v.positie.naar_tuple()}")
+
+    # Tweede keer: alles bestaat al
+    print(f"Opnieuw detecteren: {len(detecteer_verbindingen(gebouw))} nieuwe verbindingen")
+
+    for velden in (10, 20, 40):
+        groot = maak_raster_gebouw(velden_x=velden, velden_y=velden, verdiepingen=4)
+        groot.arrays
+        start = time.perf_counter()
+        gevonden = detecteer_verbindingen(groot)
+        duur = time.perf_counter() - start
+        typen = Counter(v.type.value for v in gevonden)
+        print(f"{len(groot.elementen):>6} elementen: {len(gevonden):>6} verbindingen "
+              f"in {duur * 1000:.0f} ms {dict(typen)}")
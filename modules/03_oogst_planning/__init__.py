@@ -10,6 +10,13 @@ from .planning import (
     OogstPlanner,
     print_oogstplan,
 )
+from .volgorde import DemontageGraaf
+from .rooster import RoosterInstellingen, RoosterResultaat, plan_rooster
+from .scenario import OogstScenario, PlanDiff
+from .portfolio import GebouwPakket, GebouwOogst, PortfolioOverzicht, plan_portfolio
+from .vraaggestuurd import Zaagplan, VraaggestuurdResultaat, VraaggestuurdePlanner
+from .monte_carlo import MonteCarloSimulatie, MonteCarloResultaat
+from .export import schrijf_jsonl, schrijf_json, exporteer_oogstplan, exporteer_plan
 
 __all__ = [
     "OogstPrioriteit",
@@ -19,4 +26,23 @@ __all__ = [
     "OogstPlan",
     "OogstPlanner",
     "print_oogstplan",
+    "DemontageGraaf",
+    "RoosterInstellingen",
+    "RoosterResultaat",
+    "plan_rooster",
+    "OogstScenario",
+    "PlanDiff",
+    "GebouwPakket",
+    "GebouwOogst",
+    "PortfolioOverzicht",
+    "plan_portfolio",
+    "Zaagplan",
+    "VraaggestuurdResultaat",
+    "VraaggestuurdePlanner",
+    "MonteCarloSimulatie",
+    "MonteCarloResultaat",
+    "schrijf_jsonl",
+    "schrijf_json",
+    "exporteer_oogstplan",
+    "exporteer_plan",
 ]
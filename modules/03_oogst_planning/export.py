@@ -0,0 +1,192 @@
+"""
+Module 3: Oogst Planning - Streaming export
+
+Schrijft demontagestappen weg terwijl ze gegenereerd worden, als JSON
+Lines of als JSON array in blokken. Samen met OogstPlanner.itereer_stappen
+blijft het geheugengebruik begrensd, ook voor gebouwen met 100.000+
+elementen, en kan een frontend de eerste stappen tonen voordat het hele
+plan berekend is.
+
+JSON Lines: een kopregel ("type": "plan"), één regel per stap
+("type": "stap") en een slotregel ("type": "einde") met de totalen.
+JSON: dezelfde velden als OogstPlan.naar_dict.
+"""
+
+import json
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional, List, Iterable, Union, TextIO
+
+import sys
+sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str
+from modules.m02_gebouw_structuur.structuur import Gebouw
+from modules.m03_oogst_planning.planning import OogstPlanner, OogstPlan, DemontageStap
+
+
+Uitvoer = Union[str, TextIO]
+
+
+def schrijf_jsonl(
+    stappen: Iterable[DemontageStap],
+    uitvoer: Uitvoer,
+    kop: Optional[dict] = None,
+    blok_grootte: int = 1000
+) -> int:
+    """
+    Schrijf stappen als JSON Lines; na elk blok wordt de uitvoer geflusht.
+
+    Returns:
+        Aantal geschreven stappen
+    """
+    with _open(uitvoer) as f:
+        if kop is not None:
+            f.write(json.dumps({"type": "plan", **kop}, ensure_ascii=False) + "\n")
+        aantal, minuten = 0, 0.0
+        for blok in _blokken(stappen, blok_grootte):
+            f.write("".join(
+                json.dumps({"type": "stap", **stap.naar_dict()}, ensure_ascii=False) + "\n" for stap in blok
+            ))
+            f.flush()
+            aantal += len(blok)
+            minuten += sum(stap.geschatte_tijd.total_seconds() / 60 for stap in blok)
+        f.write(json.dumps({"type": "einde", "aantal_stappen": aantal, "tijd_min": minuten}) + "\n")
+    return aantal
+
+
+def schrijf_json(
+    stappen: Iterable[DemontageStap],
+    uitvoer: Uitvoer,
+    kop: Optional[dict] = None,
+    blok_grootte: int = 1000
+) -> int:
+    """
+    Schrijf stappen als JSON array, in blokken.
+
+    Met een kop wordt het een object met de velden van OogstPlan.naar_dict;
+    aantal_stappen en geschatte_dagen komen na de stappen.
+
+    Returns:
+        Aantal geschreven stappen
+    """
+    with _open(uitvoer) as f:
+        if kop is not None:
+            f.write("{")
+            for sleutel, waarde in kop.items():
+                f.write(f"{json.dumps(sleutel)}: {json.dumps(waarde, ensure_ascii=False)}, ")
+            f.write('"stappen": ')
+        f.write("[")
+        aantal, minuten = 0, 0.0
+        for blok in _blokken(stappen, blok_grootte):
+            tekst = ",\n".join(json.dumps(stap.naar_dict(), ensure_ascii=False) for stap in blok)
+            f.write(("\n" if not aantal else ",\n") + tekst)
+            f.flush()
+            aantal += len(blok)
+            minuten += sum(stap.geschatte_tijd.total_seconds() / 60 for stap in blok)
+        f.write("\n]")
+        if kop is not None:
+            f.write(f', "aantal_stappen": {aantal}, "geschatte_dagen": {int(minuten // (24 * 60))}}}')
+        f.write("\n")
+    return aantal
+
+
+def exporteer_oogstplan(
+    planner: OogstPlanner,
+    gebouw: Gebouw,
+    uitvoer: Uitvoer,
+    formaat: str = "jsonl",
+    startdatum: Optional[datetime] = None,
+    blok_grootte: int = 1000
+) -> int:
+    """
+    Genereer en schrijf de stappen van een gebouw zonder het plan op te bouwen.
+
+    Er wordt geen rooster gemaakt (dat heeft alle stappen tegelijk nodig);
+    gebruik exporteer_plan voor een plan met rooster.
+    """
+    kop = {
+        "id": id_naar_str(nieuw_id()),
+        "gebouw": gebouw.naam,
+        "startdatum": (startdatum or datetime.now()).isoformat(),
+    }
+    return _schrijver(formaat)(planner.itereer_stappen(gebouw), uitvoer, kop, blok_grootte)
+
+
+def exporteer_plan(
+    plan: OogstPlan,
+    uitvoer: Uitvoer,
+    formaat: str = "jsonl",
+    blok_grootte: int = 1000
+) -> int:
+    """Schrijf een bestaand oogstplan (inclusief rooster) streamend weg"""
+    kop = {
+        "id": id_naar_str(plan.id),
+        "gebouw": plan.gebouw_naam,
+        "startdatum": plan.startdatum.isoformat() if plan.startdatum else None,
+        "einddatum": plan.einddatum.isoformat() if plan.einddatum else None,
+        "werkdagen": round(plan.rooster.werkdagen, 2) if plan.rooster else None,
+    }
+    stappen = sorted(plan.stappen, key=lambda s: s.volgorde)
+    return _schrijver(formaat)(stappen, uitvoer, kop, blok_grootte)
+
+
+def _schrijver(formaat: str):
+    if formaat == "jsonl":
+        return schrijf_jsonl
+    if formaat == "json":
+        return schrijf_json
+    raise ValueError(f"Onbekend exportformaat: {formaat}")
+
+
+def _open(uitvoer: Uitvoer):
+    """Pad openen, of een open bestand gebruiken zonder het te sluiten"""
+    if isinstance(uitvoer, str):
+        return open(uitvoer, "w", encoding="utf-8")
+    return nullcontext(uitvoer)
+
+
+def _blokken(stappen: Iterable[DemontageStap], grootte: int) -> Iterable[List[DemontageStap]]:
+    blok: List[DemontageStap] = []
+    for stap in stappen:
+        blok.append(stap)
+        if len(blok) >= grootte:
+            yield blok
+            blok = []
+    if blok:
+        yield blok
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+    from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, maak_raster_gebouw
+
+    planner = OogstPlanner()
+    plan = planner.maak_oogstplan(maak_voorbeeld_gebouw(), datetime(2026, 3, 2, 7, 0))
+    with tempfile.TemporaryDirectory() as map_:
+        pad = os.path.join(map_, "plan.json")
+        exporteer_plan(plan, pad, formaat="json")
+        with open(pad, encoding="utf-8") as f:
+            data = json.load(f)
+        print(f"JSON: {data['aantal_stappen']} stappen, gelijk aan naar_dict: "
+              f"{data['stappen'] == plan.naar_dict()['stappen']}")
+
+        groot = maak_raster_gebouw(velden_x=40, velden_y=40, verdiepingen=4)
+        pad = os.path.join(map_, "plan.jsonl")
+        start = time.perf_counter()
+        aantal = exporteer_oogstplan(planner, groot, pad)
+        print(f"{len(groot.elementen)} elementen: {aantal} stappen gestreamd in "
+              f"{time.perf_counter() - start:.1f} s, {os.path.getsize(pad) / 1e6:.1f} MB")
+
+        middel = maak_raster_gebouw(velden_x=20, velden_y=20, verdiepingen=2)
+        tracemalloc.start()
+        exporteer_oogstplan(planner, middel, pad)
+        _, piek_stream = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        json.dumps(planner.maak_oogstplan(middel).naar_dict())
+        _, piek_plan = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{len(middel.elementen)} elementen, piekgeheugen: streaming {piek_stream / 1e6:.0f} MB, "
+              f"volledig plan + naar_dict {piek_plan / 1e6:.0f} MB")
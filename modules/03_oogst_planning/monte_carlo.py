@@ -0,0 +1,333 @@
+"""
+Module 3: Oogst Planning - Monte Carlo onzekerheid
+
+Condities ("onbekend" voor de meeste geïmporteerde elementen),
+demontagetijden en verwijdertijden van aangelaste items zijn schattingen.
+Deze module trekt ze uit verdelingen en rekent per trekking na welke
+elementen geoogst worden, hoe lang de demontage duurt en wat het
+oplevert. Alles is gevectoriseerd over de trekkingen (per blok van
+runs), er wordt geen oogstplan per trekking gemaakt.
+
+Doorlooptijd per trekking: het maximum van het kritieke pad door de
+voorrangsgraaf en de resourcegrenzen (persoonsminuten / ploeg, kraan-
+minuten / kranen). Dat is een ondergrens van het rooster uit
+plan_rooster; hij wordt geschaald met de verhouding tussen het echte
+rooster en de ondergrens van het deterministische plan.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional, List, Dict
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import Gebouw
+from modules.m03_oogst_planning.planning import (
+    OogstPlanner, CONDITIE_SCORES, STANDAARD_SCORE, BEWERKING_GRENZEN, PRIORITEIT_GRENZEN
+)
+from modules.m03_oogst_planning.volgorde import DemontageGraaf
+from modules.m03_oogst_planning.rooster import RoosterInstellingen
+
+
+# Verdeling van de werkelijke conditie van elementen met conditie "onbekend"
+CONDITIE_VERDELING = {"goed": 0.3, "matig": 0.45, "slecht": 0.25}
+
+# Opbrengst van geoogst staal (€ per meter, zie maak_voorbeeld_voorraad)
+STANDAARD_PRIJS_PER_M = 35
+
+# Deel van de prijs dat een element in deze conditie opbrengt
+CONDITIE_PRIJSFACTOR = {"goed": 1.0, "matig": 0.8, "slecht": 0.5}
+STANDAARD_PRIJSFACTOR = 0.8
+
+# Maximaal aantal getallen per (elementen x runs) blok
+BLOK_GROOTTE = 4_000_000
+
+
+@dataclass
+class MonteCarloResultaat:
+    """Uitkomsten per trekking"""
+    makespan: np.ndarray          # minuten werktijd
+    tonnage: np.ndarray           # kg geoogst (schoon profielgewicht)
+    opbrengst: np.ndarray         # €
+    aantal_geoogst: np.ndarray
+    oogstkans: Dict[int, float] = field(default_factory=dict)  # element_id -> kans op oogst
+    basis_makespan: Optional[timedelta] = None  # rooster van het deterministische plan
+    kalibratie: float = 1.0  # rooster / ondergrens van het deterministische plan
+    werkuren_per_dag: float = 8
+
+    @property
+    def aantal_runs(self) -> int:
+        return len(self.makespan)
+
+    def percentiel(self, grootheid: str, p: float) -> float:
+        """Percentiel van 'makespan', 'tonnage', 'opbrengst' of 'aantal_geoogst'"""
+        return float(np.percentile(getattr(self, grootheid), p))
+
+    def werkdagen(self, p: float) -> float:
+        """Percentiel van de doorlooptijd in werkdagen"""
+        return self.percentiel("makespan", p) / (self.werkuren_per_dag * 60)
+
+    def samenvatting(self) -> Dict[str, Dict[str, float]]:
+        """P10/P50/P90 per grootheid"""
+        return {
+            grootheid: {f"P{p}": self.percentiel(grootheid, p) for p in (10, 50, 90)}
+            for grootheid in ("makespan", "tonnage", "opbrengst", "aantal_geoogst")
+        }
+
+
+class MonteCarloSimulatie:
+    """
+    Monte Carlo simulatie van een oogstplan.
+
+    Onzekerheden:
+    - conditie van elementen met conditie "onbekend" (categorische verdeling)
+    - duur van elke demontagestap (lognormaal rond de schatting)
+    - verwijdertijd per aangelast item (lognormaal), via de bewerkingsscore
+    """
+
+    def __init__(
+        self,
+        planner: OogstPlanner,
+        gebouw: Gebouw,
+        instellingen: Optional[RoosterInstellingen] = None,
+        conditie_verdeling: Optional[Dict[str, float]] = None,
+        spreiding_tijd: float = 0.3,     # sigma van log(duur)
+        spreiding_items: float = 0.5,    # sigma van log(verwijdertijd)
+        prijs_per_m: Optional[Dict[str, float]] = None  # € per meter per profiel
+    ):
+        self.planner = planner
+        self.gebouw = gebouw
+        self.instellingen = instellingen or RoosterInstellingen()
+        self.conditie_verdeling = conditie_verdeling or CONDITIE_VERDELING
+        self.spreiding_tijd = spreiding_tijd
+        self.spreiding_items = spreiding_items
+        self.prijs_per_m = prijs_per_m or {}
+        self._bereid_voor()
+
+    def _bereid_voor(self) -> None:
+        """Vaste arrays voor alle trekkingen"""
+        gebouw, planner = self.gebouw, self.planner
+        arrays = gebouw.arrays
+        scores = planner.analyseer_batch(gebouw)
+        self.arrays = arrays
+        self.graaf = DemontageGraaf.van_gebouw(gebouw)
+
+        # Scores die niet onzeker zijn
+        self.scores = scores
+        self.drempel = PRIORITEIT_GRENZEN[-1][0]  # lager = SKIP
+
+        onbekend_code = arrays.condities.index("onbekend") if "onbekend" in arrays.condities else -1
+        self.onbekend = np.flatnonzero(arrays.conditie_code == onbekend_code)
+        self.conditie_kansen = np.array(list(self.conditie_verdeling.values()), dtype=np.float64)
+        self.conditie_kansen /= self.conditie_kansen.sum()
+        self.conditie_waarden = np.array(
+            [CONDITIE_SCORES.get(c, STANDAARD_SCORE) for c in self.conditie_verdeling], dtype=np.float64
+        )
+        self.prijsfactor_waarden = np.array(
+            [CONDITIE_PRIJSFACTOR.get(c, STANDAARD_PRIJSFACTOR) for c in self.conditie_verdeling]
+        )
+        self.prijsfactor = np.array(
+            [CONDITIE_PRIJSFACTOR.get(c, STANDAARD_PRIJSFACTOR) for c in arrays.condities]
+        )[arrays.conditie_code]
+
+        # Aangelaste items gesorteerd op element, voor reduceat
+        werk_per_type = np.array(
+            [planner.schoonmaak_tijd.get(t, 10) for t in arrays.item_typen] or [0], dtype=np.float64
+        )
+        volgorde = np.argsort(arrays.item_element, kind="stable")
+        item_element = arrays.item_element[volgorde]
+        self.item_werk = werk_per_type[arrays.item_type_code[volgorde]]
+        self.item_rijen, self.item_start = np.unique(item_element, return_index=True)
+
+        # Alleen rijen met een onbekende conditie of met items variëren per run
+        self.variabel = np.union1d(self.onbekend, self.item_rijen)
+        self.variabel_onbekend = np.searchsorted(self.variabel, self.onbekend)
+        self.variabel_items = np.searchsorted(self.variabel, self.item_rijen)
+        self.vast_geoogst = scores.totaal_score >= self.drempel
+        self.conditie_cdf = np.cumsum(self.conditie_kansen)[:-1]
+
+        # Stappen per element (zelfde structuur voor elk element)
+        n = len(arrays)
+        stappen = planner.genereer_demontage_stappen(arrays.element(0), 0) if n else []
+        self.stap_duur = np.array([s.geschatte_tijd.total_seconds() / 60 for s in stappen])
+        self.stap_personen = np.array(
+            [min(max(s.aantal_personen, 0), self.instellingen.aantal_personen) for s in stappen],
+            dtype=np.float64
+        )
+        capaciteit = self.instellingen.capaciteit
+        self.materieel: Dict[str, np.ndarray] = {
+            naam: np.array([naam in s.benodigde_apparatuur for s in stappen], dtype=bool)
+            for naam in capaciteit
+        }
+        self.capaciteit = capaciteit
+        uit = [k for k, s in enumerate(stappen) if "Hijskraan" in s.benodigde_apparatuur]
+        self.uit_stap = uit[0] if uit else len(stappen) - 1
+
+        # Opbrengst en gewicht per element
+        prijs = np.array(
+            [self.prijs_per_m.get(p, STANDAARD_PRIJS_PER_M) for p in arrays.profiel_namen] or [0],
+            dtype=np.float64
+        )
+        self.opbrengst = prijs[arrays.profiel_code] * arrays.lengte / 1000
+        self.schoon_gewicht = arrays.schoon_gewicht
+
+        # Voorrang per werkfront: kanten gegroepeerd op niveau van de bron,
+        # binnen een niveau gesorteerd op doel (voor reduceat)
+        niveau = self.graaf.niveaus() if n else np.zeros(0, dtype=np.int64)
+        van, naar = self.graaf.kanten()
+        self.fronten: List[tuple] = []
+        for k in range(int(niveau.max()) + 1 if n else 0):
+            rijen = np.flatnonzero(niveau == k)
+            kanten = np.flatnonzero(niveau[van] == k)
+            kanten = kanten[np.argsort(naar[kanten], kind="stable")]
+            doelen, begin = np.unique(naar[kanten], return_index=True)
+            self.fronten.append((rijen, van[kanten], doelen, begin))
+
+    def simuleer(self, aantal_runs: int = 10_000, seed: Optional[int] = None) -> MonteCarloResultaat:
+        """Trek aantal_runs scenario's; gevectoriseerd per blok van runs"""
+        rng = np.random.default_rng(seed)
+        n = len(self.arrays)
+        blok = max(1, min(aantal_runs, BLOK_GROOTTE // max(n * max(len(self.stap_duur), 1), 1)))
+
+        delen = []
+        oogst_telling = np.zeros(n)
+        for begin in range(0, aantal_runs, blok):
+            runs = min(blok, aantal_runs - begin)
+            geoogst, prijsfactor, makespan = self._simuleer_blok(rng, runs)
+            oogst_telling += geoogst.sum(axis=1)
+            delen.append((
+                makespan,
+                self.schoon_gewicht @ geoogst,
+                self.opbrengst @ (prijsfactor * geoogst),
+                geoogst.sum(axis=0),
+            ))
+
+        makespan, tonnage, opbrengst, aantal = (np.concatenate(kolom) for kolom in zip(*delen))
+
+        # Kalibratie: het echte rooster van het geschatte plan ten opzichte
+        # van de ondergrens voor datzelfde plan
+        basis = self.planner.maak_oogstplan(self.gebouw, instellingen=self.instellingen, graaf=self.graaf)
+        ondergrens = float(self._doorlooptijd(self.vast_geoogst[:, None])[0])
+        kalibratie = basis.rooster.makespan.total_seconds() / 60 / ondergrens if ondergrens else 1.0
+
+        return MonteCarloResultaat(
+            makespan=makespan * kalibratie,
+            kalibratie=kalibratie,
+            tonnage=tonnage,
+            opbrengst=opbrengst,
+            aantal_geoogst=aantal,
+            oogstkans=dict(zip(self.arrays.ids.tolist(), (oogst_telling / aantal_runs).tolist())),
+            basis_makespan=basis.rooster.makespan,
+            werkuren_per_dag=self.instellingen.werkuren_per_dag,
+        )
+
+    def _simuleer_blok(self, rng: np.random.Generator, runs: int):
+        """Eén blok runs; arrays met vorm (elementen, runs)"""
+        scores, variabel = self.scores, self.variabel
+        prijsfactor = np.repeat(self.prijsfactor[:, None], runs, axis=1)
+        geoogst = np.repeat(self.vast_geoogst[:, None], runs, axis=1)
+
+        # Conditie: onbekende elementen trekken
+        conditie = np.repeat(scores.conditie_score[variabel, None], runs, axis=1)
+        if len(self.onbekend):
+            u = rng.random(size=(len(self.onbekend), runs), dtype=np.float32)
+            trekking = np.searchsorted(self.conditie_cdf, u, side="right")
+            conditie[self.variabel_onbekend] = self.conditie_waarden[trekking]
+            prijsfactor[self.onbekend] = self.prijsfactor_waarden[trekking]
+
+        # Schoonmaakwerk: verwijdertijd per item met onzekerheid
+        bewerking = np.repeat(scores.bewerking_score[variabel, None], runs, axis=1)
+        if len(self.item_werk):
+            factor = rng.lognormal(0.0, self.spreiding_items, size=(len(self.item_werk), runs))
+            werk = np.add.reduceat(self.item_werk[:, None] * factor, self.item_start, axis=0)
+            bewerking_scores = np.array([waarde for _, waarde in BEWERKING_GRENZEN] + [20], dtype=np.float64)
+            bewerking[self.variabel_items] = bewerking_scores[
+                np.digitize(werk, [grens for grens, _ in BEWERKING_GRENZEN])
+            ]
+
+        # Zelfde volgorde van bewerkingen als HerbruikbaarheidsScore.totaal_score
+        totaal = (
+            conditie * 0.3 +
+            scores.profiel_score[variabel, None] * 0.25 +
+            scores.lengte_score[variabel, None] * 0.25 +
+            bewerking * 0.2
+        )
+        geoogst[variabel] = totaal >= self.drempel
+
+        return geoogst, prijsfactor, self._doorlooptijd(geoogst, rng)
+
+    def _doorlooptijd(self, geoogst: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Ondergrens van de doorlooptijd per run (minuten): maximum van het
+        kritieke pad en de resourcegrenzen. Zonder rng met de geschatte
+        stapduren.
+        """
+        n, runs = geoogst.shape
+
+        # Stapduren: tot uitgenomen, totaal, persoons- en materieelminuten.
+        # Lognormaal als exp(sigma * z) in float32, in place
+        tot_uit = np.zeros((n, runs), dtype=np.float32)
+        totaal_duur = np.zeros((n, runs), dtype=np.float32)
+        persoon_minuten = np.zeros(runs)
+        materieel_minuten = {naam: np.zeros(runs) for naam in self.materieel}
+        for k, duur in enumerate(self.stap_duur):
+            if rng is None:
+                d = np.full((n, runs), duur, dtype=np.float32)
+            else:
+                d = rng.standard_normal(size=(n, runs), dtype=np.float32)
+                d *= self.spreiding_tijd
+                np.exp(d, out=d)
+                d *= duur
+            d *= geoogst
+            totaal_duur += d
+            if k <= self.uit_stap:
+                tot_uit += d
+            som = d.sum(axis=0, dtype=np.float64)
+            persoon_minuten += som * self.stap_personen[k]
+            for naam, gebruikt in self.materieel.items():
+                if gebruikt[k]:
+                    materieel_minuten[naam] += som
+
+        # Kritieke pad per werkfront; niet geoogste elementen houden niets op
+        klaar = np.zeros((n, runs), dtype=np.float32)
+        kritiek = np.zeros(runs)
+        for rijen, van, doelen, begin in self.fronten:
+            eind = np.where(geoogst[rijen], klaar[rijen] + totaal_duur[rijen], np.float32(0))
+            if len(eind):
+                np.maximum(kritiek, eind.max(axis=0), out=kritiek)
+            if len(van):
+                uit = np.where(geoogst[van], klaar[van] + tot_uit[van], np.float32(0))
+                klaar[doelen] = np.maximum(klaar[doelen], np.maximum.reduceat(uit, begin, axis=0))
+
+        makespan = np.maximum(kritiek, persoon_minuten / self.instellingen.aantal_personen)
+        for naam, minuten in materieel_minuten.items():
+            np.maximum(makespan, minuten / self.capaciteit[naam], out=makespan)
+        return makespan
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_raster_gebouw, AangelastItem
+
+    gebouw = maak_raster_gebouw(velden_x=14, velden_y=14, verdiepingen=2)
+    rng = np.random.default_rng(7)
+    for element in gebouw.elementen.values():
+        if rng.random() < 0.3:
+            element.aangelaste_items.append(AangelastItem(type="schot", gewicht=4, verwijder_tijd=20))
+        if rng.random() < 0.2:
+            element.conditie = "goed"
+
+    instellingen = RoosterInstellingen(aantal_personen=8, aantal_kranen=2)
+    start = time.perf_counter()
+    simulatie = MonteCarloSimulatie(OogstPlanner(), gebouw, instellingen)
+    resultaat = simulatie.simuleer(10_000, seed=1)
+    duur = time.perf_counter() - start
+    print(f"{len(gebouw.elementen)} elementen, {resultaat.aantal_runs} trekkingen in {duur:.1f} s")
+    print(f"Deterministisch rooster: {resultaat.basis_makespan} (kalibratie {resultaat.kalibratie:.3f})")
+    for grootheid, waarden in resultaat.samenvatting().items():
+        print(f"  {grootheid}: " + ", ".join(f"{p} {w:,.0f}" for p, w in waarden.items()))
+    print(f"Doorlooptijd P50 {resultaat.werkdagen(50):.1f} / P90 {resultaat.werkdagen(90):.1f} werkdagen")
+    zeker = sum(1 for kans in resultaat.oogstkans.values() if kans > 0.99)
+    print(f"Elementen vrijwel zeker geoogst: {zeker} van {len(resultaat.oogstkans)}")
@@ -6,15 +6,28 @@ Algoritme voor optimale demontage volgorde en planning van te oogsten balken.
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Dict, Set, Tuple
-from uuid import uuid4
+from collections.abc import Mapping
+from typing import Optional, List, Dict, Set, Tuple, Iterator, Iterable
 from datetime import datetime, timedelta
 
+import numpy as np
+
 import sys
 sys.path.append("../..")
-from modules.m02_gebouw_structuur.structuur import (
-    Gebouw, StaalElement, ElementType, Verbinding
-)
+from modules.identificatie import nieuw_id, id_naar_str
+from modules.m02_gebouw_structuur.structuur import Gebouw, StaalElement
+from modules.m03_oogst_planning.volgorde import DemontageGraaf
+
+
+# Score per conditie; onbekende waarden krijgen STANDAARD_SCORE
+CONDITIE_SCORES = {"goed": 90, "matig": 60, "slecht": 30, "onbekend": 50}
+STANDAARD_SCORE = 50
+
+# Bewerking: (schoonmaakwerk kleiner dan, score); geen werk = 100, meer = 20
+BEWERKING_GRENZEN = [(30, 80), (60, 60), (120, 40)]
+
+# Prioriteit: (totaalscore vanaf, prioriteit), anders SKIP
+PRIORITEIT_GRENZEN = [(70, 1), (50, 2), (30, 3)]
 
 
 class OogstPrioriteit(Enum):
@@ -36,7 +49,7 @@ class DemontageStatus(Enum):
 @dataclass
 class HerbruikbaarheidsScore:
     """Analyse van herbruikbaarheid van een element"""
-    element_id: str
+    element_id: int
     
     # Scores (0-100)
     conditie_score: float = 50      # Fysieke conditie
@@ -61,22 +74,140 @@ class HerbruikbaarheidsScore:
     def prioriteit(self) -> OogstPrioriteit:
         """Bepaal prioriteit op basis van score"""
         score = self.totaal_score
-        if score >= 70:
-            return OogstPrioriteit.HOOG
-        elif score >= 50:
-            return OogstPrioriteit.MIDDEL
-        elif score >= 30:
-            return OogstPrioriteit.LAAG
+        for grens, prioriteit in PRIORITEIT_GRENZEN:
+            if score >= grens:
+                return OogstPrioriteit(prioriteit)
+        return OogstPrioriteit.SKIP
+
+
+class ScoreTabel(Mapping):
+    """
+    Herbruikbaarheidsscores van alle elementen als arrays.
+    
+    Gedraagt zich als Mapping element_id -> HerbruikbaarheidsScore; de
+    score objecten worden pas bij opvragen gemaakt.
+    """
+    
+    def __init__(
+        self,
+        element_ids: np.ndarray,
+        conditie_score: np.ndarray,
+        profiel_score: np.ndarray,
+        lengte_score: np.ndarray,
+        bewerking_score: np.ndarray,
+        schoonmaak_werk: np.ndarray,
+        te_kort: np.ndarray
+    ):
+        self.element_ids = np.asarray(element_ids, dtype=np.int64)
+        self.conditie_score = conditie_score
+        self.profiel_score = profiel_score
+        self.lengte_score = lengte_score
+        self.bewerking_score = bewerking_score
+        self.schoonmaak_werk = schoonmaak_werk  # minuten per element
+        self.te_kort = te_kort
+        self._rij_van: Dict[int, int] = {i: rij for rij, i in enumerate(self.element_ids.tolist())}
+        self._scores: Dict[int, HerbruikbaarheidsScore] = {}
+        self._bereken_totalen()
+    
+    def _bereken_totalen(self, rijen=slice(None)) -> None:
+        # Zelfde volgorde van bewerkingen als HerbruikbaarheidsScore.totaal_score
+        totaal = (
+            self.conditie_score[rijen] * 0.3 +
+            self.profiel_score[rijen] * 0.25 +
+            self.lengte_score[rijen] * 0.25 +
+            self.bewerking_score[rijen] * 0.2
+        )
+        prioriteit = np.select(
+            [totaal >= grens for grens, _ in PRIORITEIT_GRENZEN],
+            [prioriteit for _, prioriteit in PRIORITEIT_GRENZEN],
+            default=OogstPrioriteit.SKIP.value
+        ).astype(np.int8)
+        if isinstance(rijen, slice):
+            self.totaal_score = totaal
+            self.prioriteit_code = prioriteit
         else:
-            return OogstPrioriteit.SKIP
+            self.totaal_score[rijen] = totaal
+            self.prioriteit_code[rijen] = prioriteit
+    
+    def bijwerken(
+        self,
+        rijen: np.ndarray,
+        conditie_score: Optional[np.ndarray] = None,
+        profiel_score: Optional[np.ndarray] = None,
+        lengte_score: Optional[np.ndarray] = None,
+        te_kort: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Werk de scores van enkele rijen bij.
+        
+        Returns:
+            De prioriteitscodes van die rijen vóór de wijziging
+        """
+        rijen = np.asarray(rijen, dtype=np.int64)
+        oud = self.prioriteit_code[rijen].copy()
+        if conditie_score is not None:
+            self.conditie_score[rijen] = conditie_score
+        if profiel_score is not None:
+            self.profiel_score[rijen] = profiel_score
+        if lengte_score is not None:
+            self.lengte_score[rijen] = lengte_score
+        if te_kort is not None:
+            self.te_kort[rijen] = te_kort
+        self._bereken_totalen(rijen)
+        for element_id in self.element_ids[rijen].tolist():
+            self._scores.pop(element_id, None)
+        return oud
+    
+    def rij(self, element_id: int) -> int:
+        return self._rij_van[element_id]
+    
+    def prioriteit_van(self, element_id: int) -> OogstPrioriteit:
+        """Prioriteit zonder score object te maken"""
+        return OogstPrioriteit(int(self.prioriteit_code[self._rij_van[element_id]]))
+    
+    def masker(self, *prioriteiten: OogstPrioriteit) -> np.ndarray:
+        """Boolean masker van elementen met een van de gegeven prioriteiten"""
+        return np.isin(self.prioriteit_code, [p.value for p in prioriteiten])
+    
+    def __getitem__(self, element_id: int) -> HerbruikbaarheidsScore:
+        score = self._scores.get(element_id)
+        if score is None:
+            score = self._scores[element_id] = self._maak_score(self._rij_van[element_id])
+        return score
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rij_van)
+    
+    def __len__(self) -> int:
+        return len(self.element_ids)
+    
+    def __contains__(self, element_id) -> bool:
+        return element_id in self._rij_van
+    
+    def _maak_score(self, rij: int) -> HerbruikbaarheidsScore:
+        score = HerbruikbaarheidsScore(
+            element_id=int(self.element_ids[rij]),
+            conditie_score=self.conditie_score[rij].item(),
+            profiel_score=self.profiel_score[rij].item(),
+            lengte_score=self.lengte_score[rij].item(),
+            bewerking_score=self.bewerking_score[rij].item(),
+        )
+        if self.te_kort[rij]:
+            score.opmerkingen.append("Te kort voor standaard hergebruik")
+        if score.bewerking_score == 20:
+            werk = self.schoonmaak_werk[rij].item()
+            if float(werk).is_integer():
+                werk = int(werk)
+            score.opmerkingen.append(f"Veel schoonmaakwerk: {werk} min")
+        return score
 
 
 @dataclass
 class DemontageStap:
     """Eén stap in het demontageproces"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     volgorde: int = 0
-    element_id: str = ""
+    element_id: int = 0
     element_naam: str = ""
     
     # Acties
@@ -93,14 +224,29 @@ class DemontageStap:
     
     # Veiligheid
     veiligheidsmaatregelen: List[str] = field(default_factory=list)
-    afhankelijkheden: List[str] = field(default_factory=list)  # element IDs die eerst verwijderd moeten zijn
+    afhankelijkheden: List[int] = field(default_factory=list)  # element IDs die eerst verwijderd moeten zijn
+    
+    # Planning (ingevuld door het rooster)
+    geplande_start: Optional[datetime] = None
+    geplande_eind: Optional[datetime] = None
+    
+    def naar_dict(self) -> dict:
+        """Exporteer naar dictionary"""
+        return {
+            "volgorde": self.volgorde,
+            "element": self.element_naam,
+            "actie": self.actie,
+            "tijd_min": self.geschatte_tijd.total_seconds() / 60,
+            "gepland": self.geplande_start.isoformat() if self.geplande_start else None,
+            "status": self.status.value
+        }
 
 
 @dataclass
 class OogstPlan:
     """Compleet oogstplan voor een gebouw"""
-    id: str = field(default_factory=lambda: str(uuid4()))
-    gebouw_id: str = ""
+    id: int = field(default_factory=nieuw_id)
+    gebouw_id: int = 0
     gebouw_naam: str = ""
     
     # Planning
@@ -109,9 +255,13 @@ class OogstPlan:
     
     # Stappen
     stappen: List[DemontageStap] = field(default_factory=list)
+    volgorde: List[int] = field(default_factory=list)  # demontage volgorde van alle element ID's
+    
+    # Scores per element (dict of ScoreTabel)
+    herbruikbaarheid: Mapping = field(default_factory=dict)
     
-    # Scores per element
-    herbruikbaarheid: Dict[str, HerbruikbaarheidsScore] = field(default_factory=dict)
+    # Tijdlijn met beperkte ploeg en kranen
+    rooster: Optional["RoosterResultaat"] = None
     
     # Statistieken
     @property
@@ -124,30 +274,30 @@ class OogstPlan:
     
     @property
     def totale_geschatte_tijd(self) -> timedelta:
-        """Totale geschatte demontage tijd"""
+        """Totale geschatte demontage tijd (alle stappen opgeteld)"""
         return sum(
             (stap.geschatte_tijd for stap in self.stappen),
             timedelta()
         )
     
+    @property
+    def doorlooptijd(self) -> timedelta:
+        """Werktijd van start tot einde volgens het rooster"""
+        if self.rooster:
+            return self.rooster.makespan
+        return self.totale_geschatte_tijd
+    
     def naar_dict(self) -> dict:
         """Exporteer naar dictionary"""
         return {
-            "id": self.id,
+            "id": id_naar_str(self.id),
             "gebouw": self.gebouw_naam,
             "startdatum": self.startdatum.isoformat() if self.startdatum else None,
             "aantal_stappen": len(self.stappen),
             "geschatte_dagen": self.totale_geschatte_tijd.days,
-            "stappen": [
-                {
-                    "volgorde": s.volgorde,
-                    "element": s.element_naam,
-                    "actie": s.actie,
-                    "tijd_min": s.geschatte_tijd.total_seconds() / 60,
-                    "status": s.status.value
-                }
-                for s in sorted(self.stappen, key=lambda x: x.volgorde)
-            ]
+            "einddatum": self.einddatum.isoformat() if self.einddatum else None,
+            "werkdagen": round(self.rooster.werkdagen, 2) if self.rooster else None,
+            "stappen": [s.naar_dict() for s in sorted(self.stappen, key=lambda x: x.volgorde)]
         }
 
 
@@ -180,6 +330,10 @@ class OogstPlanner:
             "anker": 25,
         }
     
+    def _lengte_grenzen(self) -> List[Tuple[float, float]]:
+        """(lengte vanaf, score); korter dan de laatste grens = 20"""
+        return [(6000, 100), (4000, 80), (self.min_herbruik_lengte, 60)]
+    
     def analyseer_herbruikbaarheid(
         self, 
         element: StaalElement
@@ -188,21 +342,18 @@ class OogstPlanner:
         score = HerbruikbaarheidsScore(element_id=element.id)
         
         # Conditie score (basis op conditie veld)
-        conditie_map = {"goed": 90, "matig": 60, "slecht": 30, "onbekend": 50}
-        score.conditie_score = conditie_map.get(element.conditie, 50)
+        score.conditie_score = CONDITIE_SCORES.get(element.conditie, STANDAARD_SCORE)
         
         # Profiel vraag score
-        score.profiel_score = self.profiel_vraag.get(element.profiel_naam, 50)
+        score.profiel_score = self.profiel_vraag.get(element.profiel_naam, STANDAARD_SCORE)
         
         # Lengte score
-        if element.lengte >= 6000:
-            score.lengte_score = 100
-        elif element.lengte >= 4000:
-            score.lengte_score = 80
-        elif element.lengte >= self.min_herbruik_lengte:
-            score.lengte_score = 60
+        score.lengte_score = 20
+        for grens, waarde in self._lengte_grenzen():
+            if element.lengte >= grens:
+                score.lengte_score = waarde
+                break
         else:
-            score.lengte_score = 20
             score.opmerkingen.append("Te kort voor standaard hergebruik")
         
         # Bewerking score (minder aangelaste items = hogere score)
@@ -212,55 +363,79 @@ class OogstPlanner:
         )
         if totaal_werk == 0:
             score.bewerking_score = 100
-        elif totaal_werk < 30:
-            score.bewerking_score = 80
-        elif totaal_werk < 60:
-            score.bewerking_score = 60
-        elif totaal_werk < 120:
-            score.bewerking_score = 40
         else:
             score.bewerking_score = 20
-            score.opmerkingen.append(f"Veel schoonmaakwerk: {totaal_werk} min")
+            for grens, waarde in BEWERKING_GRENZEN:
+                if totaal_werk < grens:
+                    score.bewerking_score = waarde
+                    break
+            else:
+                score.opmerkingen.append(f"Veel schoonmaakwerk: {totaal_werk} min")
         
         return score
     
+    def analyseer_batch(self, gebouw: Gebouw) -> ScoreTabel:
+        """
+        Herbruikbaarheid van alle elementen in één keer (NumPy).
+        
+        Geeft dezelfde scores als analyseer_herbruikbaarheid per element,
+        maar als arrays over de kolomsgewijze opslag van het gebouw.
+        """
+        arrays = gebouw.arrays
+        
+        # Opzoektabellen per vocabulaire, dan indexeren met de codes
+        conditie = np.array(
+            [CONDITIE_SCORES.get(c, STANDAARD_SCORE) for c in arrays.condities], dtype=np.float64
+        )[arrays.conditie_code]
+        profiel = np.array(
+            [self.profiel_vraag.get(p, STANDAARD_SCORE) for p in arrays.profiel_namen] or [0],
+            dtype=np.float64
+        )[arrays.profiel_code]
+        
+        grenzen = self._lengte_grenzen()
+        voldoet = [arrays.lengte >= grens for grens, _ in grenzen]
+        lengte = np.select(voldoet, [waarde for _, waarde in grenzen], default=20).astype(np.float64)
+        te_kort = ~np.logical_or.reduce(voldoet)
+        
+        werk_per_type = np.array(
+            [self.schoonmaak_tijd.get(t, 10) for t in arrays.item_typen] or [0], dtype=np.float64
+        )
+        werk = np.bincount(
+            arrays.item_element,
+            weights=werk_per_type[arrays.item_type_code],
+            minlength=len(arrays)
+        )
+        bewerking_scores = np.array([waarde for _, waarde in BEWERKING_GRENZEN] + [20], dtype=np.float64)
+        bewerking = np.where(
+            werk == 0,
+            100.0,
+            bewerking_scores[np.digitize(werk, [grens for grens, _ in BEWERKING_GRENZEN])]
+        )
+        
+        return ScoreTabel(arrays.ids, conditie, profiel, lengte, bewerking, werk, te_kort)
+    
     def bepaal_demontage_volgorde(
         self, 
-        gebouw: Gebouw
-    ) -> List[str]:
+        gebouw: Gebouw,
+        graaf: Optional[DemontageGraaf] = None
+    ) -> List[int]:
         """
         Bepaal optimale demontage volgorde.
         
-        Regels:
+        Topologische sortering van de voorrangsgraaf (zie DemontageGraaf):
+        een element dat op een ander rust gaat eerst. Bij keuze:
         1. Secundaire elementen eerst (liggers, windverband)
         2. Hoofdbalken na secundaire
         3. Kolommen als laatste
         4. Van boven naar beneden
         """
-        elementen_met_hoogte = []
-        
-        for element in gebouw.elementen.values():
-            # Bepaal hoogte (maximum z van start/eind)
-            hoogte = max(element.start_positie.z, element.eind_positie.z)
-            
-            # Bepaal prioriteit (hoger = later verwijderen)
-            if element.type == ElementType.KOLOM:
-                type_prio = 3
-            elif element.type == ElementType.BALK:
-                type_prio = 2
-            else:
-                type_prio = 1
-            
-            elementen_met_hoogte.append((element.id, hoogte, type_prio))
-        
-        # Sorteer: eerst lage prioriteit, dan hoog naar laag
-        # (secundair hoog, secundair laag, balken hoog, balken laag, kolommen hoog, kolommen laag)
-        gesorteerd = sorted(
-            elementen_met_hoogte,
-            key=lambda x: (x[2], -x[1])  # type prio oplopend, hoogte aflopend
-        )
-        
-        return [e[0] for e in gesorteerd]
+        if graaf is None:
+            graaf = DemontageGraaf.van_gebouw(gebouw)
+        return graaf.volgorde()
+    
+    def bepaal_werkfronten(self, gebouw: Gebouw) -> List[List[int]]:
+        """Groepen elementen die parallel gedemonteerd kunnen worden"""
+        return DemontageGraaf.van_gebouw(gebouw).werkfronten()
     
     def genereer_demontage_stappen(
         self,
@@ -310,12 +485,72 @@ class OogstPlanner:
         
         return stappen
     
+    def plan_element(
+        self,
+        element: StaalElement,
+        volgorde: int,
+        graaf: DemontageGraaf
+    ) -> List[DemontageStap]:
+        """Demontagestappen van één element, met afhankelijkheden uit de graaf"""
+        stappen = self.genereer_demontage_stappen(element, volgorde)
+        voorgangers = graaf.voorgangers(element.id)
+        for stap in stappen:
+            stap.afhankelijkheden = list(voorgangers)
+        return stappen
+    
+    def itereer_stappen(
+        self,
+        gebouw: Gebouw,
+        graaf: Optional[DemontageGraaf] = None,
+        selectie: Optional[Iterable[int]] = None
+    ) -> Iterator[DemontageStap]:
+        """
+        Demontagestappen in volgorde als generator, één element tegelijk.
+        
+        Zelfde stappen als maak_oogstplan, maar zonder ze allemaal in een
+        lijst te houden (bijv. voor streaming export). Er is geen rooster:
+        geplande_start en geplande_eind blijven leeg.
+        """
+        scores = self.analyseer_batch(gebouw)
+        if graaf is None:
+            graaf = DemontageGraaf.van_gebouw(gebouw)
+        volgorde = self.bepaal_demontage_volgorde(gebouw, graaf)
+        return self._stappen(gebouw, volgorde, graaf, scores, selectie)
+    
+    def _stappen(
+        self,
+        gebouw: Gebouw,
+        volgorde: List[int],
+        graaf: DemontageGraaf,
+        scores: ScoreTabel,
+        selectie: Optional[Iterable[int]]
+    ) -> Iterator[DemontageStap]:
+        if selectie is not None:
+            selectie = set(selectie)
+        for idx, element_id in enumerate(volgorde):
+            if selectie is not None:
+                oogsten = element_id in selectie
+            else:
+                oogsten = scores.prioriteit_van(element_id) != OogstPrioriteit.SKIP
+            if oogsten:
+                yield from self.plan_element(gebouw.get_element(element_id), idx, graaf)
+    
     def maak_oogstplan(
         self,
         gebouw: Gebouw,
-        startdatum: Optional[datetime] = None
+        startdatum: Optional[datetime] = None,
+        instellingen: Optional["RoosterInstellingen"] = None,
+        graaf: Optional[DemontageGraaf] = None,
+        selectie: Optional[Iterable[int]] = None
     ) -> OogstPlan:
-        """Genereer compleet oogstplan voor een gebouw"""
+        """
+        Genereer compleet oogstplan voor een gebouw.
+        
+        De einddatum volgt uit het rooster (zie plan_rooster) met de
+        gegeven ploeg, kranen en werktijden. Met een selectie van element
+        ID's (bijv. uit VraaggestuurdePlanner) worden precies die elementen
+        geoogst in plaats van alles behalve SKIP.
+        """
         plan = OogstPlan(
             gebouw_id=gebouw.id,
             gebouw_naam=gebouw.naam,
@@ -323,25 +558,22 @@ class OogstPlanner:
         )
         
         # Analyseer alle elementen
-        for element in gebouw.elementen.values():
-            score = self.analyseer_herbruikbaarheid(element)
-            plan.herbruikbaarheid[element.id] = score
+        scores = self.analyseer_batch(gebouw)
+        plan.herbruikbaarheid = scores
         
         # Bepaal volgorde
-        volgorde = self.bepaal_demontage_volgorde(gebouw)
+        if graaf is None:
+            graaf = DemontageGraaf.van_gebouw(gebouw)
+        volgorde = self.bepaal_demontage_volgorde(gebouw, graaf)
+        plan.volgorde = volgorde
         
         # Genereer stappen voor te oogsten elementen
-        for idx, element_id in enumerate(volgorde):
-            element = gebouw.get_element(element_id)
-            score = plan.herbruikbaarheid[element_id]
-            
-            if score.prioriteit != OogstPrioriteit.SKIP:
-                stappen = self.genereer_demontage_stappen(element, idx)
-                plan.stappen.extend(stappen)
+        plan.stappen = list(self._stappen(gebouw, volgorde, graaf, scores, selectie))
         
-        # Bereken einddatum
-        if plan.startdatum:
-            plan.einddatum = plan.startdatum + plan.totale_geschatte_tijd
+        # Plan de stappen in de tijd en bepaal de einddatum
+        from modules.m03_oogst_planning.rooster import plan_rooster
+        plan.rooster = plan_rooster(plan.stappen, instellingen, plan.startdatum)
+        plan.einddatum = plan.rooster.einddatum
         
         return plan
 
@@ -354,6 +586,8 @@ def print_oogstplan(plan: OogstPlan, gebouw: Gebouw) -> None:
     print(f"Start: {plan.startdatum}")
     print(f"Geschat einde: {plan.einddatum}")
     print(f"Totale tijd: {plan.totale_geschatte_tijd}")
+    if plan.rooster:
+        print(f"Doorlooptijd: {plan.doorlooptijd} ({plan.rooster.werkdagen:.1f} werkdagen)")
     print(f"Aantal stappen: {len(plan.stappen)}")
     
     print(f"\n{'='*60}")
@@ -0,0 +1,330 @@
+"""
+Module 3: Oogst Planning - Portfolio
+
+Oogstplanning voor veel gebouwen tegelijk over een process pool. Naar
+de workers gaat per gebouw een compact pakket (de kolomsgewijze arrays
+en de verbindingen als arrays) in plaats van een gepickelde objectgraaf;
+terug komt alleen een samenvatting. De samenvattingen worden samengevoegd
+tot tonnage per profiel, een oogstkalender en de ploegbelasting per dag.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from typing import Optional, List, Dict, Tuple, Iterable
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import Gebouw, Verbinding, Positie3D
+from modules.m02_gebouw_structuur.arrays import GebouwArrays, VERBINDING_TYPEN, _VERBINDING_CODE
+from modules.m03_oogst_planning.planning import OogstPlanner, OogstPlan, OogstPrioriteit
+from modules.m03_oogst_planning.rooster import RoosterInstellingen, _Kalender
+
+
+@dataclass
+class GebouwPakket:
+    """Compacte, picklebare weergave van een gebouw voor een worker proces"""
+    id: int
+    naam: str
+    adres: str
+    bouwjaar: Optional[int]
+    ontwerp_levensduur: int
+    laatst_geinspecteerd: Optional[date]
+    documentatie: List[str]
+    arrays: Dict[str, object]            # publieke velden van GebouwArrays
+
+    # Verbindingen, één rij per verbinding
+    verbinding_ids: np.ndarray           # int64
+    verbinding_elementen: np.ndarray     # (M, 2) int64, element ID's
+    verbinding_type_code: np.ndarray     # int8, index in VERBINDING_TYPEN
+    verbinding_positie: np.ndarray       # (M, 3) float64
+    verbinding_details: np.ndarray       # (M, 4) aantal_bouten, bout_diameter, las_lengte, demontage_tijd
+    verbinding_methoden: List[str]       # vocabulaire voor verbinding_methode_code
+    verbinding_methode_code: np.ndarray  # int8
+
+    @classmethod
+    def van_gebouw(cls, gebouw: Gebouw) -> 'GebouwPakket':
+        arrays = gebouw.arrays
+        verbindingen = gebouw.verbindingen
+        methoden: List[str] = []
+        methode_codes: Dict[str, int] = {}
+        for v in verbindingen:
+            if v.demontage_methode not in methode_codes:
+                methode_codes[v.demontage_methode] = len(methoden)
+                methoden.append(v.demontage_methode)
+
+        return cls(
+            id=gebouw.id,
+            naam=gebouw.naam,
+            adres=gebouw.adres,
+            bouwjaar=gebouw.bouwjaar,
+            ontwerp_levensduur=gebouw.ontwerp_levensduur,
+            laatst_geinspecteerd=gebouw.laatst_geinspecteerd,
+            documentatie=list(gebouw.documentatie),
+            arrays={
+                naam: getattr(arrays, naam)
+                for naam in arrays.__dataclass_fields__ if not naam.startswith("_")
+            },
+            verbinding_ids=np.array([v.id for v in verbindingen], dtype=np.int64),
+            verbinding_elementen=np.array(
+                [(v.element1_id, v.element2_id) for v in verbindingen], dtype=np.int64
+            ).reshape(-1, 2),
+            verbinding_type_code=np.array(
+                [_VERBINDING_CODE[v.type.value] for v in verbindingen], dtype=np.int8
+            ),
+            verbinding_positie=np.array(
+                [v.positie.naar_tuple() for v in verbindingen], dtype=np.float64
+            ).reshape(-1, 3),
+            verbinding_details=np.array(
+                [(v.aantal_bouten, v.bout_diameter, v.las_lengte, v.demontage_tijd) for v in verbindingen],
+                dtype=np.float64
+            ).reshape(-1, 4),
+            verbinding_methoden=methoden,
+            verbinding_methode_code=np.array(
+                [methode_codes[v.demontage_methode] for v in verbindingen], dtype=np.int8
+            ),
+        )
+
+    def naar_gebouw(self) -> Gebouw:
+        """Bouw het gebouw weer op (in het worker proces)"""
+        arrays = GebouwArrays(**self.arrays)
+        elementen = list(arrays.elementen())
+        # Kolommen in één keer naar Python waarden in plaats van NumPy scalars per veld
+        details = self.verbinding_details.T.tolist() if len(self.verbinding_ids) else [[]] * 4
+        verbindingen = [
+            Verbinding(
+                id=id,
+                element1_id=element1_id,
+                element2_id=element2_id,
+                type=VERBINDING_TYPEN[type_code],
+                positie=Positie3D(*positie),
+                aantal_bouten=int(aantal_bouten),
+                bout_diameter=bout_diameter,
+                las_lengte=las_lengte,
+                demontage_tijd=demontage_tijd,
+                demontage_methode=self.verbinding_methoden[methode_code],
+            )
+            for (id, (element1_id, element2_id), type_code, positie, methode_code,
+                 aantal_bouten, bout_diameter, las_lengte, demontage_tijd) in zip(
+                self.verbinding_ids.tolist(), self.verbinding_elementen.tolist(),
+                self.verbinding_type_code.tolist(), self.verbinding_positie.tolist(),
+                self.verbinding_methode_code.tolist(), *details
+            )
+        ]
+        gebouw = Gebouw(
+            id=self.id,
+            naam=self.naam,
+            adres=self.adres,
+            bouwjaar=self.bouwjaar,
+            ontwerp_levensduur=self.ontwerp_levensduur,
+            laatst_geinspecteerd=self.laatst_geinspecteerd,
+            documentatie=list(self.documentatie),
+            elementen={e.id: e for e in elementen},
+            verbindingen=verbindingen,
+        )
+        # De arrays horen al bij deze elementen; niet opnieuw opbouwen
+        arrays._bron = elementen
+        gebouw._arrays = arrays
+        return gebouw
+
+
+@dataclass
+class GebouwOogst:
+    """Samenvatting van het oogstplan van één gebouw"""
+    gebouw_id: int
+    gebouw_naam: str
+    aantal_elementen: int
+    aantal_geoogst: int
+    aantal_stappen: int
+    startdatum: datetime
+    einddatum: datetime
+    werkdagen: float
+    tonnage_per_profiel: Dict[str, float] = field(default_factory=dict)  # kg
+    ploeg_belasting: Dict[date, float] = field(default_factory=dict)     # persoonsuren per dag
+
+
+@dataclass
+class PortfolioOverzicht:
+    """Samengevoegde oogstplanning van meerdere gebouwen"""
+    gebouwen: List[GebouwOogst] = field(default_factory=list)  # op startdatum (oogstkalender)
+    tonnage_per_profiel: Dict[str, float] = field(default_factory=dict)  # kg
+    ploeg_belasting: Dict[date, float] = field(default_factory=dict)     # persoonsuren per dag
+
+    @property
+    def totaal_tonnage(self) -> float:
+        """Te oogsten staal in ton"""
+        return sum(self.tonnage_per_profiel.values()) / 1000
+
+    @property
+    def einddatum(self) -> Optional[datetime]:
+        return max((g.einddatum for g in self.gebouwen), default=None)
+
+    @property
+    def piek_belasting(self) -> Tuple[Optional[date], float]:
+        """Dag met de meeste persoonsuren"""
+        if not self.ploeg_belasting:
+            return None, 0.0
+        dag = max(self.ploeg_belasting, key=self.ploeg_belasting.get)
+        return dag, self.ploeg_belasting[dag]
+
+    def kalender(self) -> List[Tuple[str, datetime, datetime]]:
+        """(gebouw, start, einde) per gebouw"""
+        return [(g.gebouw_naam, g.startdatum, g.einddatum) for g in self.gebouwen]
+
+
+def plan_portfolio(
+    gebouwen: Iterable[Gebouw],
+    workers: Optional[int] = None,
+    planner: Optional[OogstPlanner] = None,
+    startdatum: Optional[datetime] = None,
+    instellingen: Optional[RoosterInstellingen] = None
+) -> PortfolioOverzicht:
+    """
+    Maak oogstplannen voor een reeks gebouwen en voeg ze samen.
+
+    Elk gebouw krijgt een eigen ploeg volgens de instellingen. Met
+    workers=1 wordt alles in dit proces gepland; anders over een
+    ProcessPoolExecutor (standaard één worker per core, dus serieel op
+    een machine met één core). Een worker bouwt elk gebouw eerst weer op
+    uit zijn pakket, wat ongeveer de helft van de plantijd kost; meer
+    workers dan cores maakt het daardoor alleen trager.
+    """
+    planner = planner or OogstPlanner()
+    instellingen = instellingen or RoosterInstellingen()
+    startdatum = startdatum or datetime.now()
+    gebouwen = list(gebouwen)
+    workers = min(workers or os.cpu_count() or 1, max(len(gebouwen), 1))
+
+    if workers == 1:
+        resultaten = [_oogst_van_gebouw(g, planner, startdatum, instellingen) for g in gebouwen]
+    else:
+        pakketten = [GebouwPakket.van_gebouw(g) for g in gebouwen]
+        chunksize = max(1, math.ceil(len(pakketten) / (workers * 4)))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_start_worker,
+            initargs=(planner, startdatum, instellingen)
+        ) as executor:
+            resultaten = list(executor.map(_plan_pakket, pakketten, chunksize=chunksize))
+
+    return voeg_samen(resultaten)
+
+
+def voeg_samen(resultaten: Iterable[GebouwOogst]) -> PortfolioOverzicht:
+    """Voeg samenvattingen per gebouw samen tot een portfolio overzicht"""
+    overzicht = PortfolioOverzicht(gebouwen=sorted(resultaten, key=lambda g: (g.startdatum, g.einddatum)))
+    for resultaat in overzicht.gebouwen:
+        for profiel, kg in resultaat.tonnage_per_profiel.items():
+            overzicht.tonnage_per_profiel[profiel] = overzicht.tonnage_per_profiel.get(profiel, 0.0) + kg
+        for dag, uren in resultaat.ploeg_belasting.items():
+            overzicht.ploeg_belasting[dag] = overzicht.ploeg_belasting.get(dag, 0.0) + uren
+    overzicht.ploeg_belasting = dict(sorted(overzicht.ploeg_belasting.items()))
+    return overzicht
+
+
+# ------------------------------------------------------------
+# Worker
+# ------------------------------------------------------------
+
+_worker_instellingen: Tuple = ()
+
+
+def _start_worker(planner: OogstPlanner, startdatum: datetime, instellingen: RoosterInstellingen) -> None:
+    """Gedeelde parameters één keer per worker proces in plaats van per taak"""
+    global _worker_instellingen
+    _worker_instellingen = (planner, startdatum, instellingen)
+
+
+def _plan_pakket(pakket: GebouwPakket) -> GebouwOogst:
+    return _oogst_van_gebouw(pakket.naar_gebouw(), *_worker_instellingen)
+
+
+def _oogst_van_gebouw(
+    gebouw: Gebouw,
+    planner: OogstPlanner,
+    startdatum: datetime,
+    instellingen: RoosterInstellingen
+) -> GebouwOogst:
+    plan = planner.maak_oogstplan(gebouw, startdatum, instellingen)
+    arrays = gebouw.arrays
+    scores = plan.herbruikbaarheid
+
+    # Tonnage (schoon profielgewicht) van de te oogsten elementen per profiel
+    geoogst = scores.prioriteit_code != OogstPrioriteit.SKIP.value
+    kg = np.bincount(
+        arrays.profiel_code[geoogst],
+        weights=arrays.schoon_gewicht[geoogst],
+        minlength=len(arrays.profiel_namen)
+    )
+    tonnage = {naam: float(kg[code]) for code, naam in enumerate(arrays.profiel_namen) if kg[code] > 0}
+
+    return GebouwOogst(
+        gebouw_id=gebouw.id,
+        gebouw_naam=gebouw.naam,
+        aantal_elementen=len(arrays),
+        aantal_geoogst=int(geoogst.sum()),
+        aantal_stappen=len(plan.stappen),
+        startdatum=plan.rooster.startdatum,
+        einddatum=plan.rooster.einddatum,
+        werkdagen=plan.rooster.werkdagen,
+        tonnage_per_profiel=tonnage,
+        ploeg_belasting=_ploeg_belasting(plan, instellingen),
+    )
+
+
+def _ploeg_belasting(plan: OogstPlan, instellingen: RoosterInstellingen) -> Dict[date, float]:
+    """Persoonsuren per kalenderdag volgens het rooster"""
+    if not plan.stappen:
+        return {}
+    kalender = _Kalender(plan.startdatum, instellingen)
+    per_dag = kalender.per_dag
+    tijden = plan.rooster.tijden
+    start = np.array([tijden[s.id][0] for s in plan.stappen]) + kalender.offset
+    eind = np.array([tijden[s.id][1] for s in plan.stappen]) + kalender.offset
+    personen = np.array([s.aantal_personen for s in plan.stappen], dtype=np.float64)
+
+    # Persoonsminuten tot tijdstip t: som van personen * (deel van de stap vóór t)
+    aantal_dagen = int(math.ceil(eind.max() / per_dag)) or 1
+    grenzen = np.arange(aantal_dagen + 1) * per_dag
+    cumulatief = np.zeros(aantal_dagen + 1)
+    for blok in range(0, len(start), 4096):
+        s, e, p = start[blok:blok + 4096], eind[blok:blok + 4096], personen[blok:blok + 4096]
+        cumulatief += (np.clip(grenzen[:, None] - s, 0, e - s) * p).sum(axis=1)
+    uren = np.diff(cumulatief) / 60
+
+    return {
+        kalender.datum(dag * per_dag - kalender.offset + per_dag / 2).date(): float(uren[dag])
+        for dag in range(aantal_dagen) if uren[dag] > 0
+    }
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_raster_gebouw
+    from modules.m02_gebouw_structuur.verbindingen import detecteer_verbindingen
+
+    gebouwen = []
+    for k in range(8):
+        gebouw = maak_raster_gebouw(velden_x=10 + k, velden_y=10, verdiepingen=3)
+        gebouw.naam = f"Project {k + 1}"
+        detecteer_verbindingen(gebouw)
+        gebouwen.append(gebouw)
+    start = datetime(2026, 3, 2, 7, 0)
+
+    # Op een machine met één core valt er niets te vergelijken
+    for workers in sorted({1, os.cpu_count() or 1}):
+        begin = time.perf_counter()
+        overzicht = plan_portfolio(gebouwen, workers=workers, startdatum=start)
+        print(f"{len(gebouwen)} gebouwen, {workers} worker(s): {time.perf_counter() - begin:.1f} s")
+
+    print(f"Totaal te oogsten: {overzicht.totaal_tonnage:.1f} ton")
+    for profiel, kg in sorted(overzicht.tonnage_per_profiel.items()):
+        print(f"  {profiel}: {kg / 1000:.1f} ton")
+    for naam, begin, einde in overzicht.kalender()[:3]:
+        print(f"  {naam}: {begin:%d-%m} t/m {einde:%d-%m}")
+    dag, uren = overzicht.piek_belasting
+    print(f"Piek ploegbelasting: {uren:.0f} persoonsuren op {dag:%d-%m}")
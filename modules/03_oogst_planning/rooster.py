@@ -0,0 +1,266 @@
+"""
+Module 3: Oogst Planning - Rooster
+
+Plant de demontagestappen in de tijd met beperkte ploegen en kranen.
+List scheduling als event simulatie: zodra mensen en materieel vrij
+zijn, start de beschikbare stap met het langste resterende kritieke pad.
+De werktijd wordt daarna omgezet naar kalenderdata (werkdagen en
+werkuren).
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple, FrozenSet
+
+import sys
+sys.path.append("../..")
+from modules.m03_oogst_planning.planning import DemontageStap
+
+
+@dataclass
+class RoosterInstellingen:
+    """Beschikbare ploeg, materieel en werktijden"""
+    aantal_personen: int = 6
+    aantal_kranen: int = 1
+
+    # Overig beperkt materieel, bijv. {"Vrachtwagen": 1}; niet genoemd = onbeperkt
+    extra_capaciteit: Dict[str, int] = field(default_factory=dict)
+
+    # Werktijden
+    werkdag_start: int = 7  # uur
+    werkuren_per_dag: float = 8
+    werkdagen: Tuple[int, ...] = (0, 1, 2, 3, 4)  # ma-vr
+
+    @property
+    def capaciteit(self) -> Dict[str, int]:
+        """Capaciteit per beperkt materieel"""
+        capaciteit = {"Hijskraan": self.aantal_kranen}
+        capaciteit.update(self.extra_capaciteit)
+        return capaciteit
+
+
+@dataclass
+class RoosterResultaat:
+    """Uitkomst van de planning"""
+    startdatum: datetime
+    einddatum: datetime
+    makespan: timedelta  # werktijd van eerste start tot laatste eind
+    werkdagen: float = 0  # doorlooptijd in werkdagen
+
+    # Per stap ID: (start, eind) in werkminuten vanaf het begin
+    tijden: Dict[int, Tuple[float, float]] = field(default_factory=dict)
+
+    # Bezettingsgraad (0-1) per resource: "personen" en elk beperkt materieel
+    benutting: Dict[str, float] = field(default_factory=dict)
+
+
+def plan_rooster(
+    stappen: List[DemontageStap],
+    instellingen: Optional[RoosterInstellingen] = None,
+    startdatum: Optional[datetime] = None
+) -> RoosterResultaat:
+    """
+    Plan demontagestappen met beperkte resources.
+
+    Afhankelijkheden:
+    - stappen van hetzelfde element in volgorde
+    - de eerste stap van een element wacht tot alle elementen uit
+      stap.afhankelijkheden uitgenomen zijn (hun stap met de hijskraan,
+      anders hun laatste stap); elementen zonder stappen tellen niet mee
+
+    Zet geplande_start en geplande_eind op elke stap.
+    """
+    instellingen = instellingen or RoosterInstellingen()
+    startdatum = startdatum or datetime.now()
+    capaciteit = instellingen.capaciteit
+
+    n = len(stappen)
+    duur = [s.geschatte_tijd.total_seconds() / 60 for s in stappen]
+    personen = [min(max(s.aantal_personen, 0), instellingen.aantal_personen) for s in stappen]
+    materieel: List[FrozenSet[str]] = [
+        frozenset(a for a in s.benodigde_apparatuur if a in capaciteit) for s in stappen
+    ]
+    for benodigd in set(materieel):
+        for naam in benodigd:
+            if capaciteit[naam] <= 0:
+                raise ValueError(f"Geen capaciteit voor benodigd materieel: {naam}")
+
+    opvolgers = _bouw_afhankelijkheden(stappen)
+    ingraad = [0] * n
+    for lijst in opvolgers:
+        for j in lijst:
+            ingraad[j] += 1
+
+    # Prioriteit: langste resterend pad (stappen staan in topologische volgorde)
+    rest = duur[:]
+    for i in range(n - 1, -1, -1):
+        if opvolgers[i]:
+            rest[i] = duur[i] + max(rest[j] for j in opvolgers[i])
+
+    # Klaarstaande stappen per resourceklasse
+    klassen: Dict[Tuple[int, FrozenSet[str]], List[Tuple[float, int]]] = {}
+
+    def klaarzetten(i: int) -> None:
+        heapq.heappush(klassen.setdefault((personen[i], materieel[i]), []), (-rest[i], i))
+
+    for i in range(n):
+        if ingraad[i] == 0:
+            klaarzetten(i)
+
+    vrij_personen = instellingen.aantal_personen
+    vrij = dict(capaciteit)
+    bezet = {naam: 0.0 for naam in capaciteit}
+    bezet_personen = 0.0
+
+    start = [0.0] * n
+    eind = [0.0] * n
+    lopend: List[Tuple[float, int]] = []
+    tijd = 0.0
+    gedaan = 0
+
+    while gedaan < n:
+        # Start zoveel mogelijk stappen op dit moment
+        while True:
+            beste = None
+            for (nodig, benodigd), heap in klassen.items():
+                if not heap or nodig > vrij_personen:
+                    continue
+                if any(vrij[naam] < 1 for naam in benodigd):
+                    continue
+                if beste is None or heap[0] < klassen[beste][0]:
+                    beste = (nodig, benodigd)
+            if beste is None:
+                break
+
+            _, i = heapq.heappop(klassen[beste])
+            vrij_personen -= personen[i]
+            for naam in materieel[i]:
+                vrij[naam] -= 1
+            start[i] = tijd
+            eind[i] = tijd + duur[i]
+            heapq.heappush(lopend, (eind[i], i))
+
+        if not lopend:
+            raise ValueError("Rooster loopt vast: afhankelijkheden niet te vervullen")
+
+        # Naar het volgende einde; alles wat dan klaar is vrijgeven
+        tijd = lopend[0][0]
+        while lopend and lopend[0][0] <= tijd:
+            _, i = heapq.heappop(lopend)
+            gedaan += 1
+            vrij_personen += personen[i]
+            bezet_personen += personen[i] * duur[i]
+            for naam in materieel[i]:
+                vrij[naam] += 1
+                bezet[naam] += duur[i]
+            for j in opvolgers[i]:
+                ingraad[j] -= 1
+                if ingraad[j] == 0:
+                    klaarzetten(j)
+
+    makespan = max(eind) if n else 0.0
+    kalender = _Kalender(startdatum, instellingen)
+    for i, stap in enumerate(stappen):
+        stap.geplande_start = kalender.datum(start[i])
+        stap.geplande_eind = kalender.datum(eind[i], einde=True)
+
+    benutting = {"personen": bezet_personen / (instellingen.aantal_personen * makespan) if makespan else 0.0}
+    for naam, minuten in bezet.items():
+        benutting[naam] = minuten / (capaciteit[naam] * makespan) if makespan else 0.0
+
+    return RoosterResultaat(
+        startdatum=kalender.datum(0.0),
+        einddatum=kalender.datum(makespan, einde=True),
+        makespan=timedelta(minutes=makespan),
+        werkdagen=makespan / (instellingen.werkuren_per_dag * 60),
+        tijden={stap.id: (start[i], eind[i]) for i, stap in enumerate(stappen)},
+        benutting=benutting,
+    )
+
+
+def _bouw_afhankelijkheden(stappen: List[DemontageStap]) -> List[List[int]]:
+    """Opvolgers per stap index"""
+    per_element: Dict[int, List[int]] = {}
+    for i, stap in enumerate(stappen):
+        per_element.setdefault(stap.element_id, []).append(i)
+
+    # Stap waarmee een element uitgenomen is
+    uitgenomen: Dict[int, int] = {}
+    for element_id, indices in per_element.items():
+        uitgenomen[element_id] = next(
+            (i for i in indices if "Hijskraan" in stappen[i].benodigde_apparatuur),
+            indices[-1]
+        )
+
+    opvolgers: List[List[int]] = [[] for _ in stappen]
+    for element_id, indices in per_element.items():
+        for a, b in zip(indices, indices[1:]):
+            opvolgers[a].append(b)
+        eerste = indices[0]
+        for voorganger in stappen[eerste].afhankelijkheden:
+            i = uitgenomen.get(voorganger)
+            if i is not None and voorganger != element_id:
+                opvolgers[i].append(eerste)
+    return opvolgers
+
+
+class _Kalender:
+    """Omrekening van werkminuten naar kalenderdata"""
+
+    def __init__(self, start: datetime, instellingen: RoosterInstellingen):
+        self.per_dag = instellingen.werkuren_per_dag * 60
+        werkdagen = set(instellingen.werkdagen)
+        if not werkdagen or self.per_dag <= 0:
+            raise ValueError("Rooster heeft geen werktijd")
+
+        # Eerste werkmoment op of na start
+        dag = start.replace(hour=instellingen.werkdag_start, minute=0, second=0, microsecond=0)
+        if start > dag + timedelta(minutes=self.per_dag):
+            dag += timedelta(days=1)
+        while dag.weekday() not in werkdagen:
+            dag += timedelta(days=1)
+        self.eerste_dag = dag
+        self.offset = 0.0
+        if start > dag:
+            self.offset = (start - dag).total_seconds() / 60
+
+        # Werkdagen in een week, relatief aan de eerste dag
+        self.week = [d for d in range(7) if (dag.weekday() + d) % 7 in werkdagen]
+
+    def datum(self, minuten: float, einde: bool = False) -> datetime:
+        totaal = minuten + self.offset
+        dag_index, rest = divmod(totaal, self.per_dag)
+        if einde and rest == 0 and dag_index > 0:
+            # Een eindtijd precies op de dag grens valt aan het einde van de vorige dag
+            dag_index -= 1
+            rest = self.per_dag
+        weken, n = divmod(int(dag_index), len(self.week))
+        dag = self.eerste_dag + timedelta(days=7 * weken + self.week[n])
+        return dag + timedelta(minutes=rest)
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, maak_raster_gebouw
+    from modules.m03_oogst_planning.planning import OogstPlanner
+
+    planner = OogstPlanner()
+    gebouw = maak_voorbeeld_gebouw()
+    start = datetime(2026, 3, 2, 7, 0)
+    plan = planner.maak_oogstplan(gebouw, start)
+    for instellingen in (RoosterInstellingen(aantal_personen=3, aantal_kranen=1),
+                         RoosterInstellingen(aantal_personen=8, aantal_kranen=2)):
+        rooster = plan_rooster(plan.stappen, instellingen, start)
+        print(f"{instellingen.aantal_personen} personen, {instellingen.aantal_kranen} kraan/kranen: "
+              f"makespan {rooster.makespan} ({rooster.werkdagen:.1f} werkdagen), "
+              f"klaar {rooster.einddatum:%a %d-%m %H:%M}")
+        print("  Benutting: " + ", ".join(f"{k} {v:.0%}" for k, v in rooster.benutting.items()))
+    print(f"Serieel opgeteld: {plan.totale_geschatte_tijd}")
+
+    groot = maak_raster_gebouw(velden_x=25, velden_y=25, verdiepingen=2)
+    plan = planner.maak_oogstplan(groot, start)
+    begin = time.perf_counter()
+    rooster = plan_rooster(plan.stappen, RoosterInstellingen(aantal_personen=12, aantal_kranen=3), start)
+    print(f"{len(groot.elementen)} elementen, {len(plan.stappen)} stappen gepland in "
+          f"{time.perf_counter() - begin:.2f} s: {rooster.werkdagen:.0f} werkdagen")
@@ -0,0 +1,198 @@
+"""
+Module 3: Oogst Planning - Scenario's
+
+Wat-als analyse op een bestaand oogstplan. Een wijziging van de
+profielvraag, de minimum herbruikbare lengte of een conditie raakt maar
+een deel van de elementen: alleen die scores worden herberekend en
+alleen elementen die van of naar SKIP gaan krijgen nieuwe of vervallen
+stappen. Elke wijziging geeft een PlanDiff terug.
+"""
+
+import bisect
+import copy
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple, Iterable, Union
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import Gebouw
+from modules.m03_oogst_planning.planning import (
+    OogstPlanner, OogstPlan, OogstPrioriteit, DemontageStap, ScoreTabel,
+    CONDITIE_SCORES, STANDAARD_SCORE
+)
+from modules.m03_oogst_planning.volgorde import DemontageGraaf
+
+
+@dataclass
+class PlanDiff:
+    """Verschil in het oogstplan door één wijziging"""
+    toegevoegd: List[int] = field(default_factory=list)   # element ID's die nu geoogst worden
+    verwijderd: List[int] = field(default_factory=list)   # element ID's die nu SKIP zijn
+    prioriteit_gewijzigd: Dict[int, Tuple[OogstPrioriteit, OogstPrioriteit]] = field(default_factory=dict)
+    nieuwe_stappen: List[DemontageStap] = field(default_factory=list)
+    vervallen_stappen: List[DemontageStap] = field(default_factory=list)
+    herberekend: int = 0  # aantal opnieuw gescoorde elementen
+
+    @property
+    def leeg(self) -> bool:
+        return not self.prioriteit_gewijzigd
+
+
+class OogstScenario:
+    """
+    Oogstplan dat incrementeel bijgewerkt wordt bij parameterwijzigingen.
+
+    Het scenario werkt op een eigen kopie van de planner parameters en
+    wijzigt het gebouw niet; condities zijn overrides binnen het scenario.
+    Het rooster wordt niet automatisch opnieuw gepland, zie herplan_rooster().
+    """
+
+    def __init__(
+        self,
+        planner: OogstPlanner,
+        gebouw: Gebouw,
+        startdatum: Optional[datetime] = None,
+        instellingen=None
+    ):
+        self.planner = copy.deepcopy(planner)
+        self.gebouw = gebouw
+        self.instellingen = instellingen
+        self.graaf = DemontageGraaf.van_gebouw(gebouw)
+        self.plan: OogstPlan = self.planner.maak_oogstplan(
+            gebouw, startdatum, instellingen, graaf=self.graaf
+        )
+        self.arrays = gebouw.arrays
+        self.scores: ScoreTabel = self.plan.herbruikbaarheid
+        self._volgorde_index: Dict[int, int] = {i: idx for idx, i in enumerate(self.plan.volgorde)}
+        self._condities: Dict[int, str] = {}
+
+    # ------------------------------------------------------------
+    # Wijzigingen
+    # ------------------------------------------------------------
+
+    def wijzig_profiel_vraag(self, profiel_naam: str, score: float) -> PlanDiff:
+        """Nieuwe vraagscore voor één profiel"""
+        self.planner.profiel_vraag[profiel_naam] = score
+        if profiel_naam not in self.arrays.profiel_namen:
+            return PlanDiff()
+        code = self.arrays.profiel_namen.index(profiel_naam)
+        rijen = np.flatnonzero(self.arrays.profiel_code == code)
+        oud = self.scores.bijwerken(rijen, profiel_score=np.full(len(rijen), float(score)))
+        return self._pas_toe(rijen, oud)
+
+    def wijzig_min_herbruik_lengte(self, lengte: float) -> PlanDiff:
+        """Nieuwe minimum lengte voor hergebruik"""
+        oud_lengte = self.planner.min_herbruik_lengte
+        self.planner.min_herbruik_lengte = lengte
+
+        # Alleen elementen tussen de oude en nieuwe grens kunnen veranderen
+        laag, hoog = min(oud_lengte, lengte), max(oud_lengte, lengte)
+        rijen = np.flatnonzero((self.arrays.lengte >= laag) & (self.arrays.lengte < hoog))
+
+        grenzen = self.planner._lengte_grenzen()
+        element_lengte = self.arrays.lengte[rijen]
+        voldoet = [element_lengte >= grens for grens, _ in grenzen]
+        lengte_score = np.select(voldoet, [waarde for _, waarde in grenzen], default=20).astype(np.float64)
+        te_kort = ~np.logical_or.reduce(voldoet) if len(rijen) else np.zeros(0, dtype=bool)
+
+        oud = self.scores.bijwerken(rijen, lengte_score=lengte_score, te_kort=te_kort)
+        return self._pas_toe(rijen, oud)
+
+    def wijzig_conditie(self, element_ids: Union[int, Iterable[int]], conditie: str) -> PlanDiff:
+        """Andere conditie (bijv. na inspectie) voor één of meer elementen"""
+        if isinstance(element_ids, int):
+            element_ids = [element_ids]
+        element_ids = list(element_ids)
+        for element_id in element_ids:
+            self._condities[element_id] = conditie
+        rijen = np.array([self.scores.rij(i) for i in element_ids], dtype=np.int64)
+        waarde = CONDITIE_SCORES.get(conditie, STANDAARD_SCORE)
+        oud = self.scores.bijwerken(rijen, conditie_score=np.full(len(rijen), float(waarde)))
+        return self._pas_toe(rijen, oud)
+
+    def conditie_van(self, element_id: int) -> str:
+        """Conditie binnen dit scenario"""
+        return self._condities.get(element_id, self.gebouw.elementen[element_id].conditie)
+
+    def herplan_rooster(self) -> None:
+        """Plan het rooster opnieuw na een reeks wijzigingen"""
+        from modules.m03_oogst_planning.rooster import plan_rooster
+        self.plan.rooster = plan_rooster(self.plan.stappen, self.instellingen, self.plan.startdatum)
+        self.plan.einddatum = self.plan.rooster.einddatum
+
+    # ------------------------------------------------------------
+    # Intern
+    # ------------------------------------------------------------
+
+    def _pas_toe(self, rijen: np.ndarray, oud: np.ndarray) -> PlanDiff:
+        """Stappen bijwerken voor rijen waarvan de prioriteit veranderde"""
+        diff = PlanDiff(herberekend=len(rijen))
+        nieuw = self.scores.prioriteit_code[rijen]
+        gewijzigd = np.flatnonzero(nieuw != oud)
+        skip = OogstPrioriteit.SKIP.value
+
+        for k in gewijzigd.tolist():
+            element_id = int(self.scores.element_ids[rijen[k]])
+            van, naar = int(oud[k]), int(nieuw[k])
+            diff.prioriteit_gewijzigd[element_id] = (OogstPrioriteit(van), OogstPrioriteit(naar))
+            if naar == skip:
+                diff.verwijderd.append(element_id)
+                diff.vervallen_stappen.extend(self._verwijder_stappen(element_id))
+            elif van == skip:
+                diff.toegevoegd.append(element_id)
+                diff.nieuwe_stappen.extend(self._voeg_stappen_toe(element_id))
+        return diff
+
+    def _voeg_stappen_toe(self, element_id: int) -> List[DemontageStap]:
+        element = self.gebouw.elementen[element_id]
+        stappen = self.planner.plan_element(element, self._volgorde_index[element_id], self.graaf)
+        for stap in stappen:
+            bisect.insort(self.plan.stappen, stap, key=lambda s: s.volgorde)
+        return stappen
+
+    def _verwijder_stappen(self, element_id: int) -> List[DemontageStap]:
+        # Stappen van een element liggen aaneengesloten (volgorde * 10 + k)
+        basis = self._volgorde_index[element_id] * 10
+        stappen = self.plan.stappen
+        begin = bisect.bisect_left(stappen, basis, key=lambda s: s.volgorde)
+        eind = bisect.bisect_left(stappen, basis + 10, key=lambda s: s.volgorde)
+        vervallen = stappen[begin:eind]
+        del stappen[begin:eind]
+        return vervallen
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, maak_raster_gebouw
+
+    gebouw = maak_voorbeeld_gebouw()
+    scenario = OogstScenario(OogstPlanner(), gebouw, datetime(2026, 3, 2, 7, 0))
+    print(f"Basis: {len(scenario.plan.stappen)} stappen")
+
+    diff = scenario.wijzig_profiel_vraag("HEA 300", 10)
+    print(f"HEA 300 vraag 10: {len(diff.prioriteit_gewijzigd)} gewijzigd, "
+          f"{len(diff.verwijderd)} vervallen, {len(diff.vervallen_stappen)} stappen minder")
+    kolom = next(e for e in gebouw.elementen.values() if e.naam == "K11")
+    diff = scenario.wijzig_conditie(kolom.id, "slecht")
+    print(f"K11 slecht: {[(gebouw.elementen[i].naam, a.name, b.name) for i, (a, b) in diff.prioriteit_gewijzigd.items()]}")
+    scenario.herplan_rooster()
+    print(f"Na wijzigingen: {len(scenario.plan.stappen)} stappen, einde {scenario.plan.einddatum:%d-%m %H:%M}")
+
+    groot = maak_raster_gebouw(velden_x=40, velden_y=40, verdiepingen=4)
+    start = time.perf_counter()
+    scenario = OogstScenario(OogstPlanner(), groot)
+    print(f"\n{len(groot.elementen)} elementen: scenario opgebouwd in {time.perf_counter() - start:.1f} s")
+    for vraag in (40, 20, 90):
+        start = time.perf_counter()
+        diff = scenario.wijzig_profiel_vraag("IPE 200", vraag)
+        print(f"  IPE 200 vraag {vraag}: {diff.herberekend} herberekend, "
+              f"{len(diff.prioriteit_gewijzigd)} gewijzigd in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for lengte in (7000, 3000):
+        start = time.perf_counter()
+        diff = scenario.wijzig_min_herbruik_lengte(lengte)
+        print(f"  Min lengte {lengte}: {diff.herberekend} herberekend, "
+              f"+{len(diff.nieuwe_stappen)}/-{len(diff.vervallen_stappen)} stappen in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
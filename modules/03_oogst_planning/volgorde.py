@@ -0,0 +1,241 @@
+"""
+Module 3: Oogst Planning - Demontage volgorde
+
+Voorrangsgraaf voor de demontage: een element dat op een ander element
+rust (ligger op balk, balk op kolom, kolom op kolom) moet eerst weg.
+De graaf wordt opgebouwd uit de verbindingen van het gebouw; een
+topologische sortering geeft de volgorde, met bij gelijke beschikbaarheid
+eerst secundaire elementen en van boven naar beneden.
+"""
+
+import heapq
+from typing import Optional, List, Dict, Iterable, Tuple
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import Gebouw, ElementType, Verbinding
+from modules.m02_gebouw_structuur.arrays import ELEMENT_TYPEN
+from modules.m02_gebouw_structuur.verbindingen import detecteer_verbindingen
+
+
+# Draagrang: een element met lagere rang rust op een element met hogere rang
+DRAAG_RANG = {
+    ElementType.KOLOM: 3,
+    ElementType.BALK: 2,
+}
+SECUNDAIRE_RANG = 1
+
+
+class DemontageGraaf:
+    """
+    Voorrangsgraaf (DAG) over de elementen van een gebouw.
+
+    Kant a -> b: a moet verwijderd zijn voordat b verwijderd mag worden.
+    Per verbinding gaat de kant van de lagere naar de hogere draagrang;
+    bij gelijke rang eerst het hoogste element. Omdat (rang, -hoogte)
+    langs elke kant strikt oploopt, is de graaf altijd acyclisch.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        rang: np.ndarray,
+        hoogte: np.ndarray,
+        van: np.ndarray,
+        naar: np.ndarray
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.rang = np.asarray(rang)
+        self.hoogte = np.asarray(hoogte, dtype=np.float64)
+        self._rij_van: Dict[int, int] = {i: rij for rij, i in enumerate(self.ids.tolist())}
+
+        # Dubbele kanten (meerdere verbindingen tussen twee elementen) eruit
+        n = len(self.ids)
+        sleutel = np.unique(np.asarray(van, dtype=np.int64) * n + np.asarray(naar, dtype=np.int64))
+        van, naar = np.divmod(sleutel, n) if n else (sleutel, sleutel)
+
+        # CSR opvolgers en voorgangers
+        self._opvolger_ptr, self._opvolgers = _csr(van, naar, n)
+        self._voorganger_ptr, self._voorgangers = _csr(naar, van, n)
+
+    @classmethod
+    def van_gebouw(
+        cls,
+        gebouw: Gebouw,
+        verbindingen: Optional[Iterable[Verbinding]] = None,
+        tolerantie_mm: float = 50.0
+    ) -> 'DemontageGraaf':
+        """
+        Bouw de graaf uit de verbindingen van een gebouw.
+
+        Heeft het gebouw geen verbindingen (bijv. een geïmporteerd model),
+        dan worden ze uit de geometrie afgeleid zonder ze toe te voegen.
+        """
+        arrays = gebouw.arrays
+        if verbindingen is None:
+            verbindingen = gebouw.verbindingen or detecteer_verbindingen(
+                gebouw, tolerantie_mm, toevoegen=False
+            )
+
+        rang_per_code = np.array([DRAAG_RANG.get(t, SECUNDAIRE_RANG) for t in ELEMENT_TYPEN])
+        rang = rang_per_code[arrays.type_code]
+        hoogte = np.maximum(arrays.start[:, 2], arrays.eind[:, 2])
+
+        paren = [
+            (arrays.rij_van(v.element1_id), arrays.rij_van(v.element2_id))
+            for v in verbindingen
+        ]
+        paren = np.array(
+            [p for p in paren if p[0] is not None and p[1] is not None and p[0] != p[1]],
+            dtype=np.int64
+        ).reshape(-1, 2)
+        a, b = paren[:, 0], paren[:, 1]
+
+        # a eerst als a lager in rang is, of bij gelijke rang hoger ligt
+        a_eerst = (rang[a] < rang[b]) | ((rang[a] == rang[b]) & (hoogte[a] > hoogte[b]))
+        b_eerst = (rang[b] < rang[a]) | ((rang[a] == rang[b]) & (hoogte[b] > hoogte[a]))
+        van = np.concatenate([a[a_eerst], b[b_eerst]])
+        naar = np.concatenate([b[a_eerst], a[b_eerst]])
+        return cls(arrays.ids, rang, hoogte, van, naar)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def aantal_kanten(self) -> int:
+        return len(self._opvolgers)
+
+    def voorgangers(self, element_id: int) -> List[int]:
+        """Elementen die direct vóór dit element verwijderd moeten zijn"""
+        rij = self._rij_van[element_id]
+        return self.ids[self._voorgangers[self._voorganger_ptr[rij]:self._voorganger_ptr[rij + 1]]].tolist()
+
+    def opvolgers(self, element_id: int) -> List[int]:
+        """Elementen die pas na dit element verwijderd kunnen worden"""
+        rij = self._rij_van[element_id]
+        return self.ids[self._opvolgers[self._opvolger_ptr[rij]:self._opvolger_ptr[rij + 1]]].tolist()
+
+    def volgorde(self) -> List[int]:
+        """
+        Topologische volgorde (Kahn) van element ID's.
+
+        Van de beschikbare elementen gaat steeds het element met de
+        laagste draagrang eerst, daarna het hoogste, daarna de volgorde
+        in het gebouw.
+        """
+        n = len(self.ids)
+        ingraad = np.diff(self._voorganger_ptr).tolist()
+        rang = self.rang.tolist()
+        hoogte = self.hoogte.tolist()
+        ptr = self._opvolger_ptr.tolist()
+        opvolgers = self._opvolgers.tolist()
+
+        klaar = [(rang[i], -hoogte[i], i) for i in range(n) if ingraad[i] == 0]
+        heapq.heapify(klaar)
+        volgorde: List[int] = []
+        while klaar:
+            _, _, rij = heapq.heappop(klaar)
+            volgorde.append(rij)
+            for opvolger in opvolgers[ptr[rij]:ptr[rij + 1]]:
+                ingraad[opvolger] -= 1
+                if ingraad[opvolger] == 0:
+                    heapq.heappush(klaar, (rang[opvolger], -hoogte[opvolger], opvolger))
+
+        if len(volgorde) != n:
+            raise ValueError("Demontagegraaf bevat een cyclus")
+        return self.ids[volgorde].tolist()
+
+    def kanten(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Alle kanten als rijen (van, naar), gesorteerd op van"""
+        van = np.repeat(np.arange(len(self.ids)), np.diff(self._opvolger_ptr))
+        return van, self._opvolgers
+
+    def niveaus(self) -> np.ndarray:
+        """Werkfront per rij: lengte van het langste pad vanaf een bron"""
+        niveau = np.zeros(len(self.ids), dtype=np.int64)
+        ptr = self._opvolger_ptr.tolist()
+        opvolgers = self._opvolgers.tolist()
+        for rij in (self._rij_van[i] for i in self.volgorde()):
+            for opvolger in opvolgers[ptr[rij]:ptr[rij + 1]]:
+                if niveau[opvolger] <= niveau[rij]:
+                    niveau[opvolger] = niveau[rij] + 1
+        return niveau
+
+    def werkfronten(self) -> List[List[int]]:
+        """
+        Werkfronten: groepen elementen die tegelijk verwijderd kunnen worden.
+
+        Front k bevat de elementen waarvan alle voorgangers in eerdere
+        fronten zitten (langste pad vanaf een bron). Binnen een front
+        zijn de elementen onderling onafhankelijk.
+        """
+        if not len(self.ids):
+            return []
+        niveau = self.niveaus()
+        volgorde = np.argsort(niveau, kind="stable")
+        grenzen = np.searchsorted(niveau[volgorde], np.arange(1, niveau.max() + 1))
+        return [self.ids[deel].tolist() for deel in np.split(volgorde, grenzen)]
+
+    def deelgebieden(self) -> List[List[int]]:
+        """
+        Onafhankelijke deelgebieden: samenhangende delen van de graaf.
+
+        Tussen deelgebieden bestaan geen voorrangsrelaties, zodat ploegen
+        er parallel aan kunnen werken.
+        """
+        n = len(self.ids)
+        ouder = list(range(n))
+
+        def wortel(i: int) -> int:
+            while ouder[i] != i:
+                ouder[i] = ouder[ouder[i]]
+                i = ouder[i]
+            return i
+
+        ptr = self._opvolger_ptr.tolist()
+        opvolgers = self._opvolgers.tolist()
+        for rij in range(n):
+            for opvolger in opvolgers[ptr[rij]:ptr[rij + 1]]:
+                a, b = wortel(rij), wortel(opvolger)
+                if a != b:
+                    ouder[max(a, b)] = min(a, b)
+
+        delen: Dict[int, List[int]] = {}
+        for i in self.volgorde():
+            delen.setdefault(wortel(self._rij_van[i]), []).append(i)
+        return sorted(delen.values(), key=len, reverse=True)
+
+
+def _csr(van: np.ndarray, naar: np.ndarray, n: int):
+    """CSR (indptr, indices) van kanten van -> naar"""
+    volgorde = np.argsort(van, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(van, minlength=n), out=indptr[1:])
+    return indptr, np.asarray(naar, dtype=np.int64)[volgorde]
+
+
+if __name__ == "__main__":
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, maak_raster_gebouw
+
+    gebouw = maak_voorbeeld_gebouw()
+    graaf = DemontageGraaf.van_gebouw(gebouw)
+    namen = {e.id: e.naam for e in gebouw.elementen.values()}
+    print(f"{gebouw.naam}: {len(graaf)} elementen, {graaf.aantal_kanten} voorrangsrelaties")
+    print(f"Volgorde: {[namen[i] for i in graaf.volgorde()]}")
+    for k, front in enumerate(graaf.werkfronten(), 1):
+        print(f"  Front {k}: {[namen[i] for i in front]}")
+    print(f"Deelgebieden: {[len(d) for d in graaf.deelgebieden()]}")
+
+    groot = maak_raster_gebouw(velden_x=40, velden_y=40, verdiepingen=4)
+    start = time.perf_counter()
+    graaf = DemontageGraaf.van_gebouw(groot)
+    opgebouwd = time.perf_counter()
+    volgorde = graaf.volgorde()
+    fronten = graaf.werkfronten()
+    klaar = time.perf_counter()
+    print(f"{len(graaf)} elementen, {graaf.aantal_kanten} relaties: graaf in "
+          f"{(opgebouwd - start) * 1000:.0f} ms, volgorde + {len(fronten)} werkfronten in "
+          f"{(klaar - opgebouwd) * 1000:.0f} ms")
@@ -0,0 +1,389 @@
+"""
+Module 3: Oogst Planning - Vraaggestuurd oogsten
+
+Kiest welke elementen geoogst worden op basis van de werkelijke open
+vraag in plaats van een vaste populariteit per profiel. Eerst wordt de
+vraag afgeboekt op de bestaande voorraad; de rest wordt gedekt door
+elementen uit de gebouwen op de bouwplaats op maat te zagen.
+
+Doel: maximale gedekte vraag (mm, gewogen met 1/prioriteit) per
+persoonsuur. Greedy met bovengrenzen (lazy greedy): gelijke elementen
+(profiel, lengte, schoonmaakwerk) vormen één groep, een groep wordt pas
+opnieuw doorgerekend als de vraag voor zijn profiel veranderd is, en een
+gekozen zaagpatroon wordt in één keer herhaald zolang vraag en elementen
+het toelaten.
+"""
+
+import bisect
+import heapq
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Tuple, Iterable
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.m02_gebouw_structuur.structuur import Gebouw
+from modules.m03_oogst_planning.planning import OogstPlanner
+from modules.m04_originele_balken_db.voorraad import VoorraadDatabase
+from modules.m05_matching_algoritme.matching import VraagItem
+
+
+# Persoonsminuten per zaagsnede op de bouwplaats
+ZAAG_TIJD = 10
+
+
+@dataclass
+class Zaagplan:
+    """Zaagplan voor één te oogsten element (op de bouwplaats)"""
+    gebouw_id: int
+    element_id: int
+    profiel_naam: str
+    lengte: float
+    snedes: List[Tuple[float, int]]  # [(lengte, vraag_id), ...]
+    rest_lengte: float
+    ploeg_uren: float
+
+
+@dataclass
+class VraaggestuurdResultaat:
+    """Keuze van te oogsten elementen en dekking van de vraag"""
+    zaagplannen: List[Zaagplan] = field(default_factory=list)
+    uit_voorraad: Dict[int, List[int]] = field(default_factory=dict)  # vraag_id -> voorraad ID's
+    gedekt: Dict[int, int] = field(default_factory=dict)              # vraag_id -> aantal uit oogst
+    open_vraag: Dict[int, int] = field(default_factory=dict)          # vraag_id -> niet gedekt aantal
+    gedekte_waarde: float = 0  # mm / prioriteit, alleen uit oogst
+    ploeg_uren: float = 0
+
+    @property
+    def dekking_per_uur(self) -> float:
+        """Gedekte vraag (mm / prioriteit) per persoonsuur"""
+        return self.gedekte_waarde / self.ploeg_uren if self.ploeg_uren else 0.0
+
+    def elementen(self) -> Dict[int, List[int]]:
+        """Te oogsten element ID's per gebouw (voor maak_oogstplan(selectie=...))"""
+        per_gebouw: Dict[int, List[int]] = {}
+        for plan in self.zaagplannen:
+            per_gebouw.setdefault(plan.gebouw_id, []).append(plan.element_id)
+        return per_gebouw
+
+
+class VraaggestuurdePlanner:
+    """Oogstselectie en zaagplannen op basis van open vraag en voorraad"""
+
+    def __init__(
+        self,
+        planner: Optional[OogstPlanner] = None,
+        zaagsnede: float = 5,             # mm verlies per zaagsnede
+        zaag_tijd: float = ZAAG_TIJD,     # persoonsminuten per zaagsnede
+        min_conditie_score: float = 50    # slechtere elementen niet oogsten
+    ):
+        self.planner = planner or OogstPlanner()
+        self.zaagsnede = zaagsnede
+        self.zaag_tijd = zaag_tijd
+        self.min_conditie_score = min_conditie_score
+
+    def optimaliseer(
+        self,
+        gebouwen: Iterable[Gebouw],
+        vragen: List[VraagItem],
+        voorraad: Optional[VoorraadDatabase] = None,
+        budget_uren: Optional[float] = None
+    ) -> VraaggestuurdResultaat:
+        """
+        Kies te oogsten elementen en zaagplannen.
+
+        Args:
+            gebouwen: gebouwen waaruit geoogst kan worden
+            vragen: open vraag
+            voorraad: bestaande voorraad, wordt eerst afgeboekt
+            budget_uren: maximaal aantal persoonsuren voor oogsten en zagen
+        """
+        gebouwen = list(gebouwen)
+        resultaat = VraaggestuurdResultaat()
+        open_aantal = {v.id: v.aantal for v in vragen}
+        if voorraad is not None:
+            resultaat.uit_voorraad = self._dek_uit_voorraad(vragen, voorraad, open_aantal)
+
+        # Stuktypen: één per vraagregel met open aantal
+        stukken = [v for v in vragen if open_aantal[v.id] > 0]
+        stuk_lengte = [float(v.lengte_mm) for v in stukken]
+        stuk_waarde = [1 / max(v.prioriteit, 1) for v in stukken]  # per mm
+        aantal = [open_aantal[v.id] for v in stukken]
+
+        # Per elementprofiel de stukken die eruit gezaagd mogen worden,
+        # hoogste waarde en langste eerst
+        profiel_code: Dict[str, int] = {}
+        per_profiel: List[List[int]] = []
+        accepteert: List[List[int]] = [[] for _ in stukken]  # stuk -> profielcodes
+        for t, v in enumerate(stukken):
+            for naam in dict.fromkeys([v.profiel_naam] + v.alternatieven):
+                if naam not in profiel_code:
+                    profiel_code[naam] = len(per_profiel)
+                    per_profiel.append([])
+                per_profiel[profiel_code[naam]].append(t)
+                accepteert[t].append(profiel_code[naam])
+        for lijst in per_profiel:
+            lijst.sort(key=lambda t: (-stuk_waarde[t], -stuk_lengte[t]))
+        kortste = [min(stuk_lengte[t] for t in lijst) for lijst in per_profiel]
+
+        groepen = self._groepeer_kandidaten(gebouwen, profiel_code, kortste)
+        if groepen is None:
+            resultaat.open_vraag = {i: n for i, n in open_aantal.items() if n > 0}
+            return resultaat
+        g_profiel, g_lengte, g_werk, leden_gebouw, leden_rij, leden_ptr = groepen
+        basis = self._basis_tijd(gebouwen)
+        volgende = leden_ptr[:-1].copy()  # eerstvolgend vrij lid per groep
+
+        # Bovengrens: hele lengte gevuld met de duurste vraag, zonder zaagtijd
+        vraag_mm = np.zeros(len(per_profiel))
+        max_waarde = np.zeros(len(per_profiel))
+        for p, lijst in enumerate(per_profiel):
+            vraag_mm[p] = sum(stuk_lengte[t] * aantal[t] for t in lijst)
+            max_waarde[p] = max(stuk_waarde[t] for t in lijst)
+        grens = np.minimum(g_lengte, vraag_mm[g_profiel]) * max_waarde[g_profiel] / (basis + g_werk)
+
+        versie = [0] * len(per_profiel)
+        heap = [(-grens[g], g, -1) for g in np.flatnonzero(grens > 0).tolist()]
+        heapq.heapify(heap)
+        patronen: Dict[int, Tuple] = {}
+        budget = budget_uren * 60 if budget_uren is not None else None
+        besteed = 0.0
+        profiel_namen = list(profiel_code)
+
+        while heap:
+            _, g, berekend = heapq.heappop(heap)
+            p = int(g_profiel[g])
+            if berekend != versie[p]:
+                # Verouderd: patroon opnieuw bepalen met de huidige vraag
+                patroon = self._zaagpatroon(
+                    float(g_lengte[g]), per_profiel[p], stuk_lengte, stuk_waarde, aantal, kortste[p]
+                )
+                if patroon is None:
+                    continue
+                waarde, snedes, rest, aantal_snedes = patroon
+                kosten = basis + float(g_werk[g]) + self.zaag_tijd * aantal_snedes
+                patronen[g] = (waarde, snedes, rest, kosten)
+                heapq.heappush(heap, (-waarde / kosten, g, versie[p]))
+                continue
+
+            # Actueel en het beste: patroon zo vaak mogelijk herhalen
+            waarde, snedes, rest, kosten = patronen[g]
+            herhalingen = int(leden_ptr[g + 1] - volgende[g])
+            for t, k in snedes:
+                herhalingen = min(herhalingen, aantal[t] // k)
+            if budget is not None:
+                herhalingen = min(herhalingen, int((budget - besteed) // kosten))
+            if herhalingen <= 0:
+                continue
+
+            gewijzigd = set()
+            for t, k in snedes:
+                aantal[t] -= k * herhalingen
+                gewijzigd.update(accepteert[t])
+            for q in gewijzigd:
+                versie[q] += 1
+
+            plan_snedes = [(stuk_lengte[t], stukken[t].id) for t, k in snedes for _ in range(k)]
+            for lid in range(volgende[g], volgende[g] + herhalingen):
+                gebouw = gebouwen[leden_gebouw[lid]]
+                resultaat.zaagplannen.append(Zaagplan(
+                    gebouw_id=gebouw.id,
+                    element_id=int(gebouw.arrays.ids[leden_rij[lid]]),
+                    profiel_naam=profiel_namen[p],
+                    lengte=float(g_lengte[g]),
+                    snedes=list(plan_snedes),
+                    rest_lengte=rest,
+                    ploeg_uren=kosten / 60,
+                ))
+            volgende[g] += herhalingen
+            besteed += kosten * herhalingen
+            resultaat.gedekte_waarde += waarde * herhalingen
+
+            if volgende[g] < leden_ptr[g + 1]:
+                heapq.heappush(heap, (-waarde / kosten, g, -1))
+
+        resultaat.ploeg_uren = besteed / 60
+        for t, v in enumerate(stukken):
+            gedekt = open_aantal[v.id] - aantal[t]
+            if gedekt:
+                resultaat.gedekt[v.id] = gedekt
+            open_aantal[v.id] = aantal[t]
+        resultaat.open_vraag = {i: n for i, n in open_aantal.items() if n > 0}
+        return resultaat
+
+    # ------------------------------------------------------------
+    # Intern
+    # ------------------------------------------------------------
+
+    def _dek_uit_voorraad(
+        self,
+        vragen: List[VraagItem],
+        voorraad: VoorraadDatabase,
+        open_aantal: Dict[int, int]
+    ) -> Dict[int, List[int]]:
+        """
+        Boek vraag af op beschikbare voorraad: per stuk de kortste passende
+        balk (één stuk per balk, zoals MatchingAlgoritme), hoogste prioriteit
+        en langste stukken eerst. Werkt open_aantal bij.
+        """
+        beschikbaar: Dict[str, List[Tuple[float, int]]] = {}
+        uit_voorraad: Dict[int, List[int]] = {}
+        for vraag in sorted(vragen, key=lambda v: (v.prioriteit, -v.lengte_mm)):
+            nodig = vraag.lengte_mm - vraag.lengte_tolerantie_min
+            while open_aantal[vraag.id] > 0:
+                gevonden = None
+                for profiel in [vraag.profiel_naam] + vraag.alternatieven:
+                    lijst = beschikbaar.get(profiel)
+                    if lijst is None:
+                        lijst = beschikbaar[profiel] = sorted(
+                            (item.lengte_mm, item.id) for item in voorraad.zoek_op_profiel(profiel)
+                        )
+                    i = bisect.bisect_left(lijst, (nodig, 0))
+                    if i < len(lijst):
+                        gevonden = lijst.pop(i)[1]
+                        break
+                if gevonden is None:
+                    break
+                uit_voorraad.setdefault(vraag.id, []).append(gevonden)
+                open_aantal[vraag.id] -= 1
+        return uit_voorraad
+
+    def _groepeer_kandidaten(
+        self,
+        gebouwen: List[Gebouw],
+        profiel_code: Dict[str, int],
+        kortste: List[float]
+    ):
+        """
+        Geschikte elementen van alle gebouwen, gegroepeerd op (profiel,
+        lengte, schoonmaakwerk). Geeft per groep profiel, lengte en werk
+        en de leden (gebouw index, rij) als CSR, of None zonder kandidaten.
+        """
+        delen = []
+        for k, gebouw in enumerate(gebouwen):
+            arrays = gebouw.arrays
+            if not len(arrays):
+                continue
+            scores = self.planner.analyseer_batch(gebouw)
+            code = np.array([profiel_code.get(n, -1) for n in arrays.profiel_namen])[arrays.profiel_code]
+            minimum = np.array(kortste + [np.inf])[code]
+            geschikt = (code >= 0) & (scores.conditie_score >= self.min_conditie_score) & (arrays.lengte >= minimum)
+            rijen = np.flatnonzero(geschikt)
+            delen.append((np.full(len(rijen), k), rijen, code[rijen], arrays.lengte[rijen],
+                          scores.schoonmaak_werk[rijen]))
+        if not delen or not sum(len(d[1]) for d in delen):
+            return None
+
+        gebouw_idx, rijen, profiel, lengte, werk = (np.concatenate(kolom) for kolom in zip(*delen))
+        sleutels = np.rec.fromarrays([profiel, lengte, werk])
+        uniek, inverse = np.unique(sleutels, return_inverse=True)
+        volgorde = np.argsort(inverse, kind="stable")
+        ptr = np.zeros(len(uniek) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(inverse, minlength=len(uniek)), out=ptr[1:])
+        return (
+            uniek.f0.astype(np.int64), uniek.f1.astype(np.float64), uniek.f2.astype(np.float64),
+            gebouw_idx[volgorde], rijen[volgorde], ptr
+        )
+
+    def _basis_tijd(self, gebouwen: List[Gebouw]) -> float:
+        """Persoonsminuten van de demontagestappen van één element"""
+        element = next(e for g in gebouwen for e in g.elementen.values())
+        return sum(
+            stap.geschatte_tijd.total_seconds() / 60 * stap.aantal_personen
+            for stap in self.planner.genereer_demontage_stappen(element, 0)
+        )
+
+    def _zaagpatroon(
+        self,
+        lengte: float,
+        kandidaten: List[int],
+        stuk_lengte: List[float],
+        stuk_waarde: List[float],
+        aantal: List[int],
+        kortste: float
+    ):
+        """
+        Greedy zaagpatroon: stukken in volgorde van waarde, zoveel als
+        passen. Stukken passen als som + zaagsnede * (n - 1) <= lengte.
+
+        Returns:
+            (waarde, [(stuk, aantal)], restlengte, aantal zaagsnedes) of None
+        """
+        kerf = self.zaagsnede
+        ruimte = lengte + kerf  # elk stuk kost lengte + zaagsnede
+        waarde = 0.0
+        snedes: List[Tuple[int, int]] = []
+        for t in kandidaten:
+            n = aantal[t]
+            stuk = stuk_lengte[t] + kerf
+            if n == 0 or stuk > ruimte:
+                continue
+            k = min(n, int(ruimte // stuk))
+            ruimte -= k * stuk
+            snedes.append((t, k))
+            waarde += k * stuk_lengte[t] * stuk_waarde[t]
+            if ruimte < kortste + kerf:
+                break
+        if not snedes:
+            return None
+
+        stuks = sum(k for _, k in snedes)
+        # ruimte is lengte - som - zaagsnede * (n - 1); als er een rest
+        # overblijft wordt die er met nog een zaagsnede afgezaagd
+        rest = ruimte - kerf  # lengte - som - zaagsnede * n
+        if rest > 0:
+            return waarde, snedes, rest, stuks
+        return waarde, snedes, 0.0, stuks - 1
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from modules.m02_gebouw_structuur.structuur import maak_raster_gebouw
+    from modules.m04_originele_balken_db.voorraad import maak_voorbeeld_voorraad
+
+    random.seed(1)
+    start = time.perf_counter()
+    gebouwen = []
+    for k in range(200):
+        gebouw = maak_raster_gebouw(
+            velden_x=random.randint(4, 9), velden_y=random.randint(4, 9), verdiepingen=random.randint(1, 2),
+            overspanning_x=random.choice([5400, 6000, 7200]), naam=f"Hal {k + 1}"
+        )
+        for element in random.sample(list(gebouw.elementen.values()), 20):
+            element.conditie = random.choice(["goed", "matig", "slecht"])
+        gebouwen.append(gebouw)
+    aantal_elementen = sum(len(g.elementen) for g in gebouwen)
+    print(f"{len(gebouwen)} gebouwen, {aantal_elementen} elementen opgebouwd in {time.perf_counter() - start:.1f} s")
+
+    profielen = ["HEA 300", "HEB 200", "IPE 200", "HEA 200"]
+    vragen = [
+        VraagItem(
+            profiel_naam=random.choice(profielen),
+            lengte_mm=random.randrange(1500, 7000, 50),
+            aantal=random.randint(1, 40),
+            prioriteit=random.randint(1, 3),
+            alternatieven=["HEB 200"] if random.random() < 0.1 else [],
+        )
+        for _ in range(3000)
+    ]
+
+    optimalisatie = VraaggestuurdePlanner()
+    start = time.perf_counter()
+    resultaat = optimalisatie.optimaliseer(gebouwen, vragen, maak_voorbeeld_voorraad(), budget_uren=40000)
+    duur = time.perf_counter() - start
+    totaal = sum(v.aantal for v in vragen)
+    print(f"{len(vragen)} vraagregels ({totaal} stuks) in {duur:.1f} s:")
+    print(f"  Uit voorraad: {sum(len(v) for v in resultaat.uit_voorraad.values())} stuks")
+    print(f"  Uit oogst: {sum(resultaat.gedekt.values())} stuks uit {len(resultaat.zaagplannen)} elementen "
+          f"van {len(resultaat.elementen())} gebouwen")
+    print(f"  Open: {sum(resultaat.open_vraag.values())} stuks")
+    print(f"  {resultaat.ploeg_uren:.0f} persoonsuren, {resultaat.dekking_per_uur:.0f} mm/uur (gewogen)")
+    plan = resultaat.zaagplannen[0]
+    print(f"  Eerste zaagplan: {plan.profiel_naam} {plan.lengte:.0f} mm -> "
+          f"{[round(l) for l, _ in plan.snedes]}, rest {plan.rest_lengte:.0f} mm")
+
+    gebouw = next(g for g in gebouwen if g.id in resultaat.elementen())
+    oogstplan = OogstPlanner().maak_oogstplan(gebouw, selectie=resultaat.elementen()[gebouw.id])
+    print(f"Oogstplan {gebouw.naam}: {len(oogstplan.stappen)} stappen, {oogstplan.rooster.werkdagen:.1f} werkdagen")
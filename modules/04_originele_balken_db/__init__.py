@@ -7,10 +7,12 @@ from .voorraad import (
     VoorraadDatabase,
     maak_voorbeeld_voorraad,
 )
+from .sqlite_opslag import SQLiteVoorraadDatabase
 
 __all__ = [
     "VoorraadStatus",
     "VoorraadItem",
     "VoorraadDatabase",
     "maak_voorbeeld_voorraad",
+    "SQLiteVoorraadDatabase",
 ]
@@ -0,0 +1,436 @@
+"""
+Module 4: Originele Balken Database - SQLite opslag
+
+Persistente VoorraadDatabase op SQLite (WAL modus) met dezelfde API als
+de in-memory database. Zoekvragen lopen via een samengestelde index op
+(profiel_naam, status, lengte_mm); totalen per profiel worden door
+triggers bijgehouden. Items worden pas geladen als ze opgevraagd worden
+en een identity map zorgt dat één rij één object is, zodat een wijziging
+als item.status = GERESERVEERD direct als één UPDATE weggeschreven wordt.
+"""
+
+import sqlite3
+import weakref
+from collections.abc import Mapping, ValuesView
+from contextlib import contextmanager
+from datetime import date
+from typing import Optional, List, Dict, Iterable, Iterator
+import json
+
+import sys
+sys.path.append("../..")
+from modules.m01_profiel_bibliotheek.profielen import StaalKwaliteit
+from modules.m04_originele_balken_db.voorraad import (
+    VoorraadItem, VoorraadStatus, VoorraadDatabase, _item_naar_dict,
+    _controleer_snijplannen, _maak_reststuk, _GEVOLGDE_VELDEN
+)
+
+
+# Kolommen in de volgorde van de tabel; "profiel" wordt afgeleid van de naam
+_KOLOMMEN = (
+    "id", "profiel_naam", "kwaliteit", "lengte_mm", "is_geoogst",
+    "herkomst_gebouw", "herkomst_adres", "oogst_datum", "origineel_element_id", "bron_id",
+    "materiaal_certificaat", "sterkte_getest", "test_resultaat",
+    "status", "locatie", "inkoop_prijs", "verkoop_prijs",
+    "toegevoegd_op", "opmerkingen",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS voorraad (
+    id INTEGER PRIMARY KEY,
+    profiel_naam TEXT NOT NULL,
+    kwaliteit TEXT NOT NULL,
+    lengte_mm REAL NOT NULL,
+    is_geoogst INTEGER NOT NULL,
+    herkomst_gebouw TEXT NOT NULL,
+    herkomst_adres TEXT NOT NULL,
+    oogst_datum TEXT,
+    origineel_element_id INTEGER NOT NULL,
+    bron_id INTEGER NOT NULL DEFAULT 0,
+    materiaal_certificaat TEXT NOT NULL,
+    sterkte_getest INTEGER NOT NULL,
+    test_resultaat REAL,
+    status TEXT NOT NULL,
+    locatie TEXT NOT NULL,
+    inkoop_prijs REAL NOT NULL,
+    verkoop_prijs REAL NOT NULL,
+    toegevoegd_op TEXT NOT NULL,
+    opmerkingen TEXT NOT NULL,
+    gewicht_kg REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_voorraad_profiel_status_lengte
+    ON voorraad (profiel_naam, status, lengte_mm);
+CREATE INDEX IF NOT EXISTS idx_voorraad_status_lengte
+    ON voorraad (status, lengte_mm);
+CREATE INDEX IF NOT EXISTS idx_voorraad_gecertificeerd
+    ON voorraad (id) WHERE sterkte_getest AND materiaal_certificaat != '';
+
+CREATE TABLE IF NOT EXISTS voorraad_totaal (
+    profiel_naam TEXT PRIMARY KEY,
+    gewicht_kg REAL NOT NULL,
+    aantal INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS voorraad_totaal_insert AFTER INSERT ON voorraad
+WHEN NEW.status = 'beschikbaar' BEGIN
+    INSERT INTO voorraad_totaal VALUES (NEW.profiel_naam, NEW.gewicht_kg, 1)
+    ON CONFLICT (profiel_naam) DO UPDATE
+    SET gewicht_kg = gewicht_kg + excluded.gewicht_kg, aantal = aantal + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS voorraad_totaal_delete AFTER DELETE ON voorraad
+WHEN OLD.status = 'beschikbaar' BEGIN
+    UPDATE voorraad_totaal SET gewicht_kg = gewicht_kg - OLD.gewicht_kg, aantal = aantal - 1
+    WHERE profiel_naam = OLD.profiel_naam;
+    DELETE FROM voorraad_totaal WHERE profiel_naam = OLD.profiel_naam AND aantal = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS voorraad_totaal_update
+AFTER UPDATE OF profiel_naam, status, gewicht_kg ON voorraad BEGIN
+    UPDATE voorraad_totaal SET gewicht_kg = gewicht_kg - OLD.gewicht_kg, aantal = aantal - 1
+    WHERE OLD.status = 'beschikbaar' AND profiel_naam = OLD.profiel_naam;
+    DELETE FROM voorraad_totaal WHERE profiel_naam = OLD.profiel_naam AND aantal = 0;
+    INSERT INTO voorraad_totaal
+    SELECT NEW.profiel_naam, NEW.gewicht_kg, 1 WHERE NEW.status = 'beschikbaar'
+    ON CONFLICT (profiel_naam) DO UPDATE
+    SET gewicht_kg = gewicht_kg + excluded.gewicht_kg, aantal = aantal + 1;
+END;
+"""
+
+_SELECT = f"SELECT {', '.join(_KOLOMMEN)} FROM voorraad"
+# Upsert in plaats van INSERT OR REPLACE: REPLACE vuurt de delete trigger niet af
+_INSERT = (
+    f"INSERT INTO voorraad ({', '.join(_KOLOMMEN)}, gewicht_kg) "
+    f"VALUES ({', '.join('?' * (len(_KOLOMMEN) + 1))}) "
+    f"ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{k} = excluded.{k}" for k in _KOLOMMEN[1:] + ("gewicht_kg",))
+)
+_BESCHIKBAAR = VoorraadStatus.BESCHIKBAAR.value
+
+
+class _Items(Mapping):
+    """Dict-achtige weergave van de tabel (id -> VoorraadItem)"""
+
+    def __init__(self, database: "SQLiteVoorraadDatabase"):
+        self._db = database
+
+    def __getitem__(self, item_id: int) -> VoorraadItem:
+        item = self._db._laad(item_id)
+        if item is None:
+            raise KeyError(item_id)
+        return item
+
+    def __iter__(self) -> Iterator[int]:
+        for (item_id,) in self._db._conn.execute("SELECT id FROM voorraad"):
+            yield item_id
+
+    def __len__(self) -> int:
+        return self._db._conn.execute("SELECT COUNT(*) FROM voorraad").fetchone()[0]
+
+    def __contains__(self, item_id) -> bool:
+        return self._db._conn.execute("SELECT 1 FROM voorraad WHERE id = ?", (item_id,)).fetchone() is not None
+
+    def values(self) -> "_Waarden":
+        return _Waarden(self)
+
+
+class _Waarden(ValuesView):
+    """Alle items in één query in plaats van één query per id"""
+
+    def __iter__(self) -> Iterator[VoorraadItem]:
+        return iter(self._mapping._db._zoek(_SELECT))
+
+
+class SQLiteVoorraadDatabase:
+    """
+    Voorraad database op SQLite, met dezelfde API als VoorraadDatabase.
+
+    Elke wijziging wordt direct weggeschreven (autocommit); gebruik
+    transactie() om veel wijzigingen in één commit te bundelen.
+    """
+
+    # Elk veld van een item wordt weggeschreven
+    _gevolgde_velden = _GEVOLGDE_VELDEN
+
+    def __init__(self, pad: str = ":memory:"):
+        self.pad = pad
+        self._conn = sqlite3.connect(pad, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Bestanden van voor de bron_id kolom bijwerken
+        if "bron_id" not in {rij[1] for rij in self._conn.execute("PRAGMA table_info(voorraad)")}:
+            self._conn.execute("ALTER TABLE voorraad ADD COLUMN bron_id INTEGER NOT NULL DEFAULT 0")
+        self._geladen: "weakref.WeakValueDictionary[int, VoorraadItem]" = weakref.WeakValueDictionary()
+        self._transactie_diepte = 0
+
+    @property
+    def items(self) -> _Items:
+        return _Items(self)
+
+    # ------------------------------------------------------------
+    # Schrijven
+    # ------------------------------------------------------------
+
+    @contextmanager
+    def transactie(self):
+        """Bundel wijzigingen in één transactie (genest mag)"""
+        if self._transactie_diepte == 0:
+            self._conn.execute("BEGIN")
+        self._transactie_diepte += 1
+        try:
+            yield self
+        except BaseException:
+            self._transactie_diepte -= 1
+            if self._transactie_diepte == 0:
+                self._conn.execute("ROLLBACK")
+                # Objecten in het geheugen kunnen afwijken van de tabel
+                self._geladen.clear()
+            raise
+        self._transactie_diepte -= 1
+        if self._transactie_diepte == 0:
+            self._conn.execute("COMMIT")
+
+    def voeg_toe(self, item: VoorraadItem) -> None:
+        """Voeg item toe aan voorraad (een item uit een andere database wordt gekopieerd)"""
+        self._conn.execute(_INSERT, _naar_rij(item))
+        self._koppel(item)
+
+    def voeg_toe_meerdere(self, items: Iterable[VoorraadItem], blok_grootte: int = 10000) -> None:
+        """Voeg veel items toe met executemany, in blokken binnen één transactie"""
+        blok: List[VoorraadItem] = []
+        with self.transactie():
+            for item in items:
+                blok.append(item)
+                if len(blok) >= blok_grootte:
+                    self._voeg_blok_toe(blok)
+                    blok = []
+            if blok:
+                self._voeg_blok_toe(blok)
+
+    def verwijder(self, item_id: int) -> Optional[VoorraadItem]:
+        """Verwijder item uit voorraad"""
+        item = self._laad(item_id)
+        if item is None:
+            return None
+        self._conn.execute("DELETE FROM voorraad WHERE id = ?", (item_id,))
+        self._geladen.pop(item_id, None)
+        item._database = None
+        return item
+
+    def pas_snijplannen_toe(
+        self,
+        plannen: Iterable,
+        status: VoorraadStatus = VoorraadStatus.IN_BEWERKING
+    ) -> List[VoorraadItem]:
+        """
+        Verwerk snijplannen (CuttingPlan uit de matching) in één transactie:
+        gezaagde balken krijgen de gegeven status, bruikbare resten worden
+        nieuwe beschikbare items. Bij een fout verandert er niets.
+        
+        Returns:
+            de nieuwe reststukken
+        """
+        plannen = list(plannen)
+        ids = json.dumps(list({plan.voorraad_id for plan in plannen}))
+        bronnen = self._zoek(f"{_SELECT} WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+        verbruik = _controleer_snijplannen(plannen, {item.id: item for item in bronnen})
+        reststukken = [_maak_reststuk(item, rest) for item, rest in verbruik if rest > 0]
+        with self.transactie():
+            self._conn.executemany(
+                "UPDATE voorraad SET status = ? WHERE id = ?",
+                [(status.value, item.id) for item, _ in verbruik]
+            )
+            for item, _ in verbruik:
+                object.__setattr__(item, "status", status)
+            self._voeg_blok_toe(reststukken)
+        return reststukken
+
+    # ------------------------------------------------------------
+    # Zoeken
+    # ------------------------------------------------------------
+
+    def zoek_op_profiel(
+        self,
+        profiel_naam: str,
+        alleen_beschikbaar: bool = True
+    ) -> List[VoorraadItem]:
+        """Zoek items op profiel naam, gesorteerd op lengte"""
+        if alleen_beschikbaar:
+            return self._zoek(
+                f"{_SELECT} WHERE profiel_naam = ? AND status = ? ORDER BY lengte_mm, id",
+                (profiel_naam, _BESCHIKBAAR)
+            )
+        return self._zoek(f"{_SELECT} WHERE profiel_naam = ? ORDER BY lengte_mm, id", (profiel_naam,))
+
+    def zoek_op_lengte(
+        self,
+        min_lengte: float,
+        max_lengte: Optional[float] = None,
+        profiel_naam: Optional[str] = None
+    ) -> List[VoorraadItem]:
+        """Zoek beschikbare items op lengte (en optioneel profiel)"""
+        sql = f"{_SELECT} WHERE status = ? AND lengte_mm >= ?"
+        parameters = [_BESCHIKBAAR, min_lengte]
+        if max_lengte:
+            sql += " AND lengte_mm <= ?"
+            parameters.append(max_lengte)
+        if profiel_naam:
+            sql += " AND profiel_naam = ?"
+            parameters.append(profiel_naam)
+        return self._zoek(sql + " ORDER BY lengte_mm, id", parameters)
+
+    def zoek_gecertificeerd(self) -> List[VoorraadItem]:
+        """Zoek alleen gecertificeerde items"""
+        return self._zoek(f"{_SELECT} WHERE sterkte_getest AND materiaal_certificaat != ''")
+
+    def totaal_voorraad(self) -> Dict[str, float]:
+        """Totaal gewicht per profiel type"""
+        return dict(self._conn.execute("SELECT profiel_naam, gewicht_kg FROM voorraad_totaal"))
+
+    # ------------------------------------------------------------
+    # Import / export
+    # ------------------------------------------------------------
+
+    def naar_json(self, pad: str) -> None:
+        """Exporteer naar JSON (zelfde formaat als VoorraadDatabase)"""
+        data = {
+            "voorraad": [_item_naar_dict(item) for item in self.items.values()],
+            "totalen": self.totaal_voorraad()
+        }
+        with open(pad, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def importeer_json(self, pad: str) -> int:
+        """Importeer een JSON export van VoorraadDatabase"""
+        items = list(VoorraadDatabase.van_json(pad).items.values())
+        self.voeg_toe_meerdere(items)
+        return len(items)
+
+    def sluit(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SQLiteVoorraadDatabase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.sluit()
+
+    # ------------------------------------------------------------
+    # Intern
+    # ------------------------------------------------------------
+
+    def _voeg_blok_toe(self, blok: List[VoorraadItem]) -> None:
+        self._conn.executemany(_INSERT, [_naar_rij(item) for item in blok])
+        for item in blok:
+            self._koppel(item)
+
+    def _koppel(self, item: VoorraadItem) -> None:
+        """
+        Koppel een net weggeschreven item aan deze database. Een item van
+        een andere database blijft daar; hier staat dan een kopie van de
+        rij, die bij opvragen als eigen object geladen wordt.
+        """
+        vervangen = self._geladen.get(item.id)
+        if vervangen is not None and vervangen is not item:
+            vervangen._database = None
+            del self._geladen[item.id]
+        if item._database is None or item._database is self:
+            item._database = self
+            self._geladen[item.id] = item
+
+    def _laad(self, item_id: int) -> Optional[VoorraadItem]:
+        item = self._geladen.get(item_id)
+        if item is not None and item._database is self:
+            return item
+        rij = self._conn.execute(f"{_SELECT} WHERE id = ?", (item_id,)).fetchone()
+        return self._van_rij(rij) if rij else None
+
+    def _zoek(self, sql: str, parameters: Iterable = ()) -> List[VoorraadItem]:
+        return [self._van_rij(rij) for rij in self._conn.execute(sql, tuple(parameters))]
+
+    def _van_rij(self, rij: tuple) -> VoorraadItem:
+        """Item uit een rij, via de identity map"""
+        item = self._geladen.get(rij[0])
+        if item is not None and item._database is self:
+            # Een object dat aan een andere database is toegevoegd telt niet meer
+            return item
+        waarden = dict(zip(_KOLOMMEN, rij))
+        waarden["kwaliteit"] = StaalKwaliteit(waarden["kwaliteit"])
+        waarden["status"] = VoorraadStatus(waarden["status"])
+        waarden["is_geoogst"] = bool(waarden["is_geoogst"])
+        waarden["sterkte_getest"] = bool(waarden["sterkte_getest"])
+        waarden["oogst_datum"] = date.fromisoformat(waarden["oogst_datum"]) if waarden["oogst_datum"] else None
+        waarden["toegevoegd_op"] = date.fromisoformat(waarden["toegevoegd_op"])
+        item = VoorraadItem(**waarden)
+        item._database = self
+        self._geladen[item.id] = item
+        return item
+
+    def _wijzig(self, item: VoorraadItem, naam: str, waarde) -> None:
+        """Veld van een item wijzigen en wegschrijven (aangeroepen door VoorraadItem)"""
+        oud_id = item.id
+        object.__setattr__(item, naam, waarde)
+        if naam == "id":
+            self._geladen.pop(oud_id, None)
+            self._geladen[waarde] = item
+        if naam in ("profiel", "profiel_naam", "lengte_mm"):
+            kolommen = ["gewicht_kg"] + ([] if naam == "profiel" else [naam])
+        else:
+            kolommen = [naam]
+        rij = dict(zip(_KOLOMMEN + ("gewicht_kg",), _naar_rij(item)))
+        self._conn.execute(
+            f"UPDATE voorraad SET {', '.join(f'{k} = ?' for k in kolommen)} WHERE id = ?",
+            [rij[k] for k in kolommen] + [oud_id]
+        )
+
+
+def _naar_rij(item: VoorraadItem) -> tuple:
+    """Rij voor de voorraad tabel (_KOLOMMEN + gewicht_kg)"""
+    return (
+        item.id, item.profiel_naam, item.kwaliteit.value, item.lengte_mm, int(item.is_geoogst),
+        item.herkomst_gebouw, item.herkomst_adres,
+        item.oogst_datum.isoformat() if item.oogst_datum else None, item.origineel_element_id, item.bron_id,
+        item.materiaal_certificaat, int(item.sterkte_getest), item.test_resultaat,
+        item.status.value, item.locatie, item.inkoop_prijs, item.verkoop_prijs,
+        item.toegevoegd_op.isoformat(), item.opmerkingen, item.gewicht_kg,
+    )
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+    from modules.m04_originele_balken_db.voorraad import maak_voorbeeld_voorraad
+
+    with tempfile.TemporaryDirectory() as map_:
+        pad = os.path.join(map_, "voorraad.db")
+        with SQLiteVoorraadDatabase(pad) as db:
+            db.voeg_toe_meerdere(list(maak_voorbeeld_voorraad().items.values()))
+            item = db.zoek_op_lengte(5000, profiel_naam="HEA 200")[0]
+            item.status = VoorraadStatus.GERESERVEERD
+
+        # Na een herstart staat alles er nog, zonder alles opnieuw in te lezen
+        with SQLiteVoorraadDatabase(pad) as db:
+            print(f"Na herstart: {len(db.items)} items, HEA 200 >= 5000 mm beschikbaar: "
+                  f"{[i.lengte_mm for i in db.zoek_op_lengte(5000, profiel_naam='HEA 200')]}")
+            for profiel, gewicht in sorted(db.totaal_voorraad().items()):
+                print(f"  {profiel}: {gewicht:.0f} kg")
+
+            rng = random.Random(1)
+            profielen = ["HEA 200", "HEA 300", "HEB 200", "IPE 200", "IPE 300"]
+            items = [
+                VoorraadItem(profiel_naam=rng.choice(profielen), lengte_mm=rng.randrange(1000, 12000, 50))
+                for _ in range(100000)
+            ]
+            start = time.perf_counter()
+            db.voeg_toe_meerdere(items)
+            print(f"\n100.000 items geladen in {time.perf_counter() - start:.1f} s")
+            start = time.perf_counter()
+            for _ in range(100):
+                gevonden = db.zoek_op_lengte(11500, profiel_naam="HEA 200")
+            print(f"Beschikbaar HEA 200 >= 11500 mm: {len(gevonden)} items, "
+                  f"{(time.perf_counter() - start) * 10:.1f} ms per zoekvraag")
+            start = time.perf_counter()
+            with db.transactie():
+                for item in items[:1000]:
+                    item.status = VoorraadStatus.VERKOCHT
+            print(f"1000 statuswijzigingen in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -2,17 +2,29 @@
 Module 4: Originele Balken Database
 
 Database van nieuw/origineel staal voor matching met geoogste balken.
+
+De database houdt secundaire indexen bij (profiel -> status -> op lengte
+gesorteerde lijst, gecertificeerde items en lopende totalen per profiel),
+zodat zoekvragen als "beschikbaar HEA 200 >= 5000 mm" O(log n) zijn.
+Wijzigingen aan een item in de database (bijv. de status) werken de
+indexen direct bij.
+
+Snijplannen uit de matching worden met pas_snijplannen_toe in één keer
+verwerkt: gezaagde balken gaan uit de beschikbare voorraad en bruikbare
+reststukken komen er als nieuwe items (met dezelfde herkomst) weer in.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict
-from uuid import uuid4
+from dataclasses import dataclass, field, fields, replace
+from typing import Optional, List, Dict, Tuple, Iterable, Mapping
 from datetime import date
 from enum import Enum
+import bisect
+import heapq
 import json
 
 import sys
 sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str, str_naar_id
 from modules.m01_profiel_bibliotheek.profielen import (
     StaalProfiel, ProfielType, StaalKwaliteit, PROFIEL_DATABASE
 )
@@ -26,10 +38,23 @@ class VoorraadStatus(Enum):
     IN_BEWERKING = "in_bewerking"
 
 
-@dataclass
+_zet_veld = object.__setattr__
+
+# Velden waarop de VoorraadDatabase indexeert
+_GEINDEXEERDE_VELDEN = frozenset({
+    "id", "profiel_naam", "profiel", "lengte_mm", "status",
+    "sterkte_getest", "materiaal_certificaat",
+})
+
+
+@dataclass(slots=True, weakref_slot=True)
 class VoorraadItem:
     """Een stalen balk in voorraad"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    # Database waarin het item staat; wordt als eerste gezet zodat
+    # __setattr__ het tijdens __init__ al kan lezen
+    _database: Optional["VoorraadDatabase"] = field(default=None, init=False, repr=False, compare=False)
+    
+    id: int = field(default_factory=nieuw_id)
     
     # Profiel info
     profiel_naam: str = ""  # bijv. "HEA 200"
@@ -44,7 +69,8 @@ class VoorraadItem:
     herkomst_gebouw: str = ""
     herkomst_adres: str = ""
     oogst_datum: Optional[date] = None
-    origineel_element_id: str = ""
+    origineel_element_id: int = 0
+    bron_id: int = 0  # voorraad item waaruit dit reststuk gezaagd is
     
     # Certificering
     materiaal_certificaat: str = ""  # pad naar certificaat
@@ -67,6 +93,29 @@ class VoorraadItem:
         if not self.profiel and self.profiel_naam:
             self.profiel = PROFIEL_DATABASE.get(self.profiel_naam)
     
+    def __setattr__(self, naam, waarde):
+        # Alleen velden die de database bijhoudt doorgeven (indexen, persistente
+        # opslag); een nieuw item staat nog in geen database
+        database = self._database if naam != "_database" else None
+        if database is not None and naam in database._gevolgde_velden:
+            database._wijzig(self, naam, waarde)
+        else:
+            _zet_veld(self, naam, waarde)
+    
+    def __getstate__(self):
+        # Een kopie staat in geen enkele database
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+    
+    def __setstate__(self, staat):
+        object.__setattr__(self, "_database", None)
+        for naam, waarde in staat.items():
+            object.__setattr__(self, naam, waarde)
+    
+    @property
+    def is_gecertificeerd(self) -> bool:
+        """Sterkte getest en materiaalcertificaat aanwezig"""
+        return bool(self.sterkte_getest and self.materiaal_certificaat)
+    
     @property
     def gewicht_kg(self) -> float:
         """Gewicht in kg"""
@@ -82,35 +131,103 @@ class VoorraadItem:
         return 0
 
 
+# Alle velden van een item die een database kan bijhouden
+_GEVOLGDE_VELDEN = frozenset(f.name for f in fields(VoorraadItem)) - {"_database"}
+
+
 @dataclass
 class VoorraadDatabase:
-    """Database van beschikbare stalen balken"""
-    items: Dict[str, VoorraadItem] = field(default_factory=dict)
+    """
+    Database van beschikbare stalen balken.
+    
+    Een item hoort bij één database: wijzigingen aan geïndexeerde velden
+    worden alleen in de laatste database waaraan het is toegevoegd bijgewerkt.
+    """
+    items: Dict[int, VoorraadItem] = field(default_factory=dict)
+    
+    # Velden waarvan VoorraadItem wijzigingen doorgeeft aan _wijzig
+    _gevolgde_velden = _GEINDEXEERDE_VELDEN
+    
+    # Indexen: profiel -> status -> gesorteerde (lengte_mm, id)
+    _per_profiel: Dict[str, Dict[VoorraadStatus, List[Tuple[float, int]]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _gecertificeerd: Dict[int, None] = field(default_factory=dict, init=False, repr=False)
+    _totaal_kg: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _aantal_beschikbaar: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    
+    def __post_init__(self):
+        items, self.items = self.items, {}
+        self.voeg_toe_meerdere(items.values())
     
     def voeg_toe(self, item: VoorraadItem) -> None:
         """Voeg item toe aan voorraad"""
+        if item.id in self.items:
+            self.verwijder(item.id)
         self.items[item.id] = item
+        item._database = self
+        self._indexeer(item)
+    
+    def voeg_toe_meerdere(self, items: Iterable[VoorraadItem]) -> None:
+        """Voeg veel items tegelijk toe; de indexen worden één keer gesorteerd"""
+        # Bij dubbele ids telt het laatste item. Bestaande items eerst
+        # verwijderen, zolang de indexlijsten nog gesorteerd zijn.
+        nieuw = {item.id: item for item in items}
+        for item_id in nieuw:
+            if item_id in self.items:
+                self.verwijder(item_id)
+        geraakt: Dict[int, List[Tuple[float, int]]] = {}
+        for item in nieuw.values():
+            self.items[item.id] = item
+            item._database = self
+            lijst = self._indexeer(item, sorteer=False)
+            geraakt[id(lijst)] = lijst
+        for lijst in geraakt.values():
+            lijst.sort()
     
-    def verwijder(self, item_id: str) -> Optional[VoorraadItem]:
+    def verwijder(self, item_id: int) -> Optional[VoorraadItem]:
         """Verwijder item uit voorraad"""
-        return self.items.pop(item_id, None)
+        item = self.items.pop(item_id, None)
+        if item is not None:
+            self._deindexeer(item)
+            if item._database is self:
+                item._database = None
+        return item
+    
+    def pas_snijplannen_toe(
+        self,
+        plannen: Iterable,
+        status: VoorraadStatus = VoorraadStatus.IN_BEWERKING
+    ) -> List[VoorraadItem]:
+        """
+        Verwerk snijplannen (CuttingPlan uit de matching) in de voorraad.
+        
+        Alle plannen worden eerst gecontroleerd; bij een fout verandert er
+        niets. Daarna krijgen de gezaagde balken de gegeven status en wordt
+        elke bruikbare rest een nieuw beschikbaar item. Elke geraakte
+        indexlijst wordt één keer bijgewerkt, ook bij duizenden plannen.
+        
+        Returns:
+            de nieuwe reststukken
+        """
+        verbruik = _controleer_snijplannen(plannen, self.items)
+        reststukken = [_maak_reststuk(item, rest) for item, rest in verbruik if rest > 0]
+        self._zet_status_meerdere([item for item, _ in verbruik], status)
+        self.voeg_toe_meerdere(reststukken)
+        return reststukken
     
     def zoek_op_profiel(
         self, 
         profiel_naam: str,
         alleen_beschikbaar: bool = True
     ) -> List[VoorraadItem]:
-        """Zoek items op profiel naam"""
-        resultaten = [
-            item for item in self.items.values()
-            if item.profiel_naam == profiel_naam
-        ]
+        """Zoek items op profiel naam, gesorteerd op lengte"""
+        per_status = self._per_profiel.get(profiel_naam, {})
         if alleen_beschikbaar:
-            resultaten = [
-                item for item in resultaten 
-                if item.status == VoorraadStatus.BESCHIKBAAR
-            ]
-        return resultaten
+            sleutels = per_status.get(VoorraadStatus.BESCHIKBAAR, [])
+        else:
+            sleutels = heapq.merge(*per_status.values())
+        return [self.items[item_id] for _, item_id in sleutels]
     
     def zoek_op_lengte(
         self,
@@ -118,54 +235,108 @@ class VoorraadDatabase:
         max_lengte: Optional[float] = None,
         profiel_naam: Optional[str] = None
     ) -> List[VoorraadItem]:
-        """Zoek items op lengte (en optioneel profiel)"""
+        """Zoek beschikbare items op lengte (en optioneel profiel)"""
+        profielen = [profiel_naam] if profiel_naam else list(self._per_profiel)
         resultaten = []
-        for item in self.items.values():
-            if item.status != VoorraadStatus.BESCHIKBAAR:
-                continue
-            if item.lengte_mm < min_lengte:
+        for profiel in profielen:
+            lijst = self._per_profiel.get(profiel, {}).get(VoorraadStatus.BESCHIKBAAR)
+            if not lijst:
                 continue
-            if max_lengte and item.lengte_mm > max_lengte:
-                continue
-            if profiel_naam and item.profiel_naam != profiel_naam:
-                continue
-            resultaten.append(item)
+            begin = bisect.bisect_left(lijst, (min_lengte,))
+            eind = bisect.bisect_right(lijst, (max_lengte, float("inf"))) if max_lengte else len(lijst)
+            resultaten.extend(self.items[item_id] for _, item_id in lijst[begin:eind])
         return resultaten
     
     def zoek_gecertificeerd(self) -> List[VoorraadItem]:
         """Zoek alleen gecertificeerde items"""
-        return [
-            item for item in self.items.values()
-            if item.sterkte_getest and item.materiaal_certificaat
-        ]
+        return [self.items[item_id] for item_id in self._gecertificeerd]
     
     def totaal_voorraad(self) -> Dict[str, float]:
         """Totaal gewicht per profiel type"""
-        totalen = {}
-        for item in self.items.values():
-            if item.status == VoorraadStatus.BESCHIKBAAR:
-                key = item.profiel_naam
-                totalen[key] = totalen.get(key, 0) + item.gewicht_kg
-        return totalen
+        return dict(self._totaal_kg)
+    
+    # ------------------------------------------------------------
+    # Indexen
+    # ------------------------------------------------------------
+    
+    def _indexeer(self, item: VoorraadItem, sorteer: bool = True) -> List[Tuple[float, int]]:
+        lijst = self._per_profiel.setdefault(item.profiel_naam, {}).setdefault(item.status, [])
+        if sorteer:
+            bisect.insort(lijst, (item.lengte_mm, item.id))
+        else:
+            lijst.append((item.lengte_mm, item.id))
+        if item.is_gecertificeerd:
+            self._gecertificeerd[item.id] = None
+        if item.status == VoorraadStatus.BESCHIKBAAR:
+            profiel = item.profiel_naam
+            self._totaal_kg[profiel] = self._totaal_kg.get(profiel, 0) + item.gewicht_kg
+            self._aantal_beschikbaar[profiel] = self._aantal_beschikbaar.get(profiel, 0) + 1
+        return lijst
+    
+    def _deindexeer(self, item: VoorraadItem) -> None:
+        per_status = self._per_profiel[item.profiel_naam]
+        lijst = per_status[item.status]
+        del lijst[bisect.bisect_left(lijst, (item.lengte_mm, item.id))]
+        if not lijst:
+            del per_status[item.status]
+            if not per_status:
+                del self._per_profiel[item.profiel_naam]
+        self._gecertificeerd.pop(item.id, None)
+        if item.status == VoorraadStatus.BESCHIKBAAR:
+            profiel = item.profiel_naam
+            self._aantal_beschikbaar[profiel] -= 1
+            if self._aantal_beschikbaar[profiel]:
+                self._totaal_kg[profiel] -= item.gewicht_kg
+            else:
+                # Geen afrondingsresten laten staan
+                del self._aantal_beschikbaar[profiel]
+                del self._totaal_kg[profiel]
+    
+    def _zet_status_meerdere(self, items: List[VoorraadItem], status: VoorraadStatus) -> None:
+        """Status van veel items tegelijk: per geraakte lijst één keer filteren en sorteren"""
+        weg: Dict[Tuple[str, VoorraadStatus], set] = {}
+        for item in items:
+            if item.status != status:
+                weg.setdefault((item.profiel_naam, item.status), set()).add(item.id)
+        for (profiel, oud), ids in weg.items():
+            per_status = self._per_profiel[profiel]
+            lijst = per_status[oud]
+            lijst[:] = [sleutel for sleutel in lijst if sleutel[1] not in ids]
+            if not lijst:
+                del per_status[oud]
+            nieuw = per_status.setdefault(status, [])
+            nieuw.extend((self.items[item_id].lengte_mm, item_id) for item_id in ids)
+            nieuw.sort()
+        for item in items:
+            if item.status == status:
+                continue
+            if item.status == VoorraadStatus.BESCHIKBAAR or status == VoorraadStatus.BESCHIKBAAR:
+                teken = 1 if status == VoorraadStatus.BESCHIKBAAR else -1
+                profiel = item.profiel_naam
+                aantal = self._aantal_beschikbaar.get(profiel, 0) + teken
+                if aantal:
+                    self._aantal_beschikbaar[profiel] = aantal
+                    self._totaal_kg[profiel] = self._totaal_kg.get(profiel, 0) + teken * item.gewicht_kg
+                else:
+                    # Geen afrondingsresten laten staan
+                    del self._aantal_beschikbaar[profiel]
+                    del self._totaal_kg[profiel]
+            object.__setattr__(item, "status", status)
+    
+    def _wijzig(self, item: VoorraadItem, naam: str, waarde) -> None:
+        """Veld van een item wijzigen (aangeroepen door VoorraadItem)"""
+        self._deindexeer(item)
+        if naam == "id":
+            del self.items[item.id]
+        object.__setattr__(item, naam, waarde)
+        if naam == "id":
+            self.items[waarde] = item
+        self._indexeer(item)
     
     def naar_json(self, pad: str) -> None:
         """Exporteer naar JSON"""
         data = {
-            "voorraad": [
-                {
-                    "id": item.id,
-                    "profiel": item.profiel_naam,
-                    "kwaliteit": item.kwaliteit.value,
-                    "lengte_mm": item.lengte_mm,
-                    "gewicht_kg": item.gewicht_kg,
-                    "is_geoogst": item.is_geoogst,
-                    "herkomst": item.herkomst_gebouw,
-                    "status": item.status.value,
-                    "verkoop_prijs": item.verkoop_prijs,
-                    "gecertificeerd": item.sterkte_getest
-                }
-                for item in self.items.values()
-            ],
+            "voorraad": [_item_naar_dict(item) for item in self.items.values()],
             "totalen": self.totaal_voorraad()
         }
         with open(pad, 'w', encoding='utf-8') as f:
@@ -178,9 +349,10 @@ class VoorraadDatabase:
             data = json.load(f)
         
         db = cls()
+        items = []
         for item_data in data.get("voorraad", []):
-            item = VoorraadItem(
-                id=item_data["id"],
+            items.append(VoorraadItem(
+                id=str_naar_id(item_data["id"]),
                 profiel_naam=item_data["profiel"],
                 kwaliteit=StaalKwaliteit(item_data["kwaliteit"]),
                 lengte_mm=item_data["lengte_mm"],
@@ -188,12 +360,73 @@ class VoorraadDatabase:
                 herkomst_gebouw=item_data.get("herkomst", ""),
                 status=VoorraadStatus(item_data["status"]),
                 verkoop_prijs=item_data.get("verkoop_prijs", 0),
-                sterkte_getest=item_data.get("gecertificeerd", False)
-            )
-            db.voeg_toe(item)
+                sterkte_getest=item_data.get("gecertificeerd", False),
+                bron_id=str_naar_id(item_data["bron_id"]) if item_data.get("bron_id") else 0
+            ))
+        db.voeg_toe_meerdere(items)
         return db
 
 
+def _item_naar_dict(item: VoorraadItem) -> dict:
+    """JSON weergave van een item (naar_json)"""
+    return {
+        "id": id_naar_str(item.id),
+        "profiel": item.profiel_naam,
+        "kwaliteit": item.kwaliteit.value,
+        "lengte_mm": item.lengte_mm,
+        "gewicht_kg": item.gewicht_kg,
+        "is_geoogst": item.is_geoogst,
+        "herkomst": item.herkomst_gebouw,
+        "status": item.status.value,
+        "verkoop_prijs": item.verkoop_prijs,
+        "gecertificeerd": item.sterkte_getest,
+        "bron_id": id_naar_str(item.bron_id) if item.bron_id else None
+    }
+
+
+# Statussen waaruit een balk gezaagd mag worden
+_ZAAGBAAR = (VoorraadStatus.BESCHIKBAAR, VoorraadStatus.GERESERVEERD)
+
+
+def _controleer_snijplannen(
+    plannen: Iterable,
+    items: Mapping[int, VoorraadItem]
+) -> List[Tuple[VoorraadItem, float]]:
+    """Controleer snijplannen vóór er iets gewijzigd wordt; (balk, bruikbare rest) per plan"""
+    verbruik = []
+    gezien = set()
+    for plan in plannen:
+        naam = id_naar_str(plan.voorraad_id)
+        item = items.get(plan.voorraad_id)
+        if item is None:
+            raise ValueError(f"Balk {naam} staat niet in de voorraad")
+        if plan.voorraad_id in gezien:
+            raise ValueError(f"Balk {naam} staat in meer dan één snijplan")
+        if item.status not in _ZAAGBAAR:
+            raise ValueError(f"Balk {naam} is niet beschikbaar ({item.status.value})")
+        if plan.bruikbare_rest > item.lengte_mm:
+            raise ValueError(f"Rest van balk {naam} is langer dan de balk")
+        gezien.add(plan.voorraad_id)
+        verbruik.append((item, plan.bruikbare_rest))
+    return verbruik
+
+
+def _maak_reststuk(bron: VoorraadItem, lengte: float) -> VoorraadItem:
+    """Nieuw voorraad item voor een reststuk, met de herkomst van de balk"""
+    fractie = lengte / bron.lengte_mm
+    return replace(
+        bron,
+        id=nieuw_id(),
+        lengte_mm=lengte,
+        bron_id=bron.id,
+        status=VoorraadStatus.BESCHIKBAAR,
+        inkoop_prijs=bron.inkoop_prijs * fractie,
+        verkoop_prijs=bron.verkoop_prijs * fractie,
+        toegevoegd_op=date.today(),
+        opmerkingen=f"Reststuk van {id_naar_str(bron.id)}",
+    )
+
+
 def maak_voorbeeld_voorraad() -> VoorraadDatabase:
     """Maak voorbeeld voorraad database"""
     db = VoorraadDatabase()
@@ -256,3 +489,11 @@ if __name__ == "__main__":
             print(f"  {item.profiel_naam} {item.lengte_mm}mm")
             print(f"    Herkomst: {item.herkomst_gebouw}")
             print(f"    Prijs: €{item.verkoop_prijs:.2f} (€{item.prijs_per_kg:.2f}/kg)")
+    
+    print("\nBeschikbaar HEA 200 >= 5000 mm:")
+    print("="*50)
+    for item in db.zoek_op_lengte(5000, profiel_naam="HEA 200"):
+        print(f"  {item.lengte_mm}mm ({'geoogst' if item.is_geoogst else 'nieuw'})")
+    eerste = db.zoek_op_lengte(5000, profiel_naam="HEA 200")[0]
+    eerste.status = VoorraadStatus.GERESERVEERD
+    print(f"  Na reservering {eerste.lengte_mm}mm: {len(db.zoek_op_lengte(5000, profiel_naam='HEA 200'))} beschikbaar")
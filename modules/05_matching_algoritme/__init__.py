@@ -9,6 +9,8 @@ from .matching import (
     MatchingAlgoritme,
     demo_matching,
 )
+from .cutting_stock import SnijMethode, los_cutting_stock_op, maak_cutting_plan
+from .toewijzing import los_toewijzing_op, maximaal_gewicht_koppeling
 
 __all__ = [
     "MatchStatus",
@@ -17,4 +19,9 @@ __all__ = [
     "CuttingPlan",
     "MatchingAlgoritme",
     "demo_matching",
+    "SnijMethode",
+    "los_cutting_stock_op",
+    "maak_cutting_plan",
+    "los_toewijzing_op",
+    "maximaal_gewicht_koppeling",
 ]
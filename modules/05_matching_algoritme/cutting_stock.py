@@ -0,0 +1,431 @@
+"""
+Module 5: Matching Algoritme - Cutting stock
+
+Eendimensionaal cutting stock: meerdere gevraagde stukken uit één
+voorraadbalk zagen. Per zaagsnede gaat zaagsnede mm verloren; n stukken
+passen in een balk als som(lengtes) + zaagsnede * (n - 1) <= lengte.
+Een rest korter dan minimum_restlengte is afval, een langere rest is
+bruikbaar en kan terug de voorraad in. Stukken die korter mogen
+(lengte_tolerantie_min) en op volle lengte nergens passen, worden daarna
+op hun minimale lengte geplaatst: in de resterende ruimte van balken
+waar al uit gezaagd wordt of in nog vrije balken.
+
+Methodes:
+    FFD      - First Fit Decreasing
+    BFD      - Best Fit Decreasing
+    KNAPSACK - herhaald het beste snijpatroon kiezen met een DP knapsack
+               (pricing uit column generation, met een gretige master)
+"""
+
+import bisect
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Tuple, Dict, Sequence, Mapping, Optional
+
+import numpy as np
+
+import sys
+sys.path.append("../..")
+from modules.identificatie import id_naar_str
+from modules.m04_originele_balken_db.voorraad import VoorraadItem
+
+
+Stuk = Tuple[float, int]  # (lengte, vraag_id)
+
+
+class SnijMethode(Enum):
+    """Heuristiek voor het verdelen van stukken over balken"""
+    FFD = "ffd"
+    BFD = "bfd"
+    KNAPSACK = "knapsack"
+
+
+@dataclass
+class CuttingPlan:
+    """Plan voor het snijden van balken"""
+    voorraad_id: int
+    voorraad_profiel: str
+    voorraad_lengte: float
+
+    # Snijplan
+    snedes: List[Tuple[float, int]]  # [(lengte, vraag_id), ...]
+    rest_lengte: float
+
+    # Efficiency
+    benut_percentage: float
+
+    # Rest opgesplitst volgens minimum_restlengte
+    afval_lengte: float = 0      # mm - te kort voor hergebruik
+    bruikbare_rest: float = 0    # mm - terug naar voorraad
+
+    def __str__(self) -> str:
+        lines = [
+            f"Balk: {self.voorraad_profiel} ({self.voorraad_lengte}mm)",
+            "Snedes:"
+        ]
+        for lengte, vraag_id in self.snedes:
+            lines.append(f"  - {lengte}mm (voor {id_naar_str(vraag_id)})")
+        lines.append(f"Rest: {self.rest_lengte}mm ({100-self.benut_percentage:.1f}% niet benut)")
+        if self.bruikbare_rest:
+            lines.append(f"  bruikbaar: {self.bruikbare_rest}mm")
+        return "\n".join(lines)
+
+
+def los_cutting_stock_op(
+    stukken: Sequence[Stuk],
+    staven: Sequence[VoorraadItem],
+    zaagsnede: float = 5,
+    minimum_restlengte: float = 500,
+    methode: SnijMethode = SnijMethode.FFD,
+    min_lengtes: Optional[Mapping[int, float]] = None
+) -> Tuple[List[CuttingPlan], List[Stuk]]:
+    """
+    Verdeel stukken over voorraadbalken van hetzelfde profiel.
+
+    Args:
+        min_lengtes: vraag_id -> kortste toegestane lengte, voor stukken
+            die korter gezaagd mogen worden
+
+    Returns:
+        (snijplannen, stukken die niet geplaatst konden worden)
+    """
+    lengtes = [staaf.lengte_mm for staaf in staven]
+    toewijzing, niet_geplaatst = _verdeel(stukken, lengtes, zaagsnede, methode)
+
+    # Te lange stukken op hun minimale lengte: in de resterende ruimte van
+    # gebruikte balken (lengte - som - zaagsnede * n, daarin gelden
+    # dezelfde regels als voor een losse balk) en in de vrije balken
+    korter = [
+        (min_lengtes[vraag_id], vraag_id) for lengte, vraag_id in niet_geplaatst
+        if min_lengtes and min_lengtes.get(vraag_id, lengte) < lengte
+    ]
+    if korter:
+        gewenst = {vraag_id: lengte for lengte, vraag_id in niet_geplaatst}
+        ruimte = {
+            s: lengte - sum(l for l, _ in toewijzing[s]) - zaagsnede * len(toewijzing[s])
+            if s in toewijzing else lengte
+            for s, lengte in enumerate(lengtes)
+        }
+        balken = [s for s, r in ruimte.items() if r > 0]
+        extra, over = _verdeel(korter, [ruimte[s] for s in balken], zaagsnede, methode)
+        for i, snedes in extra.items():
+            s = balken[i]
+            toewijzing[s] = _verleng(toewijzing.get(s, []) + snedes, gewenst, lengtes[s], zaagsnede)
+        niet_geplaatst = [
+            stuk for stuk in niet_geplaatst if min_lengtes.get(stuk[1], stuk[0]) >= stuk[0]
+        ] + [(gewenst[vraag_id], vraag_id) for _, vraag_id in over]
+
+    plannen = [
+        maak_cutting_plan(staven[s], snedes, zaagsnede, minimum_restlengte)
+        for s, snedes in toewijzing.items()
+    ]
+    return plannen, niet_geplaatst
+
+
+def _verdeel(
+    stukken: Sequence[Stuk],
+    lengtes: Sequence[float],
+    zaagsnede: float,
+    methode: SnijMethode
+) -> Tuple[Dict[int, List[Stuk]], List[Stuk]]:
+    """Stukken over balken (gegeven als lengtes) verdelen met de gekozen methode"""
+    if methode == SnijMethode.KNAPSACK:
+        return _knapsack(stukken, lengtes, zaagsnede)
+    return _decreasing(stukken, lengtes, zaagsnede, methode == SnijMethode.BFD)
+
+
+def _verleng(
+    snedes: List[Stuk],
+    gewenst: Mapping[int, float],
+    lengte: float,
+    zaagsnede: float
+) -> List[Stuk]:
+    """Ingekorte stukken zo lang mogelijk maken, tot hun gevraagde lengte"""
+    ruimte = lengte - sum(l for l, _ in snedes) - zaagsnede * (len(snedes) - 1)
+    verlengd = []
+    for l, vraag_id in snedes:
+        extra = max(0, min(gewenst.get(vraag_id, l) - l, ruimte))
+        ruimte -= extra
+        verlengd.append((l + extra, vraag_id))
+    return verlengd
+
+
+def maak_cutting_plan(
+    staaf: VoorraadItem,
+    snedes: List[Stuk],
+    zaagsnede: float,
+    minimum_restlengte: float
+) -> CuttingPlan:
+    """Snijplan voor één balk; de rest ligt achter de laatste zaagsnede"""
+    benut = sum(lengte for lengte, _ in snedes)
+    rest = max(0, staaf.lengte_mm - benut - zaagsnede * len(snedes))
+    bruikbaar = rest >= minimum_restlengte
+    return CuttingPlan(
+        voorraad_id=staaf.id,
+        voorraad_profiel=staaf.profiel_naam,
+        voorraad_lengte=staaf.lengte_mm,
+        snedes=sorted(snedes, key=lambda s: -s[0]),
+        rest_lengte=rest,
+        benut_percentage=benut / staaf.lengte_mm * 100,
+        afval_lengte=0 if bruikbaar else rest,
+        bruikbare_rest=rest if bruikbaar else 0
+    )
+
+
+# ------------------------------------------------------------
+# FFD / BFD
+# ------------------------------------------------------------
+
+def _decreasing(
+    stukken: Sequence[Stuk],
+    balk_lengtes: Sequence[float],
+    zaagsnede: float,
+    best_fit: bool
+) -> Tuple[Dict[int, List[Stuk]], List[Stuk]]:
+    """
+    Stukken van lang naar kort plaatsen in een open balk (de eerste of de
+    krapste waar het past); past het nergens, dan wordt de kortste vrije
+    balk geopend waar het stuk in past.
+
+    Ruimte van een balk: lengte + zaagsnede - som(stuk + zaagsnede).
+    Alle zoekacties zijn O(log n): vrije balken en (BFD) open balken staan
+    in een gesorteerde lijst, (FFD) open balken in een segmentboom op
+    openingsvolgorde.
+    """
+    vrij = _GesorteerdeLijst((lengte + zaagsnede, s) for s, lengte in enumerate(balk_lengtes))
+    open_bfd = _GesorteerdeLijst()
+    open_ffd = _SegmentBoom(len(balk_lengtes))
+    geopend: List[int] = []
+    ruimte: Dict[int, float] = {}
+    toewijzing: Dict[int, List[Stuk]] = {}
+    niet_geplaatst: List[Stuk] = []
+
+    for stuk in sorted(stukken, key=lambda s: -s[0]):
+        nodig = stuk[0] + zaagsnede
+        if best_fit:
+            gevonden = open_bfd.eerste_vanaf((nodig, -1))
+            s = gevonden[1] if gevonden else None
+        else:
+            positie = open_ffd.eerste_minstens(nodig)
+            s = geopend[positie] if positie >= 0 else None
+
+        if s is None:
+            gevonden = vrij.eerste_vanaf((nodig, -1))
+            if gevonden is None:
+                niet_geplaatst.append(stuk)
+                continue
+            vrij.verwijder(gevonden)
+            s = gevonden[1]
+            ruimte[s] = gevonden[0]
+            toewijzing[s] = []
+            positie = len(geopend)
+            geopend.append(s)
+        elif best_fit:
+            open_bfd.verwijder((ruimte[s], s))
+
+        ruimte[s] -= nodig
+        toewijzing[s].append(stuk)
+        if best_fit:
+            open_bfd.voeg_toe((ruimte[s], s))
+        else:
+            open_ffd.zet(positie, ruimte[s])
+    return toewijzing, niet_geplaatst
+
+
+class _GesorteerdeLijst:
+    """Gesorteerde lijst in buckets: toevoegen en verwijderen zonder O(n) verschuiven"""
+
+    def __init__(self, waarden=(), bucket_grootte: int = 512):
+        waarden = sorted(waarden)
+        self._grootte = bucket_grootte
+        self._buckets = [waarden[i:i + bucket_grootte] for i in range(0, len(waarden), bucket_grootte)]
+        self._maxima = [b[-1] for b in self._buckets]
+
+    def eerste_vanaf(self, waarde):
+        """Kleinste element >= waarde, of None"""
+        i = bisect.bisect_left(self._maxima, waarde)
+        if i == len(self._buckets):
+            return None
+        bucket = self._buckets[i]
+        return bucket[bisect.bisect_left(bucket, waarde)]
+
+    def voeg_toe(self, waarde) -> None:
+        if not self._buckets:
+            self._buckets.append([waarde])
+            self._maxima.append(waarde)
+            return
+        i = min(bisect.bisect_left(self._maxima, waarde), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        bisect.insort(bucket, waarde)
+        self._maxima[i] = bucket[-1]
+        if len(bucket) > 2 * self._grootte:
+            self._buckets[i:i + 1] = [bucket[:self._grootte], bucket[self._grootte:]]
+            self._maxima[i:i + 1] = [bucket[self._grootte - 1], bucket[-1]]
+
+    def verwijder(self, waarde) -> None:
+        i = bisect.bisect_left(self._maxima, waarde)
+        bucket = self._buckets[i]
+        del bucket[bisect.bisect_left(bucket, waarde)]
+        if bucket:
+            self._maxima[i] = bucket[-1]
+        else:
+            del self._buckets[i]
+            del self._maxima[i]
+
+
+class _SegmentBoom:
+    """Maximum segmentboom: eerste positie met waarde >= x in O(log n)"""
+
+    def __init__(self, n: int):
+        self._n = 1
+        while self._n < max(n, 1):
+            self._n *= 2
+        self._boom = [float("-inf")] * (2 * self._n)
+
+    def zet(self, positie: int, waarde: float) -> None:
+        i = positie + self._n
+        boom = self._boom
+        boom[i] = waarde
+        i //= 2
+        while i:
+            boom[i] = max(boom[2 * i], boom[2 * i + 1])
+            i //= 2
+
+    def eerste_minstens(self, waarde: float) -> int:
+        """Eerste positie met waarde >= waarde, of -1"""
+        boom = self._boom
+        if boom[1] < waarde:
+            return -1
+        i = 1
+        while i < self._n:
+            i = 2 * i if boom[2 * i] >= waarde else 2 * i + 1
+        return i - self._n
+
+
+# ------------------------------------------------------------
+# Knapsack patronen
+# ------------------------------------------------------------
+
+def _knapsack(
+    stukken: Sequence[Stuk],
+    balk_lengtes: Sequence[float],
+    zaagsnede: float
+) -> Tuple[Dict[int, List[Stuk]], List[Stuk]]:
+    """
+    Kies herhaald de balk met het best benutte snijpatroon.
+
+    Eén begrensde knapsack DP op de grootste capaciteit geeft het beste
+    patroon voor elke balklengte tegelijk (dp[c] = max benutte lengte bij
+    capaciteit <= c), dus per gekozen patroon is er maar één DP nodig.
+    """
+    open_stukken: Dict[float, List[int]] = {}
+    for lengte, vraag_id in sorted(stukken, key=lambda s: -s[0]):
+        open_stukken.setdefault(lengte, []).append(vraag_id)
+    vrij = list(range(len(balk_lengtes)))
+    toewijzing: Dict[int, List[Stuk]] = {}
+
+    while open_stukken and vrij:
+        lengtes = np.array(list(open_stukken), dtype=np.float64)
+        aantallen = np.array([len(v) for v in open_stukken.values()], dtype=np.int64)
+        capaciteiten = np.array([balk_lengtes[s] for s in vrij], dtype=np.float64) + zaagsnede
+
+        patroon, keuze = _beste_patroon(lengtes, aantallen, capaciteiten, zaagsnede)
+        if keuze is None:
+            break
+        s = vrij.pop(keuze)
+        toewijzing[s] = []
+        for lengte, aantal in zip(lengtes.tolist(), patroon.tolist()):
+            vraag_ids = open_stukken[lengte]
+            toewijzing[s].extend((lengte, vraag_id) for vraag_id in vraag_ids[:aantal])
+            del vraag_ids[:aantal]
+            if not vraag_ids:
+                del open_stukken[lengte]
+
+    niet_geplaatst = [(lengte, vraag_id) for lengte, ids in open_stukken.items() for vraag_id in ids]
+    return toewijzing, niet_geplaatst
+
+
+def _beste_patroon(
+    lengtes: np.ndarray,
+    aantallen: np.ndarray,
+    capaciteiten: np.ndarray,
+    zaagsnede: float
+):
+    """
+    Beste patroon over alle balken: hoogste benutting (lengte / balklengte).
+
+    Returns:
+        (aantal per stuklengte, index van de balk) of (None, None)
+    """
+    # Gewichten en capaciteiten als gehele mm, geschaald met de ggd
+    gewichten = np.ceil(lengtes + zaagsnede).astype(np.int64)
+    caps = np.floor(capaciteiten).astype(np.int64)
+    schaal = int(np.gcd.reduce(np.concatenate([gewichten, caps])))
+    gewichten //= schaal
+    caps //= schaal
+
+    # Begrensd -> 0/1 met binaire opsplitsing van de aantallen
+    items: List[Tuple[int, int, int]] = []  # (type, aantal, gewicht)
+    for t, aantal in enumerate(aantallen.tolist()):
+        k = 1
+        while aantal > 0:
+            deel = min(k, aantal)
+            items.append((t, deel, deel * int(gewichten[t])))
+            aantal -= deel
+            k *= 2
+
+    c_max = int(caps.max())
+    dp = np.zeros(c_max + 1)
+    neem = np.zeros((len(items), c_max + 1), dtype=bool)
+    for i, (t, deel, w) in enumerate(items):
+        if w > c_max:
+            continue
+        kandidaat = dp[:-w] + deel * lengtes[t]
+        beter = kandidaat > dp[w:] + 1e-9
+        neem[i, w:] = beter
+        dp[w:] = np.where(beter, kandidaat, dp[w:])
+
+    waarde = dp[caps]
+    if waarde.max() <= 0:
+        return None, None
+    # Hoogste benutting; bij gelijke benutting de langste balk (meer geplaatst)
+    benutting = waarde / (capaciteiten - zaagsnede)
+    keuze = int(np.lexsort((-waarde, -benutting))[0])
+
+    patroon = np.zeros(len(lengtes), dtype=np.int64)
+    c = int(caps[keuze])
+    for i in range(len(items) - 1, -1, -1):
+        if neem[i, c]:
+            t, deel, w = items[i]
+            patroon[t] += deel
+            c -= w
+    return patroon, keuze
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from modules.m05_matching_algoritme.matching import VraagItem
+
+    # 12 m balk, twee stukken van 5,5 m: eerder één stuk per balk
+    staven = [VoorraadItem(profiel_naam="HEA 200", lengte_mm=12000)]
+    vraag = VraagItem(profiel_naam="HEA 200", lengte_mm=5500, aantal=2)
+    plannen, _ = los_cutting_stock_op([(5500, vraag.id)] * 2, staven)
+    print(plannen[0])
+
+    rng = random.Random(1)
+    staven = [
+        VoorraadItem(profiel_naam="HEA 200", lengte_mm=rng.choice([6000, 8000, 12000, rng.randrange(3000, 9000, 50)]))
+        for _ in range(300)
+    ]
+    stukken = [(float(rng.choice([1200, 1750, 2400, 3100, 4500, 5500])), i) for i in range(600)]
+    print(f"\n{len(stukken)} stukken, {len(staven)} balken:")
+    for methode in SnijMethode:
+        start = time.perf_counter()
+        plannen, rest = los_cutting_stock_op(stukken, staven, methode=methode)
+        duur = time.perf_counter() - start
+        print(f"  {methode.name:8s} {len(plannen)} balken, "
+              f"{sum(p.voorraad_lengte for p in plannen) / 1000:.1f} m staal, "
+              f"afval {sum(p.afval_lengte for p in plannen) / 1000:.1f} m, "
+              f"bruikbare rest {sum(p.bruikbare_rest for p in plannen) / 1000:.1f} m, "
+              f"niet geplaatst {len(rest)} ({duur * 1000:.0f} ms)")
@@ -5,13 +5,18 @@ Fit geoogste balken op vraag - Cutting Stock Problem Solver
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Tuple
-from uuid import uuid4
+from typing import Optional, List, Dict, Tuple, Mapping, Sequence, Set
 from enum import Enum
 
+import numpy as np
+
 import sys
 sys.path.append("../..")
-from modules.m04_originele_balken_db.voorraad import VoorraadItem, VoorraadDatabase
+from modules.identificatie import nieuw_id
+from modules.m01_profiel_bibliotheek.profielen import get_profiel_tabel
+from modules.m04_originele_balken_db.voorraad import VoorraadItem, VoorraadDatabase, VoorraadStatus
+from modules.m05_matching_algoritme.cutting_stock import CuttingPlan, SnijMethode, Stuk, los_cutting_stock_op
+from modules.m05_matching_algoritme.toewijzing import maximaal_gewicht_koppeling
 
 
 class MatchStatus(Enum):
@@ -25,7 +30,7 @@ class MatchStatus(Enum):
 @dataclass
 class VraagItem:
     """Een gevraagde balk"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     profiel_naam: str = ""
     lengte_mm: float = 0
     aantal: int = 1
@@ -44,8 +49,8 @@ class VraagItem:
 @dataclass
 class MatchResultaat:
     """Resultaat van een match tussen vraag en aanbod"""
-    vraag_id: str
-    voorraad_id: Optional[str] = None
+    vraag_id: int
+    voorraad_id: Optional[int] = None
     
     # Status
     status: MatchStatus = MatchStatus.GEEN
@@ -68,31 +73,6 @@ class MatchResultaat:
         return self.status != MatchStatus.GEEN
 
 
-@dataclass
-class CuttingPlan:
-    """Plan voor het snijden van balken"""
-    voorraad_id: str
-    voorraad_profiel: str
-    voorraad_lengte: float
-    
-    # Snijplan
-    snedes: List[Tuple[float, str]]  # [(lengte, vraag_id), ...]
-    rest_lengte: float
-    
-    # Efficiency
-    benut_percentage: float
-    
-    def __str__(self) -> str:
-        lines = [
-            f"Balk: {self.voorraad_profiel} ({self.voorraad_lengte}mm)",
-            "Snedes:"
-        ]
-        for lengte, vraag_id in self.snedes:
-            lines.append(f"  - {lengte}mm (voor {vraag_id})")
-        lines.append(f"Rest: {self.rest_lengte}mm ({100-self.benut_percentage:.1f}% afval)")
-        return "\n".join(lines)
-
-
 class MatchingAlgoritme:
     """
     Algoritme voor het matchen van geoogste balken met vraag.
@@ -104,16 +84,32 @@ class MatchingAlgoritme:
         self,
         zaagsnede_breedte: float = 5,  # mm verlies per zaagsnede
         minimum_restlengte: float = 500,  # mm - kleinere rest is afval
+        substituties: Optional[Mapping[str, Sequence[str]]] = None,
+        gebruik_substituties: bool = True
     ):
         self.zaagsnede = zaagsnede_breedte
         self.min_rest = minimum_restlengte
-        
-        # Profiel equivalenten (kan vervangen worden door)
-        self.profiel_alternatieven = {
-            "HEA 200": ["HEB 180", "IPE 240"],
-            "HEB 200": ["HEA 220", "IPE 270"],
-            "IPE 200": ["HEA 160"],
-        }
+        self.gebruik_substituties = gebruik_substituties
+        self._substituties = substituties
+    
+    @property
+    def profiel_alternatieven(self) -> Mapping[str, Sequence[str]]:
+        """
+        Profiel equivalenten (kan vervangen worden door). Standaard de
+        `SubstitutieTabel` van de profielcatalogus, lichtste vervanger eerst.
+        """
+        if not self.gebruik_substituties:
+            return {}
+        if self._substituties is None:
+            self._substituties = get_profiel_tabel().substitutie_tabel()
+        return self._substituties
+    
+    def te_zoeken_profielen(self, vraag: VraagItem) -> List[str]:
+        """Gevraagd profiel, opgegeven alternatieven en vervangers, in die volgorde"""
+        return list(dict.fromkeys(
+            [vraag.profiel_naam] + vraag.alternatieven
+            + list(self.profiel_alternatieven.get(vraag.profiel_naam, ()))
+        ))
     
     def vind_beste_match(
         self,
@@ -131,77 +127,186 @@ class MatchingAlgoritme:
         )
         
         # Zoek kandidaten
-        profielen_te_zoeken = [vraag.profiel_naam] + vraag.alternatieven
+        profielen_te_zoeken = self.te_zoeken_profielen(vraag)
         kandidaten = []
         
+        min_nodig = vraag.lengte_mm - vraag.lengte_tolerantie_min
+        
         for profiel in profielen_te_zoeken:
-            items = voorraad.zoek_op_profiel(profiel)
-            for item in items:
-                # Check lengte
-                min_nodig = vraag.lengte_mm - vraag.lengte_tolerantie_min
-                max_nodig = vraag.lengte_mm + vraag.lengte_tolerantie_plus
+            # Alleen items die lang genoeg zijn (index op lengte)
+            for item in voorraad.zoek_op_lengte(min_nodig, profiel_naam=profiel):
+                # Bereken efficiency
+                rest = item.lengte_mm - vraag.lengte_mm - self.zaagsnede
+                efficiency = (vraag.lengte_mm / item.lengte_mm) * 100
                 
-                if item.lengte_mm >= min_nodig:
-                    # Bereken efficiency
-                    rest = item.lengte_mm - vraag.lengte_mm - self.zaagsnede
-                    efficiency = (vraag.lengte_mm / item.lengte_mm) * 100
-                    
-                    kandidaten.append({
-                        "item": item,
-                        "rest": rest,
-                        "efficiency": efficiency,
-                        "is_exact_profiel": profiel == vraag.profiel_naam
-                    })
+                kandidaten.append({
+                    "item": item,
+                    "rest": rest,
+                    "efficiency": efficiency,
+                    "is_exact_profiel": profiel == vraag.profiel_naam
+                })
         
         if not kandidaten:
             return resultaat
         
         # Sorteer kandidaten
         def score(k):
-            s = 0
-            # Prefereer exact profiel
-            if k["is_exact_profiel"]:
-                s += 100
-            # Prefereer hoge efficiency
-            s += k["efficiency"]
-            # Prefereer geoogst (goedkoper)
-            if prefereer_geoogst and k["item"].is_geoogst:
-                s += 20
-            # Straf voor te veel rest (afval)
-            if k["rest"] < self.min_rest:
-                s -= 10  # Te kleine rest is afval
-            return s
+            return self.match_score(
+                k["is_exact_profiel"], k["efficiency"], k["item"].is_geoogst, k["rest"], prefereer_geoogst
+            )
         
         kandidaten.sort(key=score, reverse=True)
         beste = kandidaten[0]
+        self._vul_resultaat(resultaat, vraag, beste["item"], beste["rest"], beste["efficiency"])
+        return resultaat
+    
+    def match_score(self, is_exact_profiel, efficiency, is_geoogst, rest, prefereer_geoogst: bool = True):
+        """
+        Score van een kandidaat (hoger is beter); werkt ook elementsgewijs
+        op NumPy arrays.
+        """
+        return (
+            100 * is_exact_profiel                        # Prefereer exact profiel
+            + efficiency                                  # Prefereer hoge efficiency
+            + 20 * (is_geoogst * prefereer_geoogst)       # Prefereer geoogst (goedkoper)
+            - 10 * (rest < self.min_rest)                 # Te kleine rest is afval
+        )
+    
+    def match_batch(
+        self,
+        vragen: List[VraagItem],
+        voorraad: VoorraadDatabase,
+        prefereer_geoogst: bool = True
+    ) -> List[MatchResultaat]:
+        """
+        Match een hele order tegelijk (één resultaat per gevraagd stuk).
+        
+        Zelfde kandidaten en score als vind_beste_match, maar als
+        toewijzingsprobleem: eerst zoveel mogelijk stukken matchen, daarna
+        de totale score maximaliseren. Het resultaat is daardoor nooit
+        slechter dan vind_beste_match in een lus, waarin vroege vragen
+        balken kunnen pakken die latere vragen nodig hadden.
+        """
+        stukken = [vraag for vraag in vragen for _ in range(vraag.aantal)]
+        resultaten = [
+            MatchResultaat(vraag_id=vraag.id, gevraagd_profiel=vraag.profiel_naam, gevraagde_lengte=vraag.lengte_mm)
+            for vraag in stukken
+        ]
+        if not stukken:
+            return resultaten
         
+        # Beschikbare balken per profiel in typen: balken met hetzelfde
+        # profiel, dezelfde lengte en herkomst zijn voor elke vraag gelijk
+        rijen_per_profiel: Dict[str, List[int]] = {}
+        for r, vraag in enumerate(stukken):
+            for profiel in self.te_zoeken_profielen(vraag):
+                rijen_per_profiel.setdefault(profiel, []).append(r)
+        typen: List[List[VoorraadItem]] = []
+        groepen = []  # (profiel, geoogst, eerste type, lengtes, cumulatieve capaciteit)
+        for profiel in rijen_per_profiel:
+            items = voorraad.zoek_op_profiel(profiel)
+            for geoogst in (False, True):
+                per_lengte: Dict[float, List[VoorraadItem]] = {}
+                for item in items:
+                    if item.is_geoogst == geoogst:
+                        per_lengte.setdefault(item.lengte_mm, []).append(item)
+                if per_lengte:
+                    capaciteit = np.array([len(v) for v in per_lengte.values()])
+                    groepen.append((profiel, geoogst, len(typen), np.array(list(per_lengte)),
+                                    np.concatenate([[0], np.cumsum(capaciteit)])))
+                    typen.extend(per_lengte.values())
+        
+        lengte = np.array([vraag.lengte_mm for vraag in stukken], dtype=np.float64)
+        min_nodig = lengte - np.array([vraag.lengte_tolerantie_min for vraag in stukken], dtype=np.float64)
+        zonder_straf = lengte + self.zaagsnede + self.min_rest
+        
+        # Kanten: per rij en groep alleen de kortste typen met en zonder
+        # afvalstraf tot samen R balken, met R het aantal rijen dat een
+        # balk in dat venster kan gebruiken. Verder weg liggen altijd R
+        # balken met een even hoge score die niet allemaal door andere
+        # rijen bezet kunnen zijn, dus het optimum blijft behouden.
+        alle_rijen, alle_typen, alle_gewichten = [], [], []
+        for profiel, geoogst, basis, groep_lengte, cumulatief in groepen:
+            rijen = np.array(rijen_per_profiel[profiel], dtype=np.int64)
+            is_exact = np.array([stukken[r].profiel_naam == profiel for r in rijen])
+            begin = np.searchsorted(groep_lengte, min_nodig[rijen], "left")
+            grens = np.maximum(np.searchsorted(groep_lengte, zonder_straf[rijen], "left"), begin)
+            begin_gesorteerd = np.sort(begin)
+            for start, stop in ((begin, grens), (grens, np.full_like(grens, len(groep_lengte)))):
+                # Venster verkleinen tot het aantal concurrenten past (blijft geldig)
+                concurrenten = np.full(len(rijen), len(rijen))
+                for _ in range(3):
+                    stop = np.minimum(stop, np.searchsorted(cumulatief, cumulatief[start] + concurrenten, "left"))
+                    concurrenten = np.searchsorted(begin_gesorteerd, stop, "left")
+                aantal = stop - start
+                kant_rij = np.repeat(rijen, aantal)
+                kant_type = np.repeat(start - np.cumsum(aantal) + aantal, aantal) + np.arange(aantal.sum())
+                type_lengte = groep_lengte[kant_type]
+                alle_rijen.append(kant_rij)
+                alle_typen.append(kant_type + basis)
+                alle_gewichten.append(self.match_score(
+                    np.repeat(is_exact, aantal), lengte[kant_rij] / type_lengte * 100, geoogst,
+                    type_lengte - lengte[kant_rij] - self.zaagsnede, prefereer_geoogst
+                ))
+        gewichten = np.concatenate(alle_gewichten) if alle_gewichten else np.empty(0)
+        if not len(gewichten):
+            # Geen enkele balk lang genoeg
+            return resultaten
+        
+        # Elke match weegt zwaarder dan elke mogelijke scorewinst elders:
+        # k + 1 matches wegen minstens (k + 1) * (min + bonus), k matches
+        # hoogstens k * (max + bonus), met k < aantal stukken. Scores zijn
+        # niet begrensd (efficiency > 100 bij lengte_tolerantie_min).
+        laagste = gewichten.min()
+        per_match = (gewichten.max() - laagste) * (len(stukken) + 1) - laagste + 1
+        koppeling = maximaal_gewicht_koppeling(
+            np.concatenate(alle_rijen), np.concatenate(alle_typen),
+            gewichten + per_match, len(stukken),
+            capaciteit=np.array([len(t) for t in typen])
+        )
+        for r, t in sorted(koppeling.items()):
+            vraag, item = stukken[r], typen[t].pop(0)
+            rest = item.lengte_mm - vraag.lengte_mm - self.zaagsnede
+            self._vul_resultaat(resultaten[r], vraag, item, rest, (vraag.lengte_mm / item.lengte_mm) * 100)
+        return resultaten
+    
+    def _vul_resultaat(
+        self,
+        resultaat: MatchResultaat,
+        vraag: VraagItem,
+        item: VoorraadItem,
+        rest: float,
+        efficiency: float
+    ) -> None:
         # Bepaal status
-        if beste["efficiency"] >= 95:
+        if efficiency >= 95:
             status = MatchStatus.PERFECT
-        elif beste["efficiency"] >= 80:
+        elif efficiency >= 80:
             status = MatchStatus.GOED
         else:
             status = MatchStatus.MATIG
         
-        resultaat.voorraad_id = beste["item"].id
+        resultaat.voorraad_id = item.id
         resultaat.status = status
-        resultaat.gematcht_profiel = beste["item"].profiel_naam
-        resultaat.beschikbare_lengte = beste["item"].lengte_mm
-        resultaat.restlengte = beste["rest"]
-        resultaat.efficiency = beste["efficiency"]
-        resultaat.geschatte_kosten = beste["item"].verkoop_prijs * (vraag.lengte_mm / beste["item"].lengte_mm)
-        
-        return resultaat
+        resultaat.gematcht_profiel = item.profiel_naam
+        resultaat.beschikbare_lengte = item.lengte_mm
+        resultaat.restlengte = rest
+        resultaat.efficiency = efficiency
+        resultaat.geschatte_kosten = item.verkoop_prijs * (vraag.lengte_mm / item.lengte_mm)
     
     def optimaliseer_cutting(
         self,
         vragen: List[VraagItem],
-        voorraad: VoorraadDatabase
+        voorraad: VoorraadDatabase,
+        methode: SnijMethode = SnijMethode.FFD
     ) -> Tuple[List[MatchResultaat], List[CuttingPlan]]:
         """
         Optimaliseer snijplannen voor meerdere vragen.
         
-        Gebruikt First Fit Decreasing heuristiek.
+        Per profiel worden meerdere stukken uit één balk gezaagd, met
+        First Fit Decreasing (standaard), Best Fit Decreasing of
+        knapsack patronen; zie cutting_stock. Stukken die niet passen gaan
+        daarna naar ongebruikte balken van vervangende profielen.
         """
         # Sorteer vragen op lengte (groot naar klein)
         gesorteerde_vragen = sorted(
@@ -211,7 +316,6 @@ class MatchingAlgoritme:
         
         resultaten = []
         cutting_plans = []
-        gebruikte_voorraad = set()
         
         # Groepeer vragen per profiel
         per_profiel: Dict[str, List[VraagItem]] = {}
@@ -221,60 +325,56 @@ class MatchingAlgoritme:
             for _ in range(vraag.aantal):
                 per_profiel[vraag.profiel_naam].append(vraag)
         
+        # Vragen die korter gezaagd mogen worden
+        min_lengtes = {
+            vraag.id: vraag.lengte_mm - vraag.lengte_tolerantie_min
+            for vraag in vragen if vraag.lengte_tolerantie_min > 0
+        }
+        
         # Verwerk per profiel
+        items: Dict[int, VoorraadItem] = {}
+        open_stukken: Dict[str, List[Stuk]] = {}
+        for profiel, profiel_vragen in per_profiel.items():
+            beschikbaar = voorraad.zoek_op_profiel(profiel)
+            plannen, niet_geplaatst = los_cutting_stock_op(
+                [(vraag.lengte_mm, vraag.id) for vraag in profiel_vragen],
+                beschikbaar, self.zaagsnede, self.min_rest, methode, min_lengtes
+            )
+            cutting_plans.extend(plannen)
+            items.update((item.id, item) for item in beschikbaar)
+            if niet_geplaatst:
+                open_stukken[profiel] = niet_geplaatst
+        
+        # Daarna pas vervangers, zodat vraag naar een profiel zelf voorgaat;
+        # alleen balken waar nog niet uit gezaagd wordt
+        gebruikt: Set[int] = {plan.voorraad_id for plan in cutting_plans}
+        for profiel, stukken in open_stukken.items():
+            vervangers: Dict[str, Set[int]] = {}
+            for vraag in per_profiel[profiel]:
+                for vervanger in self.te_zoeken_profielen(vraag)[1:]:
+                    vervangers.setdefault(vervanger, set()).add(vraag.id)
+            for vervanger, vraag_ids in vervangers.items():
+                toegestaan = [stuk for stuk in stukken if stuk[1] in vraag_ids]
+                if not toegestaan:
+                    continue
+                vrij = [item for item in voorraad.zoek_op_profiel(vervanger) if item.id not in gebruikt]
+                plannen, over = los_cutting_stock_op(
+                    toegestaan, vrij, self.zaagsnede, self.min_rest, methode, min_lengtes
+                )
+                cutting_plans.extend(plannen)
+                items.update((item.id, item) for item in vrij)
+                gebruikt.update(plan.voorraad_id for plan in plannen)
+                stukken = [stuk for stuk in stukken if stuk[1] not in vraag_ids] + over
+        
+        # Per vraag de geplaatste stukken; de rest van een balk telt bij het laatste stuk
+        geplaatst: Dict[int, List[Tuple[CuttingPlan, bool]]] = {}
+        for plan in cutting_plans:
+            for k, (_, vraag_id) in enumerate(plan.snedes):
+                geplaatst.setdefault(vraag_id, []).append((plan, k == len(plan.snedes) - 1))
+        
         for profiel, profiel_vragen in per_profiel.items():
-            # Haal beschikbare voorraad
-            beschikbaar = [
-                item for item in voorraad.zoek_op_profiel(profiel)
-                if item.id not in gebruikte_voorraad
-            ]
-            # Sorteer voorraad op lengte (groot naar klein)
-            beschikbaar.sort(key=lambda x: -x.lengte_mm)
-            
-            # Probeer vragen te fitten
             for vraag in profiel_vragen:
-                match_gevonden = False
-                
-                for item in beschikbaar:
-                    if item.id in gebruikte_voorraad:
-                        continue
-                    
-                    rest = item.lengte_mm - vraag.lengte_mm - self.zaagsnede
-                    
-                    if rest >= -vraag.lengte_tolerantie_min:
-                        # Match gevonden!
-                        efficiency = (vraag.lengte_mm / item.lengte_mm) * 100
-                        
-                        resultaat = MatchResultaat(
-                            vraag_id=vraag.id,
-                            voorraad_id=item.id,
-                            status=MatchStatus.GOED if efficiency >= 80 else MatchStatus.MATIG,
-                            gevraagd_profiel=profiel,
-                            gematcht_profiel=item.profiel_naam,
-                            gevraagde_lengte=vraag.lengte_mm,
-                            beschikbare_lengte=item.lengte_mm,
-                            restlengte=max(0, rest),
-                            efficiency=efficiency,
-                            geschatte_kosten=item.verkoop_prijs * (vraag.lengte_mm / item.lengte_mm)
-                        )
-                        resultaten.append(resultaat)
-                        
-                        # Cutting plan
-                        plan = CuttingPlan(
-                            voorraad_id=item.id,
-                            voorraad_profiel=item.profiel_naam,
-                            voorraad_lengte=item.lengte_mm,
-                            snedes=[(vraag.lengte_mm, vraag.id)],
-                            rest_lengte=max(0, rest),
-                            benut_percentage=efficiency
-                        )
-                        cutting_plans.append(plan)
-                        
-                        gebruikte_voorraad.add(item.id)
-                        match_gevonden = True
-                        break
-                
-                if not match_gevonden:
+                if not geplaatst.get(vraag.id):
                     # Geen match
                     resultaten.append(MatchResultaat(
                         vraag_id=vraag.id,
@@ -282,6 +382,25 @@ class MatchingAlgoritme:
                         gevraagd_profiel=profiel,
                         gevraagde_lengte=vraag.lengte_mm
                     ))
+                    continue
+                
+                plan, laatste = geplaatst[vraag.id].pop(0)
+                item = items[plan.voorraad_id]
+                # Per stuk, zoals bij vind_beste_match; de benutting van de
+                # hele balk staat in het snijplan
+                efficiency = (vraag.lengte_mm / item.lengte_mm) * 100
+                resultaten.append(MatchResultaat(
+                    vraag_id=vraag.id,
+                    voorraad_id=item.id,
+                    status=MatchStatus.GOED if efficiency >= 80 else MatchStatus.MATIG,
+                    gevraagd_profiel=profiel,
+                    gematcht_profiel=item.profiel_naam,
+                    gevraagde_lengte=vraag.lengte_mm,
+                    beschikbare_lengte=item.lengte_mm,
+                    restlengte=plan.rest_lengte if laatste else 0,
+                    efficiency=efficiency,
+                    geschatte_kosten=item.verkoop_prijs * (vraag.lengte_mm / item.lengte_mm)
+                ))
         
         return resultaten, cutting_plans
     
@@ -352,4 +471,42 @@ def demo_matching():
 
 
 if __name__ == "__main__":
+    from modules.m04_originele_balken_db.voorraad import maak_voorbeeld_voorraad
+    
     demo_matching()
+    
+    # Vraag voor vraag tegenover de hele order tegelijk
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=5500, is_geoogst=True))
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=9000))
+    vragen = [
+        VraagItem(profiel_naam="HEA 200", lengte_mm=5000),
+        VraagItem(profiel_naam="HEA 200", lengte_mm=5400),
+    ]
+    algo = MatchingAlgoritme()
+    lus = []
+    for vraag in vragen:
+        resultaat = algo.vind_beste_match(vraag, voorraad)
+        lus.append(resultaat)
+        if resultaat.is_gematcht:
+            voorraad.items[resultaat.voorraad_id].status = VoorraadStatus.GERESERVEERD
+    for item in voorraad.items.values():
+        item.status = VoorraadStatus.BESCHIKBAAR
+    batch = algo.match_batch(vragen, voorraad)
+    
+    def totale_score(resultaten):
+        return sum(
+            algo.match_score(True, r.efficiency, voorraad.items[r.voorraad_id].is_geoogst, r.restlengte)
+            for r in resultaten if r.is_gematcht
+        )
+    print("\n" + "="*60)
+    print(f"Vraag voor vraag: {[r.beschikbare_lengte for r in lus]}, score {totale_score(lus):.1f}")
+    print(f"Hele order:       {[r.beschikbare_lengte for r in batch]}, score {totale_score(batch):.1f}")
+    
+    # Snijplannen terugschrijven: gezaagde balken in bewerking, bruikbare resten terug in voorraad
+    voorraad = maak_voorbeeld_voorraad()
+    vragen = [VraagItem(profiel_naam="HEA 200", lengte_mm=2500, aantal=3)]
+    _, plannen = algo.optimaliseer_cutting(vragen, voorraad)
+    for rest in voorraad.pas_snijplannen_toe(plannen):
+        print(f"Reststuk {rest.profiel_naam} {rest.lengte_mm:.0f}mm ({rest.opmerkingen})")
+    print(f"Volgende run ziet HEA 200: {[i.lengte_mm for i in voorraad.zoek_op_profiel('HEA 200')]}")
@@ -7,12 +7,12 @@ Generatie van schoonmaakplan met ROOD gemarkeerde zones.
 
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Tuple
-from uuid import uuid4
 from enum import Enum
 import json
 
 import sys
 sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str
 from modules.m02_gebouw_structuur.structuur import (
     StaalElement, AangelastItem, Positie3D
 )
@@ -36,10 +36,10 @@ class UrgentieNiveau(Enum):
     LAAG = "laag"            # Cosmetisch
 
 
-@dataclass
+@dataclass(slots=True)
 class SchoonmaakZone:
     """Een zone die schoongemaakt moet worden"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     
     # Locatie op de balk
     positie_start: Positie3D = field(default_factory=Positie3D)
@@ -79,8 +79,8 @@ class SchoonmaakZone:
 @dataclass
 class SchoonmaakPlan:
     """Compleet schoonmaakplan voor een balk"""
-    id: str = field(default_factory=lambda: str(uuid4()))
-    element_id: str = ""
+    id: int = field(default_factory=nieuw_id)
+    element_id: int = 0
     element_naam: str = ""
     profiel_naam: str = ""
     
@@ -117,7 +117,7 @@ class SchoonmaakPlan:
     def naar_dict(self) -> dict:
         """Exporteer naar dictionary"""
         return {
-            "id": self.id,
+            "id": id_naar_str(self.id),
             "element": self.element_naam,
             "profiel": self.profiel_naam,
             "aantal_zones": len(self.zones),
@@ -255,7 +255,7 @@ class SchoonmaakAnalyse:
         
         for zone in plan.zones:
             zones_data.append({
-                "id": zone.id,
+                "id": id_naar_str(zone.id),
                 "type": zone.type,
                 "kleur": zone.kleur,  # ROOD voor kritiek
                 "positie": {
@@ -273,7 +273,7 @@ class SchoonmaakAnalyse:
             })
         
         return {
-            "element_id": plan.element_id,
+            "element_id": id_naar_str(plan.element_id),
             "element_naam": plan.element_naam,
             "profiel": plan.profiel_naam,
             "zones": zones_data,
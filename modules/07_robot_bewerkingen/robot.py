@@ -9,12 +9,12 @@ Generatie van instructies voor robotgestuurde bewerkingen:
 
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Tuple
-from uuid import uuid4
 from enum import Enum
 import json
 
 import sys
 sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str
 from modules.m06_schoonmaak_analyse.analyse import (
     SchoonmaakPlan, SchoonmaakZone, BewerkingType
 )
@@ -38,9 +38,9 @@ class InstructieStatus(Enum):
     MISLUKT = "mislukt"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RobotPositie:
-    """Robot positie en oriëntatie"""
+    """Robot positie en oriëntatie (onveranderlijk)"""
     x: float = 0  # mm
     y: float = 0  # mm
     z: float = 0  # mm
@@ -60,7 +60,7 @@ class RobotPositie:
 @dataclass
 class RobotPad:
     """Een pad dat de robot moet volgen"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     posities: List[RobotPositie] = field(default_factory=list)
     
     # Parameters
@@ -91,8 +91,8 @@ class RobotPad:
 @dataclass 
 class RobotInstructie:
     """Complete instructie set voor een robot bewerking"""
-    id: str = field(default_factory=lambda: str(uuid4()))
-    zone_id: str = ""
+    id: int = field(default_factory=nieuw_id)
+    zone_id: int = 0
     robot_type: RobotType = RobotType.SNIJBRANDER
     
     # Status
@@ -117,7 +117,7 @@ class RobotInstructie:
         """Genereer G-code voor CNC/robot"""
         lines = [
             "; Gegenereerd door Ontmantelingsplan Systeem",
-            f"; Zone: {self.zone_id}",
+            f"; Zone: {id_naar_str(self.zone_id)}",
             f"; Robot: {self.robot_type.value}",
             "",
             "G21 ; Millimeters",
@@ -168,7 +168,7 @@ class RobotInstructie:
             "MODULE BewerkinGModule",
             "",
             "  ! Gegenereerd door Ontmantelingsplan Systeem",
-            f"  ! Zone: {self.zone_id}",
+            f"  ! Zone: {id_naar_str(self.zone_id)}",
             f"  ! Robot: {self.robot_type.value}",
             "",
             "  PROC main()",
@@ -383,7 +383,7 @@ def demo_robot_bewerkingen():
     for idx, instructie in enumerate(instructies[:2]):  # Toon eerste 2
         print(f"\n{'='*60}")
         print(f"INSTRUCTIE {idx + 1}: {instructie.robot_type.value}")
-        print(f"Zone: {instructie.zone_id}")
+        print(f"Zone: {id_naar_str(instructie.zone_id)}")
         print(f"Geschatte tijd: {instructie.totale_tijd:.1f} sec")
         
         print("\nG-Code:")
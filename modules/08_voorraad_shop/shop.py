@@ -6,13 +6,13 @@ Inventaris management en webshop functionaliteit met CAD/BIM export.
 
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict
-from uuid import uuid4
 from datetime import datetime, date
 from enum import Enum
 import json
 
 import sys
 sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str
 from modules.m04_originele_balken_db.voorraad import (
     VoorraadItem, VoorraadDatabase, VoorraadStatus
 )
@@ -32,7 +32,7 @@ class OrderStatus(Enum):
 @dataclass
 class Klant:
     """Klant informatie"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     bedrijfsnaam: str = ""
     contactpersoon: str = ""
     email: str = ""
@@ -48,8 +48,8 @@ class Klant:
 @dataclass
 class OrderRegel:
     """Een regel in een order"""
-    id: str = field(default_factory=lambda: str(uuid4()))
-    voorraad_item_id: str = ""
+    id: int = field(default_factory=nieuw_id)
+    voorraad_item_id: int = 0
     profiel_naam: str = ""
     lengte_mm: float = 0
     aantal: int = 1
@@ -69,7 +69,7 @@ class OrderRegel:
 @dataclass
 class Order:
     """Een klant order"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     order_nummer: str = ""
     klant: Optional[Klant] = None
     
@@ -93,7 +93,7 @@ class Order:
     
     def __post_init__(self):
         if not self.order_nummer:
-            self.order_nummer = f"ORD-{datetime.now().strftime('%Y%m%d')}-{self.id[:8].upper()}"
+            self.order_nummer = f"ORD-{datetime.now().strftime('%Y%m%d')}-{id_naar_str(self.id).upper()}"
     
     @property
     def subtotaal(self) -> float:
@@ -140,8 +140,8 @@ class ShopService:
     
     def __init__(self, voorraad: VoorraadDatabase):
         self.voorraad = voorraad
-        self.orders: Dict[str, Order] = {}
-        self.klanten: Dict[str, Klant] = {}
+        self.orders: Dict[int, Order] = {}
+        self.klanten: Dict[int, Klant] = {}
     
     def zoek_producten(
         self,
@@ -154,19 +154,8 @@ class ShopService:
         """Zoek producten voor webshop"""
         resultaten = []
         
-        for item in self.voorraad.items.values():
-            if item.status != VoorraadStatus.BESCHIKBAAR:
-                continue
-            
-            if profiel_naam and item.profiel_naam != profiel_naam:
-                continue
-            
-            if min_lengte and item.lengte_mm < min_lengte:
-                continue
-            
-            if max_lengte and item.lengte_mm > max_lengte:
-                continue
-            
+        # Status, profiel en lengte via de indexen van de database
+        for item in self.voorraad.zoek_op_lengte(min_lengte or 0, max_lengte, profiel_naam):
             if alleen_geoogst and not item.is_geoogst:
                 continue
             
@@ -185,8 +174,8 @@ class ShopService:
     
     def voeg_toe_aan_order(
         self,
-        order_id: str,
-        voorraad_item_id: str,
+        order_id: int,
+        voorraad_item_id: int,
         aantal: int = 1
     ) -> Optional[OrderRegel]:
         """Voeg item toe aan order"""
@@ -209,7 +198,7 @@ class ShopService:
         
         return regel
     
-    def bevestig_order(self, order_id: str) -> bool:
+    def bevestig_order(self, order_id: int) -> bool:
         """Bevestig order en reserveer voorraad"""
         order = self.orders.get(order_id)
         if not order or order.status != OrderStatus.OFFERTE:
@@ -225,7 +214,7 @@ class ShopService:
         order.gewijzigd = datetime.now()
         return True
     
-    def genereer_offerte_pdf(self, order_id: str) -> str:
+    def genereer_offerte_pdf(self, order_id: int) -> str:
         """Genereer offerte PDF (retourneert pad)"""
         order = self.orders.get(order_id)
         if not order:
@@ -248,7 +237,7 @@ class CADExporter:
         step_content = f"""ISO-10303-21;
 HEADER;
 FILE_DESCRIPTION(('Staal profiel {item.profiel_naam}'),'2;1');
-FILE_NAME('{item.id}.step','2024-01-01',('Ontmantelingsplan'),(''),'',' ','');
+FILE_NAME('{id_naar_str(item.id)}.step','2024-01-01',('Ontmantelingsplan'),(''),'',' ','');
 FILE_SCHEMA(('AUTOMOTIVE_DESIGN'));
 ENDSEC;
 DATA;
@@ -271,12 +260,12 @@ END-ISO-10303-21;"""
         return f"""ISO-10303-21;
 HEADER;
 FILE_DESCRIPTION(('IFC4'),'2;1');
-FILE_NAME('{item.id}.ifc','2024-01-01',(''),(''),'IfcOpenShell','Ontmantelingsplan','');
+FILE_NAME('{id_naar_str(item.id)}.ifc','2024-01-01',(''),(''),'IfcOpenShell','Ontmantelingsplan','');
 FILE_SCHEMA(('IFC4'));
 ENDSEC;
 DATA;
 #1=IFCPROJECT('project1',$,'Geoogst Staal',$,$,$,$,$,#3);
-#2=IFCBEAM('{item.id}',$,'{item.profiel_naam}',$,$,$,$,$,$);
+#2=IFCBEAM('{id_naar_str(item.id)}',$,'{item.profiel_naam}',$,$,$,$,$,$);
 /* Profiel: {item.profiel_naam} */
 /* Lengte: {item.lengte_mm} mm */
 /* Herkomst: {item.herkomst_gebouw or 'Nieuw'} */
@@ -6,7 +6,6 @@ Herkomst registratie, materiaal certificaten en rapportage generatie.
 
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict
-from uuid import uuid4
 from datetime import datetime, date
 from enum import Enum
 import json
@@ -14,6 +13,7 @@ import hashlib
 
 import sys
 sys.path.append("../..")
+from modules.identificatie import nieuw_id, id_naar_str
 from modules.m01_profiel_bibliotheek.profielen import StaalKwaliteit
 from modules.m04_originele_balken_db.voorraad import VoorraadItem
 
@@ -40,7 +40,7 @@ class TestMethode(Enum):
 @dataclass
 class HerkomstData:
     """Herkomst informatie van een balk"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     
     # Oorspronkelijk gebouw
     gebouw_naam: str = ""
@@ -59,7 +59,7 @@ class HerkomstData:
     oogst_project_nummer: str = ""
     
     # Positie in origineel gebouw
-    originele_element_id: str = ""
+    originele_element_id: int = 0
     originele_functie: str = ""  # "hoofdkolom", "vloerligger", etc.
     
     # Foto's en documentatie
@@ -79,7 +79,7 @@ class HerkomstData:
 @dataclass
 class TestResultaat:
     """Resultaat van een materiaaltest"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     
     # Test info
     test_methode: TestMethode = TestMethode.VISUEEL
@@ -116,12 +116,12 @@ class TestResultaat:
 @dataclass
 class Certificaat:
     """Een certificaat voor een stalen balk"""
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: int = field(default_factory=nieuw_id)
     certificaat_nummer: str = ""
     type: CertificaatType = CertificaatType.HERKOMST
     
     # Gerelateerde balk
-    voorraad_item_id: str = ""
+    voorraad_item_id: int = 0
     
     # Uitgever
     uitgegeven_door: str = ""
@@ -144,11 +144,11 @@ class Certificaat:
     def __post_init__(self):
         if not self.certificaat_nummer:
             datum = self.uitgave_datum.strftime("%Y%m%d")
-            self.certificaat_nummer = f"CERT-{datum}-{self.id[:8].upper()}"
+            self.certificaat_nummer = f"CERT-{datum}-{id_naar_str(self.id).upper()}"
     
     def bereken_handtekening(self) -> str:
         """Bereken digitale handtekening/hash"""
-        data = f"{self.certificaat_nummer}|{self.voorraad_item_id}|{self.staal_kwaliteit.value}"
+        data = f"{self.certificaat_nummer}|{id_naar_str(self.voorraad_item_id)}|{self.staal_kwaliteit.value}"
         if self.herkomst:
             data += f"|{self.herkomst.gebouw_naam}|{self.herkomst.oogst_datum}"
         for test in self.test_resultaten:
@@ -209,7 +209,7 @@ class CertificeringsService:
     """Service voor certificaat beheer en rapportage"""
     
     def __init__(self):
-        self.certificaten: Dict[str, Certificaat] = {}
+        self.certificaten: Dict[int, Certificaat] = {}
     
     def maak_herkomst_certificaat(
         self,
@@ -301,7 +301,7 @@ class CertificeringsService:
         rapport.append(f"Lengte:         {item.lengte_mm} mm")
         rapport.append(f"Gewicht:        {item.gewicht_kg:.1f} kg")
         rapport.append(f"Staal kwaliteit: {item.kwaliteit.value}")
-        rapport.append(f"Product ID:     {item.id}")
+        rapport.append(f"Product ID:     {id_naar_str(item.id)}")
         rapport.append("")
         
         # Certificaten
@@ -0,0 +1,233 @@
+"""
+Identificatie - Compacte integer ID's
+
+Alle domeinobjecten krijgen een 64-bit integer ID in plaats van een
+uuid4 string. Een ID bestaat uit een sessiedeel (per proces) en een
+oplopende teller, zodat ID's uit verschillende processen (bijv. workers
+van een process pool) niet botsen. Het sessiedeel wordt uitgedeeld uit
+een sessiebestand (standaard ~/.staal_hergebruik_sessie, in te stellen
+met STAAL_ID_SESSIE_BESTAND), zodat ook opeenvolgende runs die in
+dezelfde database schrijven elk een eigen sessie hebben. Dat gebeurt pas
+bij het eerste ID dat een proces uitgeeft; importeren schrijft niets.
+
+Alleen aan de exportgrens (JSON, CAD, certificaten) worden ID's als
+string weergegeven. Externe string ID's (bijv. uuid's uit oudere
+exports) worden geïnterneerd, zodat ze bij export weer exact zo
+teruggeschreven worden.
+"""
+
+import itertools
+import os
+import random
+import threading
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Bitverdeling: 1 tekenbit vrij, 20 bits sessie, 43 bits teller
+SESSIE_BITS = 20
+TELLER_BITS = 43
+
+_TELLER_MASKER = (1 << TELLER_BITS) - 1
+_SESSIE_MASKER = (1 << SESSIE_BITS) - 1
+
+
+def sessie_bestand() -> str:
+    """Pad van het sessiebestand (STAAL_ID_SESSIE_BESTAND of in de home map)"""
+    return os.environ.get(
+        "STAAL_ID_SESSIE_BESTAND",
+        os.path.join(os.path.expanduser("~"), ".staal_hergebruik_sessie")
+    )
+
+
+def _volgende_sessie() -> int:
+    """
+    Volgend sessiedeel uit het sessiebestand, onder een bestandslock.
+
+    Een nieuw bestand begint op een willekeurige waarde in de onderste
+    helft, zodat ook verschillende machines verspreid beginnen en er
+    minstens 2^19 sessies overblijven. Is het bestand niet schrijfbaar,
+    dan een willekeurig sessiedeel.
+
+    Raises:
+        RuntimeError: als alle sessiedelen uit het bestand op zijn
+    """
+    try:
+        fd = os.open(sessie_bestand(), os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        return random.SystemRandom().getrandbits(SESSIE_BITS)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            vorige = int(os.read(fd, 32))
+        except ValueError:
+            vorige = random.SystemRandom().getrandbits(SESSIE_BITS - 1)
+        sessie = vorige + 1
+        if sessie > _SESSIE_MASKER:
+            raise RuntimeError(
+                f"Geen sessiedelen meer vrij in {sessie_bestand()}; "
+                "verwijder het bestand alleen als de oude ID's niet meer gebruikt worden"
+            )
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, str(sessie).encode())
+        if fcntl is None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        return sessie
+    except OSError:
+        return random.SystemRandom().getrandbits(SESSIE_BITS)
+    finally:
+        # Sluiten geeft ook de flock vrij
+        os.close(fd)
+
+
+class IDAllocator:
+    """
+    Geeft unieke 64-bit integer ID's uit.
+
+    Zonder vast sessiedeel wordt de sessie pas bij het eerste ID uit het
+    sessiebestand gehaald.
+    """
+
+    def __init__(self, sessie: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.herstart(sessie)
+
+    def herstart(self, sessie: Optional[int] = None) -> None:
+        """Start een nieuwe sessie (nieuw sessiedeel, teller opnieuw)"""
+        if sessie is not None and not 0 <= sessie <= _SESSIE_MASKER:
+            raise ValueError(f"Sessiedeel moet tussen 0 en {_SESSIE_MASKER} liggen")
+        with self._lock:
+            self._teller = itertools.count(1)
+            # Blokken worden van boven af uit de tellerruimte gereserveerd
+            self._blok_grens = _TELLER_MASKER + 1
+            self._sessie = sessie
+            self._basis = None if sessie is None else sessie << TELLER_BITS
+
+    @property
+    def sessie(self) -> int:
+        """Sessiedeel van deze allocator (haalt het zo nodig op)"""
+        self._start_sessie()
+        return self._sessie
+
+    def _start_sessie(self) -> int:
+        """Sessiedeel ophalen bij het eerste gebruik; geeft de basis terug"""
+        with self._lock:
+            if self._basis is None:
+                self._sessie = _volgende_sessie()
+                self._basis = self._sessie << TELLER_BITS
+            return self._basis
+
+    def na_fork(self) -> None:
+        """Nieuwe sessie in een child proces (de lock kan bij fork vast hebben gezeten)"""
+        self._lock = threading.Lock()
+        self.herstart()
+
+    def nieuw(self) -> int:
+        """Nieuw uniek ID"""
+        # next() op itertools.count is atomair onder de GIL; de teller
+        # wordt alleen onder herstart() vervangen, dus geen lock nodig
+        basis = self._basis
+        if basis is None:
+            basis = self._start_sessie()
+        return basis | (next(self._teller) & _TELLER_MASKER)
+
+    def reserveer(self, aantal: int) -> range:
+        """
+        Reserveer een aaneengesloten blok ID's (voor bulk import).
+
+        Blokken komen van het einde van de tellerruimte, zodat nieuw()
+        er zonder lock nooit in kan uitkomen.
+        """
+        basis = self._basis
+        if basis is None:
+            basis = self._start_sessie()
+        with self._lock:
+            eerste = self._blok_grens - aantal
+            if eerste <= next(self._teller):
+                raise RuntimeError("Geen ID's meer vrij in deze sessie")
+            self._blok_grens = eerste
+        return range(basis | eerste, (basis | eerste) + aantal)
+
+
+class IDRegister:
+    """
+    Koppeling tussen integer ID's en externe string ID's.
+
+    Eigen ID's worden als 16 hexadecimale tekens weergegeven; andere
+    strings krijgen bij inlezen een nieuw integer ID en worden bij
+    export weer als de originele string teruggegeven.
+    """
+
+    def __init__(self, allocator: IDAllocator):
+        self.allocator = allocator
+        self._naar_int: Dict[str, int] = {}
+        self._naar_str: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, extern_id: str) -> int:
+        """Integer ID voor een externe string"""
+        bekend = self._naar_int.get(extern_id)
+        if bekend is not None:
+            return bekend
+
+        if _is_eigen_formaat(extern_id):
+            return int(extern_id, 16)
+
+        with self._lock:
+            bekend = self._naar_int.get(extern_id)
+            if bekend is None:
+                bekend = self.allocator.nieuw()
+                self._naar_int[extern_id] = bekend
+                self._naar_str[bekend] = extern_id
+        return bekend
+
+    def naar_str(self, id: int) -> str:
+        """Stabiele string weergave van een ID"""
+        extern = self._naar_str.get(id)
+        if extern is not None:
+            return extern
+        return f"{id:016x}"
+
+
+def _is_eigen_formaat(tekst: str) -> bool:
+    if len(tekst) != 16:
+        return False
+    try:
+        int(tekst, 16)
+    except ValueError:
+        return False
+    return True
+
+
+# Singleton instances
+ID_ALLOCATOR = IDAllocator()
+ID_REGISTER = IDRegister(ID_ALLOCATOR)
+
+# Na fork() een eigen sessie, anders geven parent en child dezelfde ID's uit
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ID_ALLOCATOR.na_fork)
+
+
+def nieuw_id() -> int:
+    """Nieuw uniek ID (voor dataclass default_factory)"""
+    return ID_ALLOCATOR.nieuw()
+
+
+def id_naar_str(id: int) -> str:
+    """ID als string, alleen voor export (JSON, CAD, certificaten)"""
+    return ID_REGISTER.naar_str(id)
+
+
+def str_naar_id(tekst: str) -> int:
+    """ID uit een export weer inlezen"""
+    return ID_REGISTER.intern(tekst)
@@ -0,0 +1,39 @@
+"""
+Pytest configuratie.
+
+De modulemappen heten 01_profiel_bibliotheek enz., maar worden
+geïmporteerd als modules.m01_profiel_bibliotheek; deze finder legt die
+koppeling zodat de tests vanuit de repository draaien.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = os.path.join(ROOT, "modules")
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# ID sessies niet uit het sessiebestand van de gebruiker halen
+os.environ.setdefault(
+    "STAAL_ID_SESSIE_BESTAND", os.path.join(tempfile.mkdtemp(prefix="staal_tests_"), "sessie")
+)
+
+
+class _ModuleMapFinder:
+    """modules.m01_x -> modules/01_x"""
+
+    def find_spec(self, naam, pad=None, doel=None):
+        delen = naam.split(".")
+        if len(delen) != 2 or delen[0] != "modules" or not delen[1].startswith("m"):
+            return None
+        map_pad = os.path.join(MODULES, delen[1][1:])
+        init = os.path.join(map_pad, "__init__.py")
+        if not os.path.isfile(init):
+            return None
+        return importlib.util.spec_from_file_location(naam, init, submodule_search_locations=[map_pad])
+
+
+sys.meta_path.append(_ModuleMapFinder())
@@ -0,0 +1,24 @@
+import os
+import shutil
+
+from modules.m01_profiel_bibliotheek import catalogus
+from modules.m01_profiel_bibliotheek.catalogus import laad_catalogus, STANDAARD_CATALOGUS
+
+
+def test_catalogus_alleen_opnieuw_hashen_na_wijziging(tmp_path, monkeypatch):
+    pad = str(tmp_path / "profielen.csv")
+    shutil.copy(STANDAARD_CATALOGUS, pad)
+    aantal = len(laad_catalogus(pad))
+
+    gehasht = []
+    origineel = catalogus._cache_sleutel
+    monkeypatch.setattr(catalogus, "_cache_sleutel", lambda p: gehasht.append(p) or origineel(p))
+    assert len(laad_catalogus(pad)) == aantal
+    assert gehasht == []
+
+    with open(pad, "a", encoding="utf-8") as f:
+        f.write("# gewijzigd\n")
+    laad_catalogus(pad)
+    assert len(gehasht) == 1
+    laad_catalogus(pad)
+    assert len(gehasht) == 1
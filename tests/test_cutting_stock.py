@@ -0,0 +1,53 @@
+from modules.m04_originele_balken_db.voorraad import VoorraadDatabase, VoorraadItem
+from modules.m05_matching_algoritme.matching import MatchingAlgoritme, VraagItem, MatchStatus
+from modules.m05_matching_algoritme.cutting_stock import SnijMethode
+
+import pytest
+
+
+@pytest.mark.parametrize("methode", list(SnijMethode))
+def test_korter_zagen_binnen_tolerantie(methode):
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=5900))
+    vraag = VraagItem(profiel_naam="HEA 200", lengte_mm=6000, lengte_tolerantie_min=200)
+    resultaten, plannen = MatchingAlgoritme().optimaliseer_cutting([vraag], voorraad, methode)
+    assert resultaten[0].status == MatchStatus.GOED
+    assert plannen[0].snedes == [(5900, vraag.id)]
+    assert plannen[0].rest_lengte == 0
+
+
+@pytest.mark.parametrize("methode", list(SnijMethode))
+def test_zonder_tolerantie_geen_match(methode):
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=5900))
+    vraag = VraagItem(profiel_naam="HEA 200", lengte_mm=6000)
+    resultaten, plannen = MatchingAlgoritme().optimaliseer_cutting([vraag], voorraad, methode)
+    assert resultaten[0].status == MatchStatus.GEEN
+    assert plannen == []
+
+
+@pytest.mark.parametrize("methode", list(SnijMethode))
+def test_korter_zagen_in_rest_van_open_balk(methode):
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=11990))
+    vragen = [
+        VraagItem(profiel_naam="HEA 200", lengte_mm=6000, lengte_tolerantie_min=100)
+        for _ in range(2)
+    ]
+    resultaten, plannen = MatchingAlgoritme().optimaliseer_cutting(vragen, voorraad, methode)
+    assert all(r.is_gematcht for r in resultaten)
+    assert len(plannen) == 1
+    assert sorted(l for l, _ in plannen[0].snedes) == [5985, 6000]
+    assert plannen[0].rest_lengte == 0
+
+
+@pytest.mark.parametrize("methode", list(SnijMethode))
+def test_efficiency_per_stuk(methode):
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=6000))
+    vraag = VraagItem(profiel_naam="HEA 200", lengte_mm=2990, aantal=2)
+    resultaten, plannen = MatchingAlgoritme().optimaliseer_cutting([vraag], voorraad, methode)
+    assert [round(r.efficiency, 1) for r in resultaten] == [49.8, 49.8]
+    assert [r.status for r in resultaten] == [MatchStatus.MATIG] * 2
+    assert len(plannen) == 1
+    assert plannen[0].benut_percentage == pytest.approx(5980 / 6000 * 100)
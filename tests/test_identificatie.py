@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from modules import identificatie
+from modules.identificatie import IDAllocator
+
+
+def test_reserveer_overlapt_niet_met_nieuw():
+    allocator = IDAllocator(sessie=7)
+    uitgegeven = []
+    lock = threading.Lock()
+
+    def werk():
+        lokaal = []
+        for _ in range(2000):
+            lokaal.append(allocator.nieuw())
+            lokaal.extend(allocator.reserveer(3))
+        with lock:
+            uitgegeven.extend(lokaal)
+
+    threads = [threading.Thread(target=werk) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(uitgegeven) == len(set(uitgegeven)) == 4 * 2000 * 4
+
+
+def test_sessies_lopen_op_via_sessiebestand(tmp_path, monkeypatch):
+    monkeypatch.setenv("STAAL_ID_SESSIE_BESTAND", str(tmp_path / "sessie"))
+    eerste = IDAllocator().sessie
+    assert IDAllocator().sessie == eerste + 1
+    assert IDAllocator().sessie == eerste + 2
+
+
+def test_sessie_pas_bij_eerste_id(tmp_path, monkeypatch):
+    bestand = tmp_path / "sessie"
+    monkeypatch.setenv("STAAL_ID_SESSIE_BESTAND", str(bestand))
+    allocator = IDAllocator()
+    allocator.na_fork()
+    assert not bestand.exists()
+    id = allocator.nieuw()
+    assert id >> identificatie.TELLER_BITS == int(bestand.read_text()) == allocator.sessie
+
+
+def test_import_schrijft_niet_in_home(tmp_path):
+    omgeving = {k: v for k, v in os.environ.items() if k != "STAAL_ID_SESSIE_BESTAND"}
+    omgeving.update(HOME=str(tmp_path), USERPROFILE=str(tmp_path))
+    code = (
+        "import importlib.util, sys\n"
+        f"spec = importlib.util.spec_from_file_location('identificatie', {identificatie.__file__!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], env=omgeving, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sessiebestand_vol_geeft_fout(tmp_path, monkeypatch):
+    bestand = tmp_path / "sessie"
+    bestand.write_text(str((1 << identificatie.SESSIE_BITS) - 1))
+    monkeypatch.setenv("STAAL_ID_SESSIE_BESTAND", str(bestand))
+    with pytest.raises(RuntimeError):
+        IDAllocator().nieuw()
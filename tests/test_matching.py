@@ -0,0 +1,29 @@
+from modules.m04_originele_balken_db.voorraad import VoorraadDatabase, VoorraadItem
+from modules.m05_matching_algoritme.matching import MatchingAlgoritme, VraagItem, MatchStatus
+
+
+def test_match_batch_eerst_zoveel_mogelijk_matches():
+    # Scores boven 240 (ruime lengte_tolerantie_min) mogen geen match kosten
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="IPE 200", lengte_mm=1000))
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=8000))
+    vragen = [
+        VraagItem(profiel_naam="HEA 200", lengte_mm=20000, lengte_tolerantie_min=19100),
+        VraagItem(profiel_naam="IPE 200", lengte_mm=950),
+    ]
+    algo = MatchingAlgoritme(substituties={"HEA 200": ("IPE 200",), "IPE 200": ()})
+    assert all(r.is_gematcht for r in algo.match_batch(vragen, voorraad))
+
+
+def test_match_batch_zonder_lange_genoeg_balk():
+    voorraad = VoorraadDatabase()
+    voorraad.voeg_toe(VoorraadItem(profiel_naam="HEA 200", lengte_mm=3000))
+    vraag = VraagItem(profiel_naam="HEA 200", lengte_mm=6000)
+    algo = MatchingAlgoritme()
+    batch = algo.match_batch([vraag], voorraad)
+    assert [r.status for r in batch] == [algo.vind_beste_match(vraag, voorraad).status] == [MatchStatus.GEEN]
+
+
+def test_match_batch_zonder_voorraad():
+    vraag = VraagItem(profiel_naam="HEA 200", lengte_mm=6000)
+    assert [r.status for r in MatchingAlgoritme().match_batch([vraag], VoorraadDatabase())] == [MatchStatus.GEEN]
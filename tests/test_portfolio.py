@@ -0,0 +1,46 @@
+import pickle
+from datetime import date, datetime
+
+from modules.m02_gebouw_structuur.structuur import (
+    maak_voorbeeld_gebouw, maak_raster_gebouw, AangelastItem, Positie3D
+)
+from modules.m02_gebouw_structuur.verbindingen import detecteer_verbindingen
+from modules.m03_oogst_planning.portfolio import GebouwPakket, plan_portfolio
+
+
+def test_pakket_geeft_hetzelfde_gebouw_terug():
+    gebouw = maak_voorbeeld_gebouw()
+    gebouw.laatst_geinspecteerd = date(2025, 6, 1)
+    gebouw.documentatie.append("tekeningen/hal.dwg")
+    element = next(iter(gebouw.elementen.values()))
+    element.rotatie = 90
+    element.opmerkingen = "roest bij voetplaat"
+    element.aangelaste_items.append(AangelastItem(
+        type="schot", beschrijving="verstijver", positie=Positie3D(100, 0, 50),
+        afmetingen={"L": 200, "B": 100, "H": 10}, gewicht=1.6, las_lengte=400, verwijder_tijd=12
+    ))
+
+    kopie = pickle.loads(pickle.dumps(GebouwPakket.van_gebouw(gebouw))).naar_gebouw()
+
+    assert kopie.elementen == gebouw.elementen
+    assert list(kopie.verbindingen) == list(gebouw.verbindingen)
+    assert (kopie.ontwerp_levensduur, kopie.laatst_geinspecteerd, kopie.documentatie) == \
+        (gebouw.ontwerp_levensduur, gebouw.laatst_geinspecteerd, gebouw.documentatie)
+    assert kopie.totaal_gewicht == gebouw.totaal_gewicht
+
+
+def test_workers_geven_zelfde_resultaat_als_serieel():
+    gebouwen = []
+    for k in range(3):
+        gebouw = maak_raster_gebouw(velden_x=3 + k, velden_y=3, verdiepingen=2)
+        gebouw.naam = f"Project {k + 1}"
+        detecteer_verbindingen(gebouw)
+        gebouwen.append(gebouw)
+    start = datetime(2026, 3, 2, 7, 0)
+
+    serieel = plan_portfolio(gebouwen, workers=1, startdatum=start)
+    parallel = plan_portfolio(gebouwen, workers=2, startdatum=start)
+
+    assert parallel.gebouwen == serieel.gebouwen
+    assert parallel.tonnage_per_profiel == serieel.tonnage_per_profiel
+    assert parallel.ploeg_belasting == serieel.ploeg_belasting
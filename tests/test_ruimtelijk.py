@@ -0,0 +1,19 @@
+from modules.m02_gebouw_structuur.structuur import maak_voorbeeld_gebouw, StaalElement, Positie3D
+from modules.m02_gebouw_structuur.ruimtelijk import RuimtelijkeIndex
+
+
+def _hal_met_losse_balk() -> RuimtelijkeIndex:
+    """Voorbeeldhal plus een balk ver weg: het raster heeft lege cellen ertussen"""
+    hal = maak_voorbeeld_gebouw()
+    hal.voeg_element_toe(StaalElement(
+        profiel_naam="HEA 200", start_positie=Positie3D(60000, 0, 6000), eind_positie=Positie3D(66000, 0, 6000)
+    ))
+    return RuimtelijkeIndex.van_gebouw(hal)
+
+
+def test_queries_in_alleen_lege_cellen():
+    index = _hal_met_losse_balk()
+    assert index.zoek_straal((40000, 0, 4000), 500) == []
+    assert index.zoek_box((40000, 0, 0), (41000, 100, 100)) == []
+    assert index.zoek_nabij_segment((40000, 0, 4000), (41000, 0, 4000), 100) == []
+    assert len(index.zoek_dichtstbij((40000, 0, 4000))) == 1
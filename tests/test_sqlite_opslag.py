@@ -0,0 +1,33 @@
+from modules.m04_originele_balken_db.voorraad import VoorraadStatus, maak_voorbeeld_voorraad
+from modules.m04_originele_balken_db.sqlite_opslag import SQLiteVoorraadDatabase
+
+
+def test_kopieren_naar_andere_opslag_laat_bron_intact(tmp_path):
+    a = SQLiteVoorraadDatabase(str(tmp_path / "a.db"))
+    b = SQLiteVoorraadDatabase(str(tmp_path / "b.db"))
+    a.voeg_toe_meerdere(list(maak_voorbeeld_voorraad().items.values()))
+    aantal = len(a.items)
+
+    try:
+        with b.transactie():
+            b.voeg_toe_meerdere(list(a.items.values()))
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert len(a.items) == aantal
+    assert len(b.items) == 0
+
+    b.voeg_toe_meerdere(list(a.items.values()))
+    assert len(a.items) == len(b.items) == aantal
+
+
+def test_item_blijft_bij_eigen_opslag():
+    opslag = SQLiteVoorraadDatabase()
+    opslag.voeg_toe_meerdere(list(maak_voorbeeld_voorraad().items.values()))
+    item = opslag.zoek_op_profiel("HEA 200")[0]
+    kopie = SQLiteVoorraadDatabase()
+    kopie.voeg_toe(item)
+
+    item.status = VoorraadStatus.VERKOCHT
+    assert opslag.items[item.id] is item
+    assert opslag.items[item.id].status == VoorraadStatus.VERKOCHT
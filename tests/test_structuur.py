@@ -0,0 +1,90 @@
+import pickle
+
+import pytest
+
+from modules.m02_gebouw_structuur.structuur import (
+    maak_voorbeeld_gebouw, maak_raster_gebouw, AangelastItem, ElementType, Verbinding,
+    StaalElement, ItemLijst
+)
+from modules.m02_gebouw_structuur.graaf import VerbindingsGraaf
+from modules.m02_gebouw_structuur.verbindingen import detecteer_verbindingen
+
+
+def _controleer_graaf(gebouw):
+    """Graaf en posities in sync met gebouw.verbindingen"""
+    referentie = VerbindingsGraaf(gebouw.verbindingen, gebouw.elementen)
+    graaf = gebouw.graaf
+    assert graaf.aantal_verbindingen == referentie.aantal_verbindingen == len(gebouw.verbindingen)
+    for element_id in gebouw.elementen:
+        assert sorted(graaf.buren(element_id)) == sorted(referentie.buren(element_id))
+    assert {v.id: i for i, v in enumerate(gebouw.verbindingen)} == gebouw._positie
+
+
+def test_invalideer_aggregaten_telt_items_opnieuw():
+    gebouw = maak_voorbeeld_gebouw()
+    element = next(iter(gebouw.elementen.values()))
+    element.aangelaste_items.append(AangelastItem(gewicht=10))
+    voor = gebouw.totaal_gewicht
+    element.aangelaste_items[-1].gewicht = 25  # buiten de hooks om
+    gebouw.invalideer_aggregaten()
+    assert gebouw.totaal_gewicht == voor + 15
+
+
+def test_get_balken_met_en_zonder_arrays():
+    gebouw = maak_voorbeeld_gebouw()
+    zonder = [e.id for e in gebouw.get_balken()], [e.id for e in gebouw.get_kolommen()]
+    gebouw.arrays
+    met = [e.id for e in gebouw.get_balken()], [e.id for e in gebouw.get_kolommen()]
+    assert zonder == met
+    horizontaal = (ElementType.BALK, ElementType.LIGGER, ElementType.VLOERLIGGER)
+    assert zonder[0] == [e.id for e in gebouw.elementen.values() if e.type in horizontaal]
+
+
+def test_graaf_ziet_wijziging_bij_gelijk_aantal():
+    gebouw = maak_voorbeeld_gebouw()
+    detecteer_verbindingen(gebouw)
+    gebouw.graaf
+    ids = list(gebouw.elementen)
+    gebouw.verbindingen.pop(0)
+    gebouw.verbindingen.append(Verbinding(element1_id=ids[0], element2_id=ids[-1]))
+    _controleer_graaf(gebouw)
+    gebouw.verbindingen = gebouw.verbindingen[:5]
+    _controleer_graaf(gebouw)
+
+
+def test_verwijderen_houdt_graaf_en_lijst_gelijk():
+    gebouw = maak_raster_gebouw(velden_x=4, velden_y=4, verdiepingen=2)
+    detecteer_verbindingen(gebouw)
+    ids = list(gebouw.elementen)
+    gebouw.voeg_verbinding_toe(Verbinding(element1_id=ids[0], element2_id=ids[1]))
+    gebouw.verwijder_verbinding(gebouw.verbindingen[0].id)
+    for element_id in ids[::3]:
+        gebouw.verwijder_element(element_id)
+    _controleer_graaf(gebouw)
+
+
+def test_subklasse_blijft_subklasse():
+    class MijnElement(StaalElement):
+        __slots__ = ()
+
+    element = MijnElement(profiel_naam="HEA 200", lengte=5000)
+    assert type(element) is MijnElement
+    gebouw = maak_voorbeeld_gebouw()
+    voor = gebouw.totaal_gewicht
+    gebouw.voeg_element_toe(element)
+    element.lengte = 6000
+    assert type(element) is MijnElement
+    assert gebouw.totaal_gewicht == pytest.approx(voor + element.gewicht)
+
+
+def test_element_hooks_na_pickle():
+    gebouw = maak_voorbeeld_gebouw()
+    element = next(iter(gebouw.elementen.values()))
+    element.aangelaste_items = [AangelastItem(gewicht=12, verwijder_tijd=3)]
+    kopie = pickle.loads(pickle.dumps(gebouw))
+    element = kopie.elementen[element.id]
+    assert isinstance(element.aangelaste_items, ItemLijst)
+    assert element.gewicht == pytest.approx(element.schoon_gewicht + 12)
+    voor = kopie.totaal_gewicht
+    element.aangelaste_items.append(AangelastItem(gewicht=5))
+    assert kopie.totaal_gewicht == pytest.approx(voor + 5)
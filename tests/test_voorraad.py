@@ -0,0 +1,57 @@
+import pickle
+
+from modules.m04_originele_balken_db.voorraad import VoorraadDatabase, VoorraadItem
+
+
+def _lengtes(db):
+    return [item.lengte_mm for item in db.zoek_op_profiel("HEA 200")]
+
+
+def test_voeg_toe_meerdere_vervangt_bestaande_items():
+    db = VoorraadDatabase()
+    x = VoorraadItem(profiel_naam="HEA 200", lengte_mm=5000)
+    db.voeg_toe(x)
+    db.voeg_toe_meerdere([
+        VoorraadItem(profiel_naam="HEA 200", lengte_mm=7000),
+        VoorraadItem(profiel_naam="HEA 200", lengte_mm=3000),
+        x,
+    ])
+    assert _lengtes(db) == [3000, 5000, 7000]
+
+    # Zelfde id opnieuw, ook twee keer in één batch: het laatste item telt
+    x2 = VoorraadItem(id=x.id, profiel_naam="HEA 200", lengte_mm=4000)
+    db.voeg_toe_meerdere([x2, VoorraadItem(profiel_naam="HEA 200", lengte_mm=1000), x2])
+    assert _lengtes(db) == [1000, 3000, 4000, 7000]
+    assert len(db.items) == 4
+    assert db._aantal_beschikbaar == {"HEA 200": 4}
+
+
+def test_wijziging_werkt_index_bij():
+    db = VoorraadDatabase()
+    item = VoorraadItem(profiel_naam="HEA 200", lengte_mm=5000)
+    db.voeg_toe(item)
+    item.lengte_mm = 3000
+    assert [i.lengte_mm for i in db.zoek_op_lengte(2500, 3500, "HEA 200")] == [3000]
+
+
+def test_subklasse_blijft_subklasse():
+    class MijnItem(VoorraadItem):
+        __slots__ = ()
+
+    item = MijnItem(profiel_naam="HEA 200", lengte_mm=5000)
+    assert type(item) is MijnItem
+    db = VoorraadDatabase()
+    db.voeg_toe(item)
+    item.lengte_mm = 3000
+    assert _lengtes(db) == [3000]
+    assert type(item) is MijnItem
+
+
+def test_kopie_staat_in_geen_database():
+    db = VoorraadDatabase()
+    item = VoorraadItem(profiel_naam="HEA 200", lengte_mm=5000)
+    db.voeg_toe(item)
+    kopie = pickle.loads(pickle.dumps(item))
+    assert kopie == item and kopie._database is None
+    kopie.lengte_mm = 1000
+    assert _lengtes(db) == [5000]
@@ -0,0 +1,27 @@
+import pytest
+
+from modules.m03_oogst_planning.vraaggestuurd import VraaggestuurdePlanner
+from modules.m05_matching_algoritme.cutting_stock import maak_cutting_plan
+from modules.m04_originele_balken_db.voorraad import VoorraadItem
+
+
+@pytest.mark.parametrize("lengte, stukken", [
+    (8000, [6950]),
+    (8000, [3000, 3000]),
+    (12000, [5500, 5500]),
+])
+def test_zaagpatroon_rest_gelijk_aan_cutting_plan(lengte, stukken):
+    planner = VraaggestuurdePlanner(zaagsnede=5)
+    _, _, rest, _ = planner._zaagpatroon(
+        lengte, [0], [float(stukken[0])], [1.0], [len(stukken)], float(stukken[0])
+    )
+    plan = maak_cutting_plan(
+        VoorraadItem(profiel_naam="HEA 200", lengte_mm=lengte), [(s, 0) for s in stukken], 5, 500
+    )
+    assert rest == plan.rest_lengte
+
+
+def test_zaagpatroon_zonder_rest():
+    planner = VraaggestuurdePlanner(zaagsnede=5)
+    _, snedes, rest, aantal_snedes = planner._zaagpatroon(6000, [0], [6000.0], [1.0], [1], 6000.0)
+    assert (snedes, rest, aantal_snedes) == ([(0, 1)], 0.0, 0)